@@ -0,0 +1,208 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import ADMISSION_CLASSES, ADMISSION_CONTROL, ADMISSION_ROUTES
+from .deadline import reset_deadline, set_deadline
+from .metrics import ADMISSION_ACTIVE, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS, ADMISSION_WAITING
+
+# Each class has its own slots, so saturated generation cannot starve cheap reads
+DEFAULT_CLASSES: Dict[str, Dict[str, float]] = {
+    "read": {"limit": 256, "queue": 256, "max_wait_s": 5, "timeout_s": 15},
+    "ingest": {"limit": 16, "queue": 32, "max_wait_s": 15, "timeout_s": 120},
+    "generate": {"limit": 32, "queue": 64, "max_wait_s": 10, "timeout_s": 45},
+    # Cohort runs and bulk uploads stream for minutes; few at a time, no deadline
+    "bulk": {"limit": 2, "queue": 2, "max_wait_s": 5, "timeout_s": 0},
+}
+# Path prefix -> class (None: not admission-controlled); other paths are "read"
+DEFAULT_ROUTES: Dict[str, Optional[str]] = {
+    "/healthz": None,
+    "/readyz": None,
+    "/metrics": None,
+    "/user/upload_cv": "ingest",
+    "/user/interests": "ingest",
+    "/user/bulk_upload": "bulk",
+    "/career/recommend": "generate",
+    "/career/recommend_batch": "bulk",
+}
+DEFAULT_CLASS = "read"
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionClass:
+    """At most `limit` requests at once; up to `queue` more wait in FIFO order for at
+    most `max_wait_s`, and the rest are rejected at once. Admitted requests get a
+    deadline `timeout_s` after they arrived (0: none).
+    """
+
+    def __init__(self, name: str, limit: int, queue: int, max_wait_s: float, timeout_s: float = 0):
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.queue = max(0, int(queue))
+        self.max_wait_s = max(0.0, float(max_wait_s))
+        self.timeout_s = max(0.0, float(timeout_s))
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long a request holds its slot, for Retry-After
+        self._hold_s = 0.0
+        self.admitted = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Roughly when a slot should free up for a request arriving now."""
+        return min(60.0, max(1.0, math.ceil(self._hold_s * (len(self._waiters) + 1) / self.limit)))
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(route_class=self.name, reason=reason)
+        raise Overloaded(reason, self.retry_after())
+
+    async def acquire(self):
+        """Take a slot, waiting at most `max_wait_s`; raises Overloaded when none frees up."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+        else:
+            if len(self._waiters) >= self.queue:
+                self._reject("queue_full")
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            ADMISSION_WAITING.inc(route_class=self.name)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(fut, self.max_wait_s)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if fut.done() and not fut.cancelled():
+                    # The slot was handed over just as we gave up; pass it on
+                    self.release()
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self._reject("wait_timeout")
+            finally:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+                ADMISSION_WAITING.dec(route_class=self.name)
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, route_class=self.name)
+        self.admitted += 1
+        ADMISSION_ACTIVE.set(self.active, route_class=self.name)
+
+    def release(self, held_s: Optional[float] = None):
+        if held_s is not None:
+            self._hold_s = held_s if not self._hold_s else 0.9 * self._hold_s + 0.1 * held_s
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                # Hand the slot straight to the next waiter
+                fut.set_result(None)
+                return
+        self.active -= 1
+        ADMISSION_ACTIVE.set(self.active, route_class=self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_hold_s": round(self._hold_s, 3),
+        }
+
+
+class AdmissionController:
+    """Maps request paths to admission classes."""
+
+    def __init__(self, classes: Dict[str, Dict[str, float]], routes: Dict[str, Optional[str]], default: str = DEFAULT_CLASS):
+        self.classes = {name: AdmissionClass(name, **spec) for name, spec in classes.items()}
+        # Longest prefix first
+        self.routes: List[Tuple[str, Optional[str]]] = sorted(routes.items(), key=lambda r: len(r[0]), reverse=True)
+        self.default = default
+
+    def classify(self, path: str) -> Optional[AdmissionClass]:
+        for prefix, name in self.routes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return self.classes.get(name) if name else None
+        return self.classes.get(self.default)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: c.stats() for name, c in self.classes.items()}
+
+
+def _merged_classes() -> Dict[str, Dict[str, float]]:
+    classes = {name: dict(spec) for name, spec in DEFAULT_CLASSES.items()}
+    for name, spec in ADMISSION_CLASSES.items():
+        classes[name] = {**classes.get(name, DEFAULT_CLASSES[DEFAULT_CLASS]), **spec}
+    return classes
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(_merged_classes(), {**DEFAULT_ROUTES, **ADMISSION_ROUTES})
+    return _controller
+
+
+def admission_stats() -> Dict[str, Any]:
+    return get_admission_controller().stats() if ADMISSION_CONTROL else {}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware: per-class concurrency limits with bounded waiting, and request deadlines.
+
+    It runs before the route reads the request body, so requests waiting for a
+    slot (or rejected) hold no buffered uploads. A request keeps its slot until
+    its response, streamed or not, is complete.
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_CONTROL:
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller or get_admission_controller()
+        admission = controller.classify(scope["path"])
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+        arrived = time.monotonic()
+        try:
+            await admission.acquire()
+        except Overloaded as e:
+            await _overloaded(send, admission.name, e)
+            return
+        admitted = time.monotonic()
+        # The deadline counts from arrival: time spent waiting for a slot is part of it
+        token = set_deadline(arrived + admission.timeout_s if admission.timeout_s else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
+            admission.release(time.monotonic() - admitted)
+
+
+async def _overloaded(send, name: str, exc: Overloaded):
+    body = json.dumps({"detail": f"Server busy ({name}: {exc.reason.replace('_', ' ')}); retry later"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(int(exc.retry_after)).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
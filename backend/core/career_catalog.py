@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import CAREER_CATALOG, CAREER_CATALOG_PATH, CHROMA_DIR
+from .embeddings import embed_texts, embedding_model_key
+from .local_embeddings import np
+from .metrics import stage
+from .taxonomy import SkillTaxonomy, get_taxonomy
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent / "career_catalog.json"
+
+# Shortlist score: cosine similarity to the profile plus these weights times the
+# share of a career's skills the user has, and the career's fit to the interests
+SKILL_WEIGHT = 0.5
+INTEREST_WEIGHT = 0.5
+
+
+def _unit(vectors: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class CareerCatalog:
+    """Careers with their required skills and typical learning paths, ranked in bulk.
+
+    Each career is embedded once (title, description and skills) into a unit-row
+    matrix, saved under `cache_dir` per embedding model and catalog fingerprint
+    so restarts reuse it. Requests use `ready_matrix` and `build_in_background`,
+    so none of them waits for the catalog to be embedded. A 0/1 careers x skills matrix scores skill overlap, so
+    a shortlist is two matrix-vector products and a top-k partition.
+    """
+
+    def __init__(
+        self,
+        careers: List[Dict[str, Any]],
+        taxonomy: SkillTaxonomy,
+        cache_dir: Optional[str] = None,
+        matrix: Optional["np.ndarray"] = None,
+    ):
+        if np is None:
+            raise RuntimeError("numpy is not installed; cannot use the career catalog.")
+        self.careers = [dict(c) for c in careers]
+        self.taxonomy = taxonomy
+        self.cache_dir = cache_dir
+        self.fingerprint = hashlib.sha256(json.dumps(self.careers, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self._index = {c["title"].lower(): i for i, c in enumerate(self.careers)}
+        self._vocab: Dict[str, int] = {}
+        for career in self.careers:
+            for skill in career.get("skills", []):
+                self._vocab.setdefault(self._skill_key(skill), len(self._vocab))
+        self._skills = np.zeros((len(self.careers), len(self._vocab)), dtype=np.float32)
+        for i, career in enumerate(self.careers):
+            for skill in career.get("skills", []):
+                self._skills[i, self._vocab[self._skill_key(skill)]] = 1.0
+        self._skill_counts = np.maximum(self._skills.sum(axis=1), 1.0)
+        # Precomputed embeddings may be passed in, one row per career
+        self._matrix: Optional["np.ndarray"] = _unit(np.asarray(matrix, dtype=np.float32)) if matrix is not None else None
+        self._lock = threading.Lock()
+        self._building = False
+        self._building_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, taxonomy: SkillTaxonomy, cache_dir: Optional[str] = None) -> "CareerCatalog":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("careers", []), taxonomy, cache_dir)
+
+    def __len__(self) -> int:
+        return len(self.careers)
+
+    def _skill_key(self, skill: str) -> str:
+        return (self.taxonomy.canonical_skill(skill) or skill.strip()).lower()
+
+    def _skill_vector(self, skills: Iterable[str]) -> "np.ndarray":
+        vec = np.zeros(len(self._vocab), dtype=np.float32)
+        for skill in skills:
+            i = self._vocab.get(self._skill_key(skill))
+            if i is not None:
+                vec[i] = 1.0
+        return vec
+
+    @staticmethod
+    def doc_text(career: Dict[str, Any]) -> str:
+        """The text a career is embedded as."""
+        return f"{career['title']}. {career.get('description', '')} Skills: {', '.join(career.get('skills', []))}"
+
+    def _matrix_path(self) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        model = re.sub(r"[^\w.-]+", "_", embedding_model_key())
+        return Path(self.cache_dir) / f"career_catalog-{model}-{self.fingerprint}.npy"
+
+    def matrix(self) -> "np.ndarray":
+        """(careers, dim) unit-row embeddings, loaded from `cache_dir` or embedded once."""
+        if self._matrix is not None:
+            return self._matrix
+        with self._lock:
+            if self._matrix is None:
+                path = self._matrix_path()
+                if path is not None and path.exists():
+                    matrix = np.load(path)
+                else:
+                    with stage("catalog_embed"):
+                        matrix = _unit(np.asarray(embed_texts([self.doc_text(c) for c in self.careers]), dtype=np.float32))
+                    if path is not None:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        tmp = path.with_suffix(".tmp.npy")
+                        np.save(tmp, matrix)
+                        os.replace(tmp, path)
+                self._matrix = matrix
+        return self._matrix
+
+    def ready_matrix(self) -> Optional["np.ndarray"]:
+        """The embeddings if already built or saved under `cache_dir`, else None; never embeds."""
+        if self._matrix is None:
+            path = self._matrix_path()
+            # Written with a rename, so a file that exists is complete
+            if path is not None and path.exists():
+                self._matrix = np.load(path)
+        return self._matrix
+
+    def build_in_background(self) -> bool:
+        """Embed the catalog on a daemon thread unless it is built or being built;
+        whether a build started. A failed build is tried again on the next call."""
+        if self._matrix is not None:
+            return False
+        with self._building_lock:
+            if self._building:
+                return False
+            self._building = True
+        threading.Thread(target=self._build, name="career-catalog-embed", daemon=True).start()
+        return True
+
+    def _build(self):
+        try:
+            self.matrix()
+        except Exception:
+            # Counted by the catalog_embed stage; requests keep ranking without embeddings
+            pass
+        finally:
+            with self._building_lock:
+                self._building = False
+
+    def career(self, title: str, skills: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """The career named `title` with the `matched`/`missing` skills for `skills`, or None."""
+        i = self._index.get((title or "").strip().lower())
+        if i is None:
+            return None
+        career = self.careers[i]
+        have_keys = {self._skill_key(s) for s in skills}
+        matched = [s for s in career.get("skills", []) if self._skill_key(s) in have_keys]
+        missing = [s for s in career.get("skills", []) if self._skill_key(s) not in have_keys]
+        return {**career, "matched": matched, "missing": missing}
+
+    def shortlist(
+        self, query: Optional[Any], skills: Iterable[str], interests: Iterable[str] = (), k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """The `k` best-fitting careers, best first, each with its `score` and the
+        `matched`/`missing` skills. `query` is the profile's embedding; without one
+        careers are ranked on skills and interests alone.
+        """
+        n = len(self.careers)
+        if not n or k <= 0:
+            return []
+        skills = list(skills)
+        have = self._skill_vector(skills)
+        scores = SKILL_WEIGHT * (self._skills @ have) / self._skill_counts
+
+        interests = list(interests)
+        interest_text = " | ".join(interests)
+        wanted = self._skill_vector(self.taxonomy.extract_skills(interest_text))
+        interest_fit = (self._skills @ wanted) / max(1.0, float(wanted.sum()))
+        # Careers named by an interest, as a taxonomy role alias or by their exact title
+        for title in self.taxonomy.extract_roles(interest_text) + list(interests):
+            i = self._index.get(title.strip().lower())
+            if i is not None:
+                interest_fit[i] = 1.0
+        scores = scores + INTEREST_WEIGHT * interest_fit
+
+        if query is None and not scores.any():
+            # Nothing to rank on (no embedding, no known skill or interest)
+            return []
+        if query is not None:
+            scores = scores + self.matrix() @ _unit(np.asarray(query, dtype=np.float32))
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        have_keys = {self._skill_key(s) for s in skills}
+        out = []
+        for i in top:
+            career = self.careers[int(i)]
+            matched = [s for s in career.get("skills", []) if self._skill_key(s) in have_keys]
+            missing = [s for s in career.get("skills", []) if self._skill_key(s) not in have_keys]
+            out.append({**career, "score": round(float(scores[i]), 4), "matched": matched, "missing": missing})
+        return out
+
+
+_catalog: Optional[CareerCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_career_catalog() -> Optional[CareerCatalog]:
+    """The catalog at CAREER_CATALOG_PATH (the bundled one by default), or None when
+    CAREER_CATALOG is off or numpy is missing."""
+    global _catalog
+    if not CAREER_CATALOG or np is None:
+        return None
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CareerCatalog.from_file(
+                    CAREER_CATALOG_PATH or DEFAULT_CATALOG_PATH, get_taxonomy(), cache_dir=CHROMA_DIR
+                )
+    return _catalog
@@ -0,0 +1,80 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from .config import BLOCKING_WORKERS, PROCESS_WORKERS
+
+T = TypeVar("T")
+
+_executor = None
+_process_pool = None
+# Pools shut down on purpose by recycle_process_pool; their other callers retry
+_recycled_pools: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable (Chroma, file I/O) on the bounded executor."""
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the request's stage timings) into the thread
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # spawn: forking a process that already runs executor/Chroma threads can deadlock
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+async def run_in_process(fn: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-bound, picklable callable (e.g. PDF parsing) in the process pool."""
+    global _process_pool
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    try:
+        return await loop.run_in_executor(pool, functools.partial(fn, *args))
+    except BrokenProcessPool:
+        if pool in _recycled_pools:
+            # Killed for another caller's timeout, not by this work: run it once more
+            return await loop.run_in_executor(get_process_pool(), functools.partial(fn, *args))
+        # A worker died (e.g. OOM on a hostile PDF); start a fresh pool for later calls
+        if _process_pool is pool:
+            _process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def recycle_process_pool():
+    """Kill the pool's workers and start a fresh pool for later calls.
+
+    Cancelling an awaited `run_in_process` does not stop its worker, so a caller
+    that gives up on work that may never finish (a hung PDF) calls this to free
+    the slots. Work of other callers that was running in the old pool is retried.
+    """
+    global _process_pool
+    pool, _process_pool = _process_pool, None
+    if pool is None:
+        return
+    _recycled_pools.add(pool)
+    # ProcessPoolExecutor has no public way to stop a running task before Python 3.14
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
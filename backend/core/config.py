@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -15,11 +16,122 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")  # Optional (e.g., Azure OpenAI or OpenRouter)
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# "openai" (provider API) or "hashing" (local NumPy feature hashing, works offline)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "512"))
 CHROMA_DIR = os.getenv("CHROMA_DIR", str(DEFAULT_CHROMA_DIR))
+# "chroma" (shared collection) or "numpy" (per-user blocks in memory-mapped files)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+VECTOR_DIR = os.getenv("VECTOR_DIR", str(Path(CHROMA_DIR) / "vectors"))
 
 # Service tuning
 RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
 MAX_CTX_CHARS = int(os.getenv("MAX_CTX_CHARS", "12000"))
+# Token budget for retrieved context in recommendation prompts, optionally per model,
+# e.g. CTX_TOKEN_BUDGETS='{"gpt-4o-mini": 2000, "gpt-4o": 4000}'
+MAX_CTX_TOKENS = int(os.getenv("MAX_CTX_TOKENS", "1500"))
+CTX_TOKEN_BUDGETS = json.loads(os.getenv("CTX_TOKEN_BUDGETS", "{}") or "{}")
+# Token budget for CV text sent to the profile-extraction prompt
+PARSE_MAX_TOKENS = int(os.getenv("PARSE_MAX_TOKENS", "3000"))
+# Skill/role taxonomy (JSON; default: the bundled backend/core/skill_taxonomy.json)
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH")
+# Profile extraction: "llm" (taxonomy pre-pass + LLM) or "taxonomy" (taxonomy matcher only, no LLM call)
+PROFILE_PARSER = os.getenv("PROFILE_PARSER", "llm").lower()
+# Career catalog (JSON; the bundled backend/core/career_catalog.json when unset) that
+# recommendations choose from, and how many candidates the LLM is shown
+CAREER_CATALOG = os.getenv("CAREER_CATALOG", "1").lower() in ("1", "true", "yes")
+CAREER_CATALOG_PATH = os.getenv("CAREER_CATALOG_PATH")
+CAREER_SHORTLIST_K = int(os.getenv("CAREER_SHORTLIST_K", "5"))
+# CV chunking for multi-vector storage (tokens of EMBEDDING_MODEL's encoding)
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "60"))
+# Threads used for blocking work (Chroma, PDF parsing) off the event loop
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "8"))
+# Processes used for CPU-bound work (bulk PDF parsing)
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", str(os.cpu_count() or 2)))
+# Bulk ingestion: concurrent LLM profile extractions and docs per embed/upsert batch
+INGEST_LLM_CONCURRENCY = int(os.getenv("INGEST_LLM_CONCURRENCY", "8"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+# Content-hash ledger under CHROMA_DIR: unchanged CVs skip extraction, parsing and upserts
+INGEST_LEDGER = os.getenv("INGEST_LEDGER", "1").lower() in ("1", "true", "yes")
+# Extracted upload text is kept per user, at most this long and for this many uploads
+INGEST_LEDGER_UPLOAD_TTL_S = float(os.getenv("INGEST_LEDGER_UPLOAD_TTL_S", str(30 * 24 * 3600)))
+INGEST_LEDGER_MAX_UPLOADS = int(os.getenv("INGEST_LEDGER_MAX_UPLOADS", "10000"))
+# Parsed profiles unused for this long, and the least recently used beyond this many, are dropped
+INGEST_LEDGER_PROFILE_TTL_S = float(os.getenv("INGEST_LEDGER_PROFILE_TTL_S", str(30 * 24 * 3600)))
+INGEST_LEDGER_MAX_PROFILES = int(os.getenv("INGEST_LEDGER_MAX_PROFILES", "10000"))
+# Background jobs (`/user/upload_cv?mode=async`): workers per process (0 only enqueues),
+# seconds a claimed job is held before another worker may take it over, attempts per job,
+# how long finished jobs are kept and how often they are purged
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_LEASE_S = float(os.getenv("JOB_LEASE_S", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", str(7 * 24 * 3600)))
+JOB_PURGE_INTERVAL_S = float(os.getenv("JOB_PURGE_INTERVAL_S", "3600"))
+# A retried job waits JOB_RETRY_BASE_S, doubling per attempt up to JOB_RETRY_MAX_S
+JOB_RETRY_BASE_S = float(os.getenv("JOB_RETRY_BASE_S", "5"))
+JOB_RETRY_MAX_S = float(os.getenv("JOB_RETRY_MAX_S", "300"))
+# Upload handling and PDF extraction limits
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "100"))
+PDF_TIMEOUT_S = float(os.getenv("PDF_TIMEOUT_S", "30"))
+PDF_PAGE_BATCH = int(os.getenv("PDF_PAGE_BATCH", "4"))
+# Stop extracting pages once this much text (tokens) has been collected
+EXTRACT_MAX_TOKENS = int(os.getenv("EXTRACT_MAX_TOKENS", "20000"))
+# Embedding cache: in-process LRU size and optional SQLite tier under CHROMA_DIR
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+EMBED_CACHE_DISK = os.getenv("EMBED_CACHE_DISK", "1").lower() in ("1", "true", "yes")
+# The SQLite tier keeps at most this many vectors, each until it goes unused this long
+EMBED_CACHE_DISK_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_DISK_MAX_ENTRIES", "200000"))
+EMBED_CACHE_DISK_TTL_S = float(os.getenv("EMBED_CACHE_DISK_TTL_S", str(30 * 24 * 3600)))
+# Cross-request embedding micro-batching
+EMBED_BATCHING = os.getenv("EMBED_BATCHING", "1").lower() in ("1", "true", "yes")
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "256"))
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "100000"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+# Recommendation result cache (TTL 0 or size 0 disables it)
+REC_CACHE_TTL_S = float(os.getenv("REC_CACHE_TTL_S", "3600"))
+REC_CACHE_MAX_ENTRIES = int(os.getenv("REC_CACHE_MAX_ENTRIES", "1000"))
+# Semantic recommendation cache (opt-in): reuse the recommendation of a near-identical
+# profile when the cosine similarity of their skills/interests/summary embeddings is at
+# least the threshold; entries live in their own vector collection
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_S = float(os.getenv("SEMANTIC_CACHE_TTL_S", str(7 * 24 * 3600)))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+# Batch recommendations: users prepared per retrieval round, concurrent generations, request size
+REC_BATCH_GROUP_SIZE = int(os.getenv("REC_BATCH_GROUP_SIZE", "128"))
+REC_BATCH_CONCURRENCY = int(os.getenv("REC_BATCH_CONCURRENCY", "16"))
+REC_BATCH_MAX_ITEMS = int(os.getenv("REC_BATCH_MAX_ITEMS", "50000"))
+# Provider HTTP: one keep-alive pool shared by the chat and embedding clients
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "32"))
+# Concurrent provider calls per model, optionally per model,
+# e.g. PROVIDER_CONCURRENCY='{"gpt-4o": 4, "text-embedding-3-small": 16}'
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "16"))
+PROVIDER_CONCURRENCY = json.loads(os.getenv("PROVIDER_CONCURRENCY", "{}") or "{}")
+# Retries of rate limits, 5xx and connection errors (jittered exponential backoff)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "0.5"))
+LLM_BACKOFF_MAX_S = float(os.getenv("LLM_BACKOFF_MAX_S", "20"))
+# Circuit breaker: consecutive failures that open it, seconds until a trial call
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET_S = float(os.getenv("BREAKER_RESET_S", "30"))
+# Admission control: requests are grouped into classes by path prefix (longest match;
+# null exempts a path) and each class runs at most "limit" requests, lets up to "queue"
+# more wait "max_wait_s" for a slot and answers 503 beyond that; "timeout_s" is the
+# deadline passed down to provider calls. Both JSON settings override the defaults,
+# e.g. ADMISSION_CLASSES='{"generate": {"limit": 8}}' ADMISSION_ROUTES='{"/user/interests": "read"}'
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1").lower() in ("1", "true", "yes")
+ADMISSION_CLASSES = json.loads(os.getenv("ADMISSION_CLASSES", "{}") or "{}")
+ADMISSION_ROUTES = json.loads(os.getenv("ADMISSION_ROUTES", "{}") or "{}")
+# Open the vector store and build provider clients in the background at startup
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+# /readyz provider probe: how long a result is reused and how long a probe may take
+READY_PROBE_TTL_S = float(os.getenv("READY_PROBE_TTL_S", "30"))
+READY_PROBE_TIMEOUT_S = float(os.getenv("READY_PROBE_TIMEOUT_S", "5"))
 
 
 def ensure_dirs():
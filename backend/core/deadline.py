@@ -0,0 +1,25 @@
+import contextvars
+import time
+from typing import Optional
+
+# time.monotonic() by which the current request must be answered; None when unbounded
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("pathfinder_deadline", default=None)
+
+
+def set_deadline(at: Optional[float]) -> contextvars.Token:
+    """Bound the current context (and the tasks and threads it starts) until `at`."""
+    return _deadline.set(at)
+
+
+def reset_deadline(token: contextvars.Token):
+    _deadline.reset(token)
+
+
+def get_deadline() -> Optional[float]:
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (may be negative), or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
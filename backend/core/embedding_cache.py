@@ -0,0 +1,188 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Vector = List[float]
+
+# Rows written between two prunes of the SQLite tier; pruning sorts the whole table
+_PRUNE_EVERY = 1000
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by (model, sha256(text)).
+
+    Tier 1 is an in-process LRU bounded by `max_entries`; tier 2 is an optional
+    SQLite table of float32 blobs that survives restarts, bounded by
+    `disk_max_entries` and dropping vectors not read or written for `disk_ttl_s`.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_entries: int = 10000,
+        db_path: Optional[str] = None,
+        disk_max_entries: int = 200000,
+        disk_ttl_s: float = 30 * 24 * 3600,
+    ):
+        self.model = model
+        self.max_entries = max(0, max_entries)
+        self.disk_max_entries = max(1, disk_max_entries)
+        self.disk_ttl_s = disk_ttl_s
+        self._lru: "OrderedDict[str, Vector]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._unpruned = 0
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, key TEXT NOT NULL, vec BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (model, key))"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")]
+            if "last_used" not in columns:
+                # Caches from before the bound: their rows start their TTL now
+                self._db.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+                self._db.execute("UPDATE embeddings SET last_used = ?", (time.time(),))
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._db.commit()
+            # The first write prunes whatever a previous run left beyond the bounds
+            self._unpruned = _PRUNE_EVERY
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.api_texts = 0
+        self.api_seconds = 0.0
+        self.calls_avoided = 0
+
+    @property
+    def disk_enabled(self) -> bool:
+        return self._db is not None
+
+    def _remember(self, key: str, vec: Vector):
+        if not self.max_entries:
+            return
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _load_disk(self, keys: Sequence[str]) -> Dict[str, Vector]:
+        if self._db is None or not keys:
+            return {}
+        found: Dict[str, Vector] = {}
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            part = keys[i : i + 500]
+            rows = self._db.execute(
+                f"SELECT key, vec FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                [self.model, *part],
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        if found:
+            self._db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                [(time.time(), self.model, key) for key in found],
+            )
+            self._db.commit()
+        return found
+
+    def _prune_disk(self):
+        """Drop vectors unused for `disk_ttl_s`, then the least recently used beyond `disk_max_entries`."""
+        self._db.execute("DELETE FROM embeddings WHERE last_used < ?", (time.time() - self.disk_ttl_s,))
+        self._db.execute(
+            "DELETE FROM embeddings WHERE rowid IN"
+            " (SELECT rowid FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,),
+        )
+        self._unpruned = 0
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[List[Optional[Vector]], List[int]]:
+        """Return cached vectors aligned with `texts` (None for misses) and the miss indices."""
+        keys = [text_key(t) for t in texts]
+        vectors: List[Optional[Vector]] = [None] * len(texts)
+        with self._lock:
+            pending = []
+            for i, key in enumerate(keys):
+                vec = self._lru.get(key)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    vectors[i] = vec
+                    self.memory_hits += 1
+                else:
+                    pending.append(i)
+            if pending and self._db is not None:
+                found = self._load_disk(list({keys[i] for i in pending}))
+                still = []
+                for i in pending:
+                    vec = found.get(keys[i])
+                    if vec is not None:
+                        vectors[i] = vec
+                        self.disk_hits += 1
+                        self._remember(keys[i], vec)
+                    else:
+                        still.append(i)
+                pending = still
+            self.misses += len(pending)
+            if texts and not pending:
+                self.calls_avoided += 1
+        return vectors, pending
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Vector]):
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vec in zip(texts, vectors):
+                key = text_key(text)
+                vec = list(vec)
+                self._remember(key, vec)
+                rows.append((self.model, key, array("f", vec).tobytes(), now))
+            if self._db is not None and rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, key, vec, last_used) VALUES (?, ?, ?, ?)", rows
+                )
+                self._unpruned += len(rows)
+                if self._unpruned >= min(_PRUNE_EVERY, self.disk_max_entries):
+                    self._prune_disk()
+                self._db.commit()
+
+    def record_api_call(self, n_texts: int, seconds: float):
+        with self._lock:
+            self.api_calls += 1
+            self.api_texts += n_texts
+            self.api_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            avg_call = self.api_seconds / self.api_calls if self.api_calls else 0.0
+            return {
+                "model": self.model,
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._db is not None,
+                "disk_max_entries": self.disk_max_entries if self._db is not None else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "api_calls": self.api_calls,
+                "api_texts": self.api_texts,
+                "api_seconds": round(self.api_seconds, 4),
+                "api_calls_avoided": self.calls_avoided,
+                # Estimated from the mean observed provider round trip
+                "est_seconds_saved": round(self.calls_avoided * avg_call, 4),
+            }
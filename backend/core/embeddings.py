@@ -1,49 +1,148 @@
-from typing import List
+import asyncio
+import importlib
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from .config import (
     OPENAI_API_KEY,
     OPENAI_API_BASE,
     EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    LOCAL_EMBEDDING_DIM,
     OPENAI_MODEL,
     CHROMA_DIR,
+    EMBED_CACHE_SIZE,
+    EMBED_CACHE_DISK,
+    EMBED_CACHE_DISK_MAX_ENTRIES,
+    EMBED_CACHE_DISK_TTL_S,
+    EMBED_BATCHING,
+    EMBED_BATCH_MAX_SIZE,
+    EMBED_BATCH_MAX_TOKENS,
+    EMBED_BATCH_MAX_WAIT_MS,
+    LLM_TIMEOUT_S,
 )
+from .embedding_cache import EmbeddingCache
+from .local_embeddings import HashingEmbedder, np
+from .concurrency import run_blocking
+from .deadline import get_deadline, reset_deadline, set_deadline
+from .metrics import EMBEDDING_TEXTS, stage, timed
+from .provider import get_gate, get_http_async_client, get_http_client, within_deadline
+from .single_flight import SingleFlight
 
-# LangChain / OpenAI
-try:
-    from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-except Exception:  # pragma: no cover - allow import absence during static checks
-    OpenAIEmbeddings = None
-    ChatOpenAI = None
+# LangChain/OpenAI and Chroma take seconds to import; load them on first use so
+# the app starts serving (and answering /healthz) before they are needed
+_modules: Dict[str, Any] = {}
 
-# Chroma
-try:
-    import chromadb
-except Exception:  # pragma: no cover
-    chromadb = None
+
+def _optional_import(name: str):
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except Exception:  # pragma: no cover - allow import absence during static checks
+            _modules[name] = None
+    return _modules[name]
+
+
+def _openai_class(name: str):
+    module = _optional_import("langchain_openai")
+    return getattr(module, name, None)
 
 
 class EmbeddingNotConfigured(RuntimeError):
     pass
 
 
+EMBEDDING_BACKENDS = ("openai", "hashing")
+
+
+def embedding_model_key() -> str:
+    """Names the vector space in use; the embedding cache and collection are keyed on it."""
+    if EMBEDDING_BACKEND == "hashing":
+        return f"hashing-{LOCAL_EMBEDDING_DIM}"
+    return EMBEDDING_MODEL
+
+
+def _assert_openai_ready(client_cls):
+    if client_cls is None:
+        raise EmbeddingNotConfigured("langchain-openai not available. Install dependencies and set OPENAI_API_KEY.")
+    if not OPENAI_API_KEY:
+        raise EmbeddingNotConfigured("OPENAI_API_KEY is not set in environment/.env")
+
+
+def _assert_chroma_ready():
+    if _optional_import("chromadb") is None:
+        raise EmbeddingNotConfigured("Chroma not available. Install dependencies.")
+
+
 def _assert_emb_ready():
-    if OpenAIEmbeddings is None or chromadb is None:
+    if EMBEDDING_BACKEND not in EMBEDDING_BACKENDS:
         raise EmbeddingNotConfigured(
-            "Embeddings/Chroma not available. Install dependencies and set OPENAI_API_KEY."
+            f"Unknown EMBEDDING_BACKEND {EMBEDDING_BACKEND!r}; expected one of {', '.join(EMBEDDING_BACKENDS)}"
         )
-    if not OPENAI_API_KEY:
-        raise EmbeddingNotConfigured("OPENAI_API_KEY is not set in environment/.env")
+    if EMBEDDING_BACKEND == "hashing":
+        if np is None:
+            raise EmbeddingNotConfigured("numpy is not installed; cannot use the hashing embedder.")
+    else:
+        _assert_openai_ready(_openai_class("OpenAIEmbeddings"))
+
+
+_llm = None
+_embedder = None
+
+
+def _client_options() -> Dict[str, Any]:
+    # Both clients share one keep-alive pool; retries are left to the provider gates
+    return {
+        "api_key": OPENAI_API_KEY,
+        "base_url": OPENAI_API_BASE,
+        "request_timeout": LLM_TIMEOUT_S,
+        "max_retries": 0,
+        "http_client": get_http_client(),
+        "http_async_client": get_http_async_client(),
+    }
 
 
 def get_llm():
-    _assert_emb_ready()
-    return ChatOpenAI(model=OPENAI_MODEL, api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE, temperature=0.2)
+    # Reuse one instance: building a client (and its SSL context) costs ~50ms of CPU
+    global _llm
+    ChatOpenAI = _openai_class("ChatOpenAI")
+    _assert_openai_ready(ChatOpenAI)
+    if _llm is None:
+        _llm = ChatOpenAI(model=OPENAI_MODEL, temperature=0.2, **_client_options())
+    return _llm
 
 
 def get_embedder():
+    global _embedder
     _assert_emb_ready()
-    return OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE)
+    if _embedder is None:
+        if EMBEDDING_BACKEND == "hashing":
+            _embedder = HashingEmbedder(dim=LOCAL_EMBEDDING_DIM)
+        else:
+            _embedder = _openai_class("OpenAIEmbeddings")(model=EMBEDDING_MODEL, **_client_options())
+    return _embedder
+
+
+def load_clients():
+    """Build the chat and embedding clients now; missing configuration still surfaces on use."""
+    global _clients_loaded
+    for build in (get_llm, get_embedder):
+        try:
+            build()
+        except EmbeddingNotConfigured:
+            pass
+    _clients_loaded = True
+
+
+_clients_loaded = False
+
+
+async def aload_clients():
+    """FastAPI dependency: importing the client libraries takes seconds, so do it off the event loop."""
+    if not _clients_loaded:
+        await run_blocking(load_clients)
 
 
 _client = None
@@ -52,10 +151,10 @@ _collection = None
 
 def get_chroma_client():
     global _client
-    _assert_emb_ready()
+    _assert_chroma_ready()
     if _client is None:
         Path(CHROMA_DIR).mkdir(parents=True, exist_ok=True)
-        _client = chromadb.PersistentClient(path=CHROMA_DIR)
+        _client = _optional_import("chromadb").PersistentClient(path=CHROMA_DIR)
     return _client
 
 
@@ -63,10 +162,257 @@ def get_collection():
     global _collection
     if _collection is None:
         client = get_chroma_client()
-        _collection = client.get_or_create_collection(name="user_profiles")
+        # Other backends get their own collection: their vectors differ in space and dimension
+        name = "user_profiles" if EMBEDDING_BACKEND == "openai" else f"user_profiles_{embedding_model_key()}"
+        _collection = client.get_or_create_collection(name=name)
     return _collection
 
 
+_embedding_cache = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        # Local vectors are cheaper to recompute than to read back from disk
+        persist = EMBED_CACHE_DISK and EMBEDDING_BACKEND == "openai"
+        db_path = str(Path(CHROMA_DIR) / "embedding_cache.sqlite3") if persist else None
+        _embedding_cache = EmbeddingCache(
+            embedding_model_key(),
+            max_entries=EMBED_CACHE_SIZE,
+            db_path=db_path,
+            disk_max_entries=EMBED_CACHE_DISK_MAX_ENTRIES,
+            disk_ttl_s=EMBED_CACHE_DISK_TTL_S,
+        )
+    return _embedding_cache
+
+
+def embedding_cache_stats() -> Dict[str, Any]:
+    return get_embedding_cache().stats()
+
+
+def _fill_misses(texts: List[str], vectors: List[Optional[List[float]]], misses: List[int], unique: List[str], fresh: List[List[float]]):
+    by_text = dict(zip(unique, fresh))
+    for i in misses:
+        vectors[i] = by_text[texts[i]]
+    return vectors
+
+
+def _count_lookups(texts: List[str], misses: List[int]):
+    EMBEDDING_TEXTS.inc(len(texts) - len(misses), result="hit")
+    EMBEDDING_TEXTS.inc(len(misses), result="miss")
+
+
+@timed("embed")
 def embed_texts(texts: List[str]) -> List[List[float]]:
+    cache = get_embedding_cache()
+    vectors, misses = cache.get_many(texts)
+    _count_lookups(texts, misses)
+    if misses:
+        # Only cache misses go to the provider, each distinct text once
+        unique = list(dict.fromkeys(texts[i] for i in misses))
+        embedder = get_embedder()
+        start = time.perf_counter()
+        with stage("embed_api"):
+            if EMBEDDING_BACKEND == "openai":
+                fresh = get_gate(EMBEDDING_MODEL).call_sync(lambda: embedder.embed_documents(unique))
+            else:
+                fresh = embedder.embed_documents(unique)
+        cache.record_api_call(len(unique), time.perf_counter() - start)
+        cache.put_many(unique, fresh)
+        _fill_misses(texts, vectors, misses, unique, fresh)
+    return vectors
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into one provider call per window.
+
+    Callers enqueue texts and await their vectors. A single flusher sends a batch
+    once it holds `max_batch_size` texts or `max_tokens` estimated tokens, or
+    `max_wait_ms` after the first caller arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch_size: int = 256,
+        max_tokens: int = 100000,
+        max_wait_ms: float = 5.0,
+    ):
+        self._embed_fn = embed_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_tokens = max(1, max_tokens)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        # (texts, future, estimated tokens, caller's deadline)
+        self._pending: Deque[Tuple[List[str], asyncio.Future, int, Optional[float]]] = deque()
+        self._pending_texts = 0
+        self._pending_tokens = 0
+        self._full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # ~4 chars per token is close enough for sizing batches
+        return len(text) // 4 + 1
+
+    def _over_limit(self) -> bool:
+        return self._pending_texts >= self.max_batch_size or self._pending_tokens >= self.max_tokens
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        tokens = sum(self._estimate_tokens(t) for t in texts)
+        self._pending.append((list(texts), fut, tokens, get_deadline()))
+        self._pending_texts += len(texts)
+        self._pending_tokens += tokens
+        self.requests += 1
+        if self._over_limit():
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_loop())
+        # A caller out of time stops waiting; the batch still serves the others
+        return await within_deadline(fut, "embed")
+
+    async def _flush_loop(self):
+        while self._pending:
+            if not self._full.is_set() and self.max_wait:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            batch, deadline = self._take_batch()
+            if self._over_limit():
+                self._full.set()
+            # Send without waiting so the next window can fill while this one is in flight,
+            # bounded by the latest deadline among its callers rather than the first caller's
+            token = set_deadline(deadline)
+            try:
+                task = asyncio.get_running_loop().create_task(self._send(batch))
+            finally:
+                reset_deadline(token)
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _take_batch(self) -> Tuple[List[Tuple[List[str], asyncio.Future]], Optional[float]]:
+        batch = []
+        deadlines = []
+        n_texts = 0
+        n_tokens = 0
+        while self._pending:
+            texts, fut, tokens, deadline = self._pending[0]
+            # A single oversized request still goes out, alone
+            if batch and (n_texts + len(texts) > self.max_batch_size or n_tokens + tokens > self.max_tokens):
+                break
+            self._pending.popleft()
+            batch.append((texts, fut))
+            deadlines.append(deadline)
+            n_texts += len(texts)
+            n_tokens += tokens
+        self._pending_texts -= n_texts
+        self._pending_tokens -= n_tokens
+        return batch, (None if None in deadlines else max(deadlines, default=None))
+
+    async def _send(self, batch: List[Tuple[List[str], asyncio.Future]]):
+        unique = list(dict.fromkeys(t for texts, _ in batch for t in texts))
+        try:
+            fresh = await self._embed_fn(unique)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        self.batches += 1
+        self.texts += len(unique)
+        by_text = dict(zip(unique, fresh))
+        for texts, fut in batch:
+            if not fut.done():
+                fut.set_result([by_text[t] for t in texts])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "pending": self._pending_texts,
+        }
+
+
+async def _provider_aembed(texts: List[str]) -> List[List[float]]:
     embedder = get_embedder()
-    return embedder.embed_documents(texts)
+    start = time.perf_counter()
+    with stage("embed_api"):
+        if EMBEDDING_BACKEND == "openai":
+            fresh = await get_gate(EMBEDDING_MODEL).call(lambda: embedder.aembed_documents(texts))
+        else:
+            fresh = await embedder.aembed_documents(texts)
+    get_embedding_cache().record_api_call(len(texts), time.perf_counter() - start)
+    return fresh
+
+
+_batcher = None
+_batcher_loop = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """One batcher per event loop (uvicorn runs one; CLI tools may start several)."""
+    global _batcher, _batcher_loop
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher_loop is not loop:
+        _batcher = EmbeddingBatcher(
+            _provider_aembed,
+            max_batch_size=EMBED_BATCH_MAX_SIZE,
+            max_tokens=EMBED_BATCH_MAX_TOKENS,
+            max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+        )
+        _batcher_loop = loop
+    return _batcher
+
+
+def embedding_batcher_stats() -> Dict[str, Any]:
+    return _batcher.stats() if _batcher is not None else {}
+
+
+async def _fetch_embeddings(texts: List[str]) -> List[List[float]]:
+    # Batching only pays off against a remote provider
+    if EMBED_BATCHING and EMBEDDING_BACKEND == "openai":
+        return await get_embedding_batcher().embed(texts)
+    return await _provider_aembed(texts)
+
+
+# Identical concurrent misses (e.g. a retried request) share one provider call
+_embed_flight = SingleFlight("embed")
+
+
+async def _fetch_and_cache(texts: List[str]) -> List[List[float]]:
+    fresh = await _fetch_embeddings(texts)
+    # Cached before the flight ends, so a caller missing the cache just as it ends
+    # finds them there instead of starting another provider call
+    cache = get_embedding_cache()
+    if cache.disk_enabled:
+        await run_blocking(cache.put_many, texts, fresh)
+    else:
+        cache.put_many(texts, fresh)
+    return fresh
+
+
+@timed("embed")
+async def aembed_texts(texts: List[str]) -> List[List[float]]:
+    cache = get_embedding_cache()
+    if cache.disk_enabled:
+        vectors, misses = await run_blocking(cache.get_many, texts)
+    else:
+        vectors, misses = cache.get_many(texts)
+    _count_lookups(texts, misses)
+    if misses:
+        unique = list(dict.fromkeys(texts[i] for i in misses))
+        fresh, _ = await _embed_flight.do(tuple(unique), lambda: _fetch_and_cache(unique))
+        _fill_misses(texts, vectors, misses, unique, fresh)
+    return vectors
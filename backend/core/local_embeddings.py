@@ -0,0 +1,82 @@
+import hashlib
+import re
+from typing import Dict, List
+
+from .concurrency import run_blocking
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+_TOKEN_RE = re.compile(r"[\w+#]+")
+# Bound on memoized feature -> bucket entries; the map is reset once it is full
+_MAX_CACHED_FEATURES = 500000
+
+
+class HashingEmbedder:
+    """Local, stateless feature-hashing embedder with the LangChain embeddings interface.
+
+    Word unigrams and bigrams are hashed (blake2b, stable across processes and
+    restarts) into `dim` signed buckets, weighted by sublinear term frequency
+    and L2-normalized. There is no fitted vocabulary or IDF, so vectors stored
+    earlier stay comparable with new ones.
+    """
+
+    def __init__(self, dim: int = 512, bigram_weight: float = 0.5):
+        if np is None:
+            raise RuntimeError("numpy is not installed; cannot use the hashing embedder.")
+        self.dim = max(8, dim)
+        self.bigram_weight = bigram_weight
+        # feature -> (bucket + 1) * sign
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, feature: str) -> int:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            bucket = ((h >> 1) % self.dim + 1) * (1 if h & 1 else -1)
+            if len(self._buckets) >= _MAX_CACHED_FEATURES:
+                self._buckets.clear()
+            self._buckets[feature] = bucket
+        return bucket
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """Embed a batch into an (n, dim) float32 array of unit rows (zero rows for empty texts)."""
+        rows: List[int] = []
+        buckets: List[int] = []
+        weights: List[float] = []
+        bucket = self._bucket
+        for r, text in enumerate(texts):
+            words = _TOKEN_RE.findall((text or "").lower())
+            unigrams = [bucket(w) for w in words]
+            bigrams = [bucket(a + " " + b) for a, b in zip(words, words[1:])]
+            rows.extend([r] * (len(unigrams) + len(bigrams)))
+            buckets.extend(unigrams)
+            buckets.extend(bigrams)
+            weights.extend([1.0] * len(unigrams))
+            weights.extend([self.bigram_weight] * len(bigrams))
+
+        n = len(texts)
+        if not buckets:
+            return np.zeros((n, self.dim), dtype=np.float32)
+        signed = np.asarray(buckets, dtype=np.int64)
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + (np.abs(signed) - 1)
+        counts = np.bincount(flat, weights=np.sign(signed) * np.asarray(weights), minlength=n * self.dim)
+        matrix = counts.reshape(n, self.dim)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await run_blocking(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
@@ -0,0 +1,371 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from .config import OPENAI_MODEL
+from .tokens import count_tokens
+
+# Default latency buckets (seconds): cache hits through multi-second LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Cosine similarity of semantic cache lookups, finest near the usual thresholds
+SIMILARITY_BUCKETS = (0.5, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.95, 0.96, 0.97, 0.98, 0.99, 0.995, 1.0)
+# Background jobs wait and run for minutes, not milliseconds
+JOB_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+LabelValues = Tuple[str, ...]
+T = TypeVar("T")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics plus collector callbacks that render values owned elsewhere."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn: Callable[[], List[str]]):
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            try:
+                lines.extend(fn())
+            except Exception:
+                continue
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labelnames))
+
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+HTTP_REQUEST_SECONDS = histogram(
+    "pathfinder_http_request_duration_seconds", "HTTP request latency until the response starts.", ("method", "route", "status")
+)
+HTTP_INFLIGHT = gauge("pathfinder_http_requests_inflight", "HTTP requests being handled.")
+STAGE_SECONDS = histogram("pathfinder_stage_duration_seconds", "Latency of internal pipeline stages.", ("stage",))
+STAGE_INFLIGHT = gauge("pathfinder_stage_inflight", "Pipeline stages currently running.", ("stage",))
+STAGE_ERRORS = counter("pathfinder_stage_errors_total", "Pipeline stages that raised.", ("stage",))
+LLM_TOKENS = counter("pathfinder_llm_tokens_total", "LLM tokens by operation and direction (in/out).", ("op", "direction"))
+EMBEDDING_TEXTS = counter("pathfinder_embedding_texts_total", "Texts embedded, by cache result (hit/miss).", ("result",))
+VECTOR_UPSERT_ROWS = counter("pathfinder_vector_upsert_rows_total", "Rows written to the vector store.")
+PDF_PAGES = counter("pathfinder_pdf_pages_total", "PDF pages extracted.")
+PROVIDER_RETRIES = counter("pathfinder_provider_retries_total", "Provider calls retried after a retryable error.", ("model",))
+PROVIDER_CIRCUIT_OPEN = gauge("pathfinder_provider_circuit_open", "1 while the model's circuit breaker rejects calls.", ("model",))
+SINGLE_FLIGHT_CALLS = counter(
+    "pathfinder_singleflight_calls_total", "Calls through single-flight groups: leaders ran the work, followers shared it.", ("group", "role")
+)
+DEGRADED_RESPONSES = counter(
+    "pathfinder_degraded_responses_total", "Answers from the rule-based fallbacks while the provider was unavailable.", ("op",)
+)
+JOB_WAIT_SECONDS = histogram(
+    "pathfinder_job_wait_seconds", "Time background jobs spent queued before a worker started them.", ("kind",), JOB_BUCKETS
+)
+JOB_RUN_SECONDS = histogram("pathfinder_job_run_seconds", "Time background jobs took once started.", ("kind",), JOB_BUCKETS)
+JOB_LATENCY_SECONDS = histogram(
+    "pathfinder_job_latency_seconds", "Time from enqueue to completion of background jobs.", ("kind",), JOB_BUCKETS
+)
+JOB_RUNS = counter("pathfinder_job_runs_total", "Background job runs by outcome: done, failed, retried or unrecorded.", ("kind", "status"))
+SEMANTIC_CACHE_LOOKUPS = counter(
+    "pathfinder_semantic_cache_lookups_total", "Semantic recommendation cache lookups by result (hit/miss).", ("result",)
+)
+SEMANTIC_CACHE_SIMILARITY = histogram(
+    "pathfinder_semantic_cache_similarity",
+    "Cosine similarity of the closest semantic cache entry per lookup (hits and misses).",
+    buckets=SIMILARITY_BUCKETS,
+)
+ADMISSION_ACTIVE = gauge("pathfinder_admission_active", "Requests holding an admission slot, by class.", ("route_class",))
+ADMISSION_WAITING = gauge("pathfinder_admission_waiting", "Requests waiting for an admission slot, by class.", ("route_class",))
+ADMISSION_WAIT_SECONDS = histogram(
+    "pathfinder_admission_wait_seconds", "Time admitted requests waited for a slot.", ("route_class",)
+)
+ADMISSION_REJECTED = counter(
+    "pathfinder_admission_rejected_total", "Requests shed with 503, by class and reason (queue_full, wait_timeout).", ("route_class", "reason")
+)
+
+# Per-request stage timings for the Server-Timing header: [(stage, seconds)]
+_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "pathfinder_timings", default=None
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block: latency histogram, in-flight gauge and the request's Server-Timing."""
+    STAGE_INFLIGHT.inc(stage=name)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        STAGE_INFLIGHT.dec(stage=name)
+        _observe_stage(name, time.perf_counter() - start)
+
+
+def _observe_stage(name: str, elapsed: float):
+    STAGE_SECONDS.observe(elapsed, stage=name)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((name, elapsed))
+
+
+async def timed_iter(name: str, items: AsyncIterator[T]) -> AsyncIterator[T]:
+    """`stage` for an async iterator: only the waits for its items are timed, not the
+    consumer's work between them (e.g. writing streamed chunks to a slow client)."""
+    STAGE_INFLIGHT.inc(stage=name)
+    elapsed = 0.0
+    iterator = items.__aiter__()
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    except Exception:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        STAGE_INFLIGHT.dec(stage=name)
+        _observe_stage(name, elapsed)
+
+
+def timed(name: str):
+    """Decorator form of `stage` for sync and async functions."""
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record_llm_usage(op: str, msg: Any, prompt_tokens: Optional[int] = None):
+    """Count tokens from a LangChain message's usage metadata, else from estimates.
+
+    `msg` may also be the raw output text (streaming responses carry no usage).
+    """
+    usage = getattr(msg, "usage_metadata", None) or {}
+    tokens_in = usage.get("input_tokens") or prompt_tokens
+    if tokens_in:
+        LLM_TOKENS.inc(tokens_in, op=op, direction="in")
+    tokens_out = usage.get("output_tokens")
+    if not tokens_out:
+        content = msg if isinstance(msg, str) else getattr(msg, "content", "")
+        tokens_out = count_tokens(content, OPENAI_MODEL) if isinstance(content, str) and content else 0
+    if tokens_out:
+        LLM_TOKENS.inc(tokens_out, op=op, direction="out")
+
+
+def sample(name: str, kind: str, help: str, value: float) -> List[str]:
+    """Exposition lines for a single unlabelled value (for registry collectors)."""
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_num(value)}"]
+
+
+def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    """Stages summed by name in first-seen order, e.g. `embed;dur=12.1, llm_parse;dur=803.4, total;dur=820.0`."""
+    sums: Dict[str, float] = {}
+    for name, seconds in timings:
+        sums[name] = sums.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in sums.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _route_label(scope) -> str:
+    """The matched route template (bounded label cardinality), or "unmatched"."""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    # Routes of a router included with a prefix may report only their own path
+    path = scope.get("path", "")
+    extra = path.rstrip("/").count("/") - template.rstrip("/").count("/")
+    if extra > 0:
+        template = "/".join(path.split("/")[: extra + 1]) + template
+    return template
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request latency/in-flight metrics and a Server-Timing header.
+
+    The header carries the stages finished before the response starts; stages of
+    a streamed body still reach the histograms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings: List[Tuple[str, float]] = []
+        token = _timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=_route_label(scope), status=str(message["status"]))
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, elapsed).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_INFLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_INFLIGHT.dec()
+            _timings.reset(token)
@@ -0,0 +1,341 @@
+import asyncio
+import email.utils
+import random
+import sys
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from .config import (
+    BREAKER_FAILURES,
+    BREAKER_RESET_S,
+    LLM_BACKOFF_BASE_S,
+    LLM_BACKOFF_MAX_S,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_MAX_RETRIES,
+    PROVIDER_CONCURRENCY,
+    PROVIDER_MAX_CONCURRENCY,
+)
+from .deadline import remaining
+from .metrics import PROVIDER_CIRCUIT_OPEN, PROVIDER_RETRIES
+
+T = TypeVar("T")
+
+
+class ProviderUnavailable(RuntimeError):
+    """The provider is failing (circuit open or retries exhausted); callers degrade or answer 503."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(ProviderUnavailable):
+    """The request's deadline passed before the provider answered; callers degrade or answer 504."""
+
+
+def check_deadline(what: str) -> Optional[float]:
+    """Seconds left before the request's deadline (None without one); raises once it has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"{what}: request deadline exceeded")
+    return left
+
+
+async def within_deadline(aw: Awaitable[T], what: str) -> T:
+    """Await `aw`, cancelling it and raising DeadlineExceeded if the request's deadline passes first."""
+    try:
+        left = check_deadline(what)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise
+    if left is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"{what}: request deadline exceeded") from None
+
+
+_http_client = None
+_http_async_client = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_HTTP_MAX_CONNECTIONS, max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE)
+
+
+def get_http_client() -> httpx.Client:
+    """Keep-alive pool shared by the sync chat and embedding clients."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(limits=_limits())
+    return _http_client
+
+
+def get_http_async_client() -> httpx.AsyncClient:
+    global _http_async_client
+    if _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(limits=_limits())
+    return _http_async_client
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and connection failures; not bad requests."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    # openai and requests are imported lazily; an exception from one means it is loaded.
+    # requests' connection errors and timeouts do not derive from the builtin ones
+    openai = sys.modules.get("openai")
+    if openai is not None and isinstance(exc, openai.APIConnectionError):
+        return True
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status = _status_code(exc)
+    return status is not None and (status in (408, 409, 429) or status >= 500)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from the response's `retry-after-ms` / `Retry-After` (delta or HTTP date) headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000.0)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def backoff_delay(attempt: int, server_delay: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server-requested delay is a lower bound."""
+    delay = random.uniform(0.0, min(LLM_BACKOFF_MAX_S, LLM_BACKOFF_BASE_S * (2 ** attempt)))
+    if server_delay is not None:
+        delay = max(delay, server_delay)
+    return delay
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout_s`; then lets one trial call through (half-open), which closes
+    it again on success or re-opens it on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout_s:
+                return "open"
+            return "half_open"
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout_s - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout_s:
+                return False
+            # Half-open: this call is the trial; the rest wait out another window
+            # (so a trial that never reports back cannot keep the breaker stuck)
+            self._opened_at = now
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+        PROVIDER_CIRCUIT_OPEN.set(0, model=self.name)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+            opened = self._opened_at is not None
+        if opened:
+            PROVIDER_CIRCUIT_OPEN.set(1, model=self.name)
+
+
+class ProviderGate:
+    """Per-model concurrency limit, retries with backoff and a circuit breaker.
+
+    The limit applies separately to async callers (an asyncio semaphore per event
+    loop) and to sync callers on worker threads.
+    """
+
+    def __init__(self, model: str, limit: int):
+        self.model = model
+        self.limit = max(1, limit)
+        self.breaker = CircuitBreaker(model, BREAKER_FAILURES, BREAKER_RESET_S)
+        self._sync_semaphore = threading.BoundedSemaphore(self.limit)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _admit(self):
+        if not self.breaker.allow():
+            retry_in = self.breaker.retry_after()
+            raise ProviderUnavailable(f"{self.model}: circuit open, retry in {retry_in:.1f}s", retry_after=retry_in or None)
+
+    def _failed(self, exc: BaseException, attempt: int) -> float:
+        """Record a failed attempt; the delay before the next one, or raise when giving up."""
+        if not is_retryable(exc):
+            # The provider answered; the request itself was bad
+            self.breaker.record_success()
+            raise exc
+        self.breaker.record_failure()
+        server_delay = retry_after(exc)
+        if attempt >= LLM_MAX_RETRIES or (server_delay is not None and server_delay > LLM_BACKOFF_MAX_S):
+            raise ProviderUnavailable(f"{self.model}: {type(exc).__name__}: {exc}", retry_after=server_delay) from exc
+        delay = backoff_delay(attempt, server_delay)
+        left = remaining()
+        if left is not None and delay >= left:
+            # The retry could not finish in time anyway
+            raise DeadlineExceeded(f"{self.model}: {type(exc).__name__}: {exc}; no time left to retry") from exc
+        PROVIDER_RETRIES.inc(model=self.model)
+        return delay
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]]) -> T:
+        # Waiting for a slot and the call itself both count against the request's deadline
+        semaphore = self._async_semaphore()
+        await within_deadline(semaphore.acquire(), self.model)
+        try:
+            return await within_deadline(fn(), self.model)
+        finally:
+            semaphore.release()
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            self._admit()
+            try:
+                result = await self._attempt(fn)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._failed(e, attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def call_sync(self, fn: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            self._admit()
+            # A blocking call cannot be interrupted; the deadline bounds the wait for a slot and retries
+            left = check_deadline(self.model)
+            if not self._sync_semaphore.acquire(timeout=left):
+                raise DeadlineExceeded(f"{self.model}: request deadline exceeded")
+            try:
+                try:
+                    result = fn()
+                finally:
+                    self._sync_semaphore.release()
+            except Exception as e:
+                time.sleep(self._failed(e, attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Iterate a streaming call; it is retried, and bound by the request's deadline,
+        only until the first chunk arrives."""
+        attempt = 0
+        while True:
+            self._admit()
+            started = False
+            try:
+                semaphore = self._async_semaphore()
+                await within_deadline(semaphore.acquire(), self.model)
+                try:
+                    stream = fn().__aiter__()
+                    try:
+                        first = await within_deadline(stream.__anext__(), self.model)
+                    except StopAsyncIteration:
+                        pass
+                    else:
+                        started = True
+                        self.breaker.record_success()
+                        yield first
+                        async for item in stream:
+                            yield item
+                finally:
+                    semaphore.release()
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if started:
+                    raise
+                await asyncio.sleep(self._failed(e, attempt))
+                attempt += 1
+                continue
+            if not started:
+                self.breaker.record_success()
+            return
+
+
+_gates: Dict[str, ProviderGate] = {}
+_gates_lock = threading.Lock()
+
+
+def get_gate(model: str) -> ProviderGate:
+    with _gates_lock:
+        gate = _gates.get(model)
+        if gate is None:
+            limit = int(PROVIDER_CONCURRENCY.get(model, PROVIDER_MAX_CONCURRENCY))
+            gate = _gates[model] = ProviderGate(model, limit)
+    return gate
+
+
+def gate_stats() -> Dict[str, Any]:
+    with _gates_lock:
+        gates = list(_gates.values())
+    return {g.model: {"limit": g.limit, "circuit": g.breaker.state} for g in gates}
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from .metrics import SINGLE_FLIGHT_CALLS
+from .provider import within_deadline
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one task.
+
+    The first caller for a key (the leader) starts the work; callers arriving
+    while it runs (followers) await the same task and get the same result or
+    exception. Nothing is kept once the task finishes. A caller that is
+    cancelled, or a follower whose request deadline passes, does not cancel the
+    shared task.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run `fn()` once per in-flight key; returns (result, shared), shared being
+        True for followers. Results are handed to every caller as-is, not copied.
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, role="follower")
+        else:
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, role="leader")
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        if shared:
+            # The leader's deadline already bounds the work; a follower may have less time
+            return await within_deadline(asyncio.shield(task), self.name), shared
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def inflight(self) -> int:
+        return len(self._tasks)
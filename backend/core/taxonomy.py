@@ -0,0 +1,237 @@
+import hashlib
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import SKILL_TAXONOMY_PATH
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "skill_taxonomy.json"
+
+# (start, end, canonical name, kind) in token offsets, kind being "skill" or "role"
+Match = Tuple[int, int, str, str]
+
+
+# Words, and every other non-space character on its own: "node.js" -> node . js
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _normalize(term: str) -> str:
+    return " ".join(tokenize(term))
+
+
+def leftmost_longest(matches: Iterable[Tuple[int, int, Any]]) -> List[Tuple[int, int, Any]]:
+    picked = []
+    last_end = 0
+    for start, end, value in sorted(matches, key=lambda m: (m[0], m[0] - m[1])):
+        if start >= last_end:
+            picked.append((start, end, value))
+            last_end = end
+    return picked
+
+
+class AhoCorasick:
+    """Case-insensitive multi-pattern matcher over word tokens.
+
+    Patterns and text are split into tokens (words, and each punctuation mark on
+    its own), and an Aho-Corasick automaton over those tokens finds every pattern
+    in one pass over the text, whatever the number of patterns. Matching whole
+    tokens means "java" never matches inside "javascript", while "c++" and
+    ".net" still match next to punctuation; any whitespace separates words.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per node: (pattern length in tokens, value) of every pattern ending there
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value: Any):
+        tokens = tokenize(pattern)
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(tokens), value))
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge each node's suffix outputs."""
+        queue = list(self._goto[0].values())
+        i = 0
+        while i < len(queue):
+            node = queue[i]
+            i += 1
+            for token, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """All (start, end, value) matches in token offsets, overlapping ones included."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, token in enumerate(tokenize(text)):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if out[node]:
+                for length, value in out[node]:
+                    yield i + 1 - length, i + 1, value
+
+    def find(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Leftmost-longest, non-overlapping matches ("node.js" wins over "js")."""
+        return leftmost_longest(self.iter_matches(text))
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+
+class SkillTaxonomy:
+    """Skills and roles with their aliases, compiled into one matcher.
+
+    `skills` maps a canonical skill name to its aliases; `roles` maps a role to
+    {"aliases": [...], "skills": [...]}, the skills that point to it. Aliases are
+    matched as written (case-insensitive, whole words); a canonical name is only
+    matched in text when listed among its aliases, so "Go" or "R" are not
+    picked out of ordinary prose.
+    """
+
+    def __init__(self, skills: Dict[str, List[str]], roles: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        self.skills = dict(skills)
+        self.roles = dict(roles or {})
+        # Identifies this taxonomy's content, e.g. in keys of results derived from it
+        self.fingerprint = hashlib.sha256(
+            json.dumps([self.skills, self.roles], sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        self._matcher = AhoCorasick()
+        self._names: Dict[str, str] = {}
+        seen = set()
+        for kind, entries in (("skill", self.skills), ("role", self.roles)):
+            for name, spec in entries.items():
+                aliases = spec.get("aliases", []) if kind == "role" else spec
+                self._names.setdefault(_normalize(name), name)
+                for alias in aliases:
+                    key = _normalize(alias)
+                    # An alias listed twice belongs to its first entry
+                    if key and (kind, key) not in seen:
+                        seen.add((kind, key))
+                        self._matcher.add(key, (name, kind))
+                        if kind == "skill":
+                            self._names.setdefault(key, name)
+        for role, spec in self.roles.items():
+            unknown = [s for s in spec.get("skills", []) if s not in self.skills]
+            if unknown:
+                raise ValueError(f"role {role!r} lists unknown skills: {', '.join(unknown)}")
+        self._matcher.build()
+
+    @classmethod
+    def from_file(cls, path) -> "SkillTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("skills", {}), data.get("roles", {}))
+
+    def find(self, text: str) -> List[Match]:
+        """Skill and role mentions; each kind is resolved on its own, so the role
+        "machine learning engineer" still yields the skill "machine learning".
+        """
+        by_kind: Dict[str, list] = {"skill": [], "role": []}
+        for start, end, (name, kind) in self._matcher.iter_matches(text or ""):
+            by_kind[kind].append((start, end, name))
+        found = [(s, e, name, kind) for kind, ms in by_kind.items() for s, e, name in leftmost_longest(ms)]
+        return sorted(found)
+
+    def _ranked(self, text: str, kind: str) -> List[str]:
+        counts: Counter = Counter()
+        first: Dict[str, int] = {}
+        for start, _, name, k in self.find(text):
+            if k == kind:
+                counts[name] += 1
+                first.setdefault(name, start)
+        # Most mentioned first, ties in order of appearance
+        return sorted(counts, key=lambda name: (-counts[name], first[name]))
+
+    def extract_skills(self, text: str) -> List[str]:
+        """Canonical skills mentioned in `text`, most mentioned first."""
+        return self._ranked(text, "skill")
+
+    def extract_roles(self, text: str) -> List[str]:
+        return self._ranked(text, "role")
+
+    def canonical_skill(self, skill: str) -> Optional[str]:
+        """Canonical name of a skill string (e.g. from the LLM), or None if unknown."""
+        key = _normalize(skill)
+        name = self._names.get(key)
+        if name is not None and name in self.skills:
+            return name
+        found = self.extract_skills(skill)
+        return found[0] if len(found) == 1 else None
+
+    def normalize_skills(self, skills: Iterable[str]) -> List[str]:
+        """Canonical names where known, other skills kept as given; duplicates dropped."""
+        out: List[str] = []
+        seen = set()
+        for skill in skills:
+            name = self.canonical_skill(skill) or skill.strip()
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                out.append(name)
+        return out
+
+    def rank_roles(self, skills: Iterable[str], interests: Iterable[str] = ()) -> List[Tuple[str, List[str], List[str]]]:
+        """Roles ordered by fit as (role, matched skills, missing skills).
+
+        A role scores one point per matched skill and two per interest naming the
+        role or one of its skills; ties keep taxonomy order. Roles without any
+        match are left out.
+        """
+        have = {self.canonical_skill(s) or s for s in skills}
+        interest_text = " | ".join(interests)
+        wanted_skills = set(self.extract_skills(interest_text))
+        wanted_roles = set(self.extract_roles(interest_text))
+        ranked = []
+        for order, (role, spec) in enumerate(self.roles.items()):
+            role_skills = spec.get("skills", [])
+            matched = [s for s in role_skills if s in have]
+            score = len(matched) + 2 * (len(wanted_skills.intersection(role_skills)) + (role in wanted_roles))
+            if score:
+                missing = [s for s in role_skills if s not in have]
+                ranked.append((-score, order, role, matched, missing))
+        ranked.sort()
+        return [(role, matched, missing) for _, _, role, matched, missing in ranked]
+
+
+_taxonomy: Optional[SkillTaxonomy] = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    """The taxonomy at SKILL_TAXONOMY_PATH (the bundled one by default), compiled once."""
+    global _taxonomy
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                _taxonomy = SkillTaxonomy.from_file(SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
+    return _taxonomy
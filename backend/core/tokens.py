@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except Exception:  # pragma: no cover
+    tiktoken = None
+
+# Rough chars-per-token ratio used when tiktoken (or its encoding files) is unavailable
+_CHARS_PER_TOKEN = 4
+
+_encodings: Dict[str, object] = {}
+
+
+def get_encoding(model: Optional[str] = None):
+    """Return the tiktoken encoding for `model` (cl100k_base by default), or None offline."""
+    key = model or ""
+    if key not in _encodings:
+        enc = None
+        if tiktoken is not None:
+            try:
+                enc = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+            except KeyError:
+                try:
+                    enc = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    enc = None
+            except Exception:
+                # Encoding files are downloaded on first use; air-gapped hosts fall back
+                enc = None
+        _encodings[key] = enc
+    return _encodings[key]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    enc = get_encoding(model)
+    if enc is None:
+        return len(text) // _CHARS_PER_TOKEN + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def split_by_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """Split `text` into pieces of at most `max_tokens` tokens at word boundaries; only words
+    longer than a piece are cut inside."""
+    max_tokens = max(1, max_tokens)
+    enc = get_encoding(model)
+    words: List[Tuple[str, int]] = []
+    for word in text.split():
+        if enc is not None:
+            # Counted with the space that joins it to the previous word
+            ids = enc.encode(" " + word, disallowed_special=())
+            parts = [ids[i : i + max_tokens] for i in range(0, len(ids), max_tokens)]
+            words.extend((enc.decode(p).strip(), len(p)) for p in parts)
+        else:
+            max_chars = max_tokens * _CHARS_PER_TOKEN
+            parts = [word[i : i + max_chars] for i in range(0, len(word), max_chars)]
+            words.extend((p, len(p) // _CHARS_PER_TOKEN + 1) for p in parts)
+    pieces, current, size = [], [], 0
+    for word, cost in words:
+        if not word:
+            continue
+        if current and size + cost > max_tokens:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        current.append(word)
+        size += cost
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut `text` to at most `max_tokens` tokens, backing up to a sentence end when one is close."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    enc = get_encoding(model)
+    if enc is not None:
+        cut = enc.decode(enc.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        # The estimate counts len // 4 + 1, so one char less than a full budget
+        cut = text[: max(0, max_tokens * _CHARS_PER_TOKEN - 1)]
+    end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    # Only back up when it keeps most of the budget
+    if end > len(cut) * 0.8:
+        cut = cut[: end + 1]
+    return cut.strip()
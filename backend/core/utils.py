@@ -1,6 +1,9 @@
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Tuple
 import re
 
+from .config import CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, EMBEDDING_MODEL
+from .tokens import count_tokens, split_by_tokens
+
 
 def clean_text(text: str) -> str:
     if not text:
@@ -10,12 +13,79 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
-def chunk_text(text: str, max_chars: int = 3000) -> List[str]:
-    text = text or ""
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = min(start + max_chars, len(text))
-        chunks.append(text[start:end])
-        start = end
-    return chunks if chunks else [text]
+# Common CV section headings; matched in upper case anywhere or in any case before a colon
+SECTION_HEADINGS = (
+    "summary", "profile", "objective", "about me",
+    "experience", "work experience", "professional experience", "employment history", "employment",
+    "education", "skills", "technical skills", "core competencies",
+    "projects", "certifications", "publications", "awards", "languages", "interests", "volunteering",
+)
+_HEADINGS = sorted(SECTION_HEADINGS, key=len, reverse=True)
+_SECTION_RE = re.compile(
+    r"(?:^|(?<=\s))(?:(?i:" + "|".join(re.escape(h) for h in _HEADINGS) + r")\s*:"
+    r"|(?:" + "|".join(re.escape(h.upper()) for h in _HEADINGS) + r")\b)"
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+|\s+(?=[•▪●‣]\s)")
+
+
+def split_sections(text: str) -> List[str]:
+    """Split cleaned CV text at section headings (EXPERIENCE, Education:, ...)."""
+    starts = [m.start() for m in _SECTION_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts = [0] + starts
+    bounds = zip(starts, starts[1:] + [len(text)])
+    return [text[a:b].strip() for a, b in bounds if text[a:b].strip()]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    model: Optional[str] = EMBEDDING_MODEL,
+) -> List[str]:
+    """Split text into chunks of at most ~`max_tokens` tokens.
+
+    Chunks break at sentence boundaries and start afresh at section headings
+    (unless the running chunk is still small). Consecutive chunks within a
+    section share up to `overlap_tokens` of trailing sentences. Sentences longer
+    than a chunk are hard-split on token boundaries.
+    """
+    text = clean_text(text)
+    if not text:
+        return [text]
+    max_tokens = max(16, max_tokens)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    chunks: List[str] = []
+    current: List[Tuple[str, int]] = []
+    size = 0
+    for section in split_sections(text):
+        if current and size >= max_tokens // 4:
+            chunks.append(" ".join(s for s, _ in current))
+            current, size = [], 0
+        for sentence in _SENTENCE_RE.split(section):
+            if not sentence:
+                continue
+            n = count_tokens(sentence, model)
+            pieces = [(sentence, n)] if n <= max_tokens else [
+                (p, count_tokens(p, model)) for p in split_by_tokens(sentence, max_tokens, model)
+            ]
+            for piece, n in pieces:
+                if current and size + n > max_tokens:
+                    chunks.append(" ".join(s for s, _ in current))
+                    # Carry trailing sentences forward as overlap
+                    carry: List[Tuple[str, int]] = []
+                    carried = 0
+                    for s, k in reversed(current):
+                        if carried + k > overlap_tokens:
+                            break
+                        carry.insert(0, (s, k))
+                        carried += k
+                    while carry and carried + n > max_tokens:
+                        carried -= carry.pop(0)[1]
+                    current, size = carry, carried
+                current.append((piece, n))
+                size += n
+    if current:
+        chunks.append(" ".join(s for s, _ in current))
+    return chunks
@@ -0,0 +1,414 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import VECTOR_BACKEND, VECTOR_DIR
+from .embeddings import get_chroma_client, get_collection, embedding_model_key, EmbeddingNotConfigured
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
+
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+
+class VectorStore(ABC):
+    """Per-user document vectors: what StorageService needs from a vector database.
+
+    Query results are dicts with id, document, metadata and distance (smaller is
+    closer). Metadata always carries `user_id`.
+    """
+
+    @abstractmethod
+    def upsert(self, ids: List[str], texts: List[str], metas: List[Dict[str, Any]], embs: List[List[float]]):
+        ...
+
+    @abstractmethod
+    def query(self, user_id: str, embedding: List[float], top_k: int) -> List[Dict]:
+        ...
+
+    def query_many(self, user_ids: List[str], embeddings: List[List[float]], top_k: int) -> List[List[Dict]]:
+        """`query` for aligned lists of users and embeddings."""
+        return [self.query(user_id, emb, top_k) for user_id, emb in zip(user_ids, embeddings)]
+
+    @abstractmethod
+    def get_metadata(self, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Metadata aligned with `ids` (None where the id does not exist)."""
+
+    @abstractmethod
+    def doc_ids(self, user_ids: List[str], doc_type: Optional[str] = None) -> List[str]:
+        ...
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        ...
+
+    def count(self, user_id: str) -> int:
+        return len(self.doc_ids([user_id]))
+
+    def warm(self):
+        """Load the index into memory ahead of the first query."""
+
+
+class ChromaVectorStore(VectorStore):
+    """The shared Chroma collection, searched with a `user_id` metadata filter."""
+
+    def __init__(self, collection=None):
+        self.collection = collection if collection is not None else get_collection()
+
+    def warm(self):
+        # The HNSW segment is read from disk by the first query
+        embs = self.collection.peek(1).get("embeddings")
+        if embs is not None and len(embs):
+            self.collection.query(query_embeddings=[embs[0]], n_results=1)
+
+    def upsert(self, ids, texts, metas, embs):
+        self.collection.upsert(
+            ids=ids,
+            documents=texts,
+            metadatas=metas,
+            embeddings=embs,
+        )
+
+    def query(self, user_id, embedding, top_k):
+        res = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=top_k,
+            where={"user_id": user_id},
+        )
+        # Normalize result into list of dicts
+        results: List[Dict] = []
+        for i in range(len(res.get("ids", [[]])[0])):
+            results.append(
+                {
+                    "id": res["ids"][0][i],
+                    "document": res.get("documents", [[None]])[0][i],
+                    "metadata": res.get("metadatas", [[None]])[0][i],
+                    "distance": res.get("distances", [[None]])[0][i],
+                }
+            )
+        return results
+
+    def query_many(self, user_ids, embeddings, top_k):
+        if not user_ids:
+            return []
+        # One filtered query for the whole group: rank every embedding over all of
+        # the group's docs, then keep each user's own top_k
+        users = sorted(set(user_ids))
+        where: Dict[str, Any] = {"user_id": users[0]} if len(users) == 1 else {"user_id": {"$in": users}}
+        n_docs = len(self.collection.get(where=where, include=[]).get("ids") or [])
+        if not n_docs or top_k <= 0:
+            return [[] for _ in user_ids]
+        res = self.collection.query(
+            query_embeddings=embeddings, n_results=n_docs, where=where, include=["metadatas", "distances"]
+        )
+        picked: List[List[Dict]] = []
+        for q, user_id in enumerate(user_ids):
+            rows: List[Dict] = []
+            for doc_id, meta, dist in zip(res["ids"][q], res["metadatas"][q], res["distances"][q]):
+                if (meta or {}).get("user_id") == user_id:
+                    rows.append({"id": doc_id, "document": None, "metadata": meta, "distance": dist})
+                    if len(rows) == top_k:
+                        break
+            picked.append(rows)
+        # Documents only for the rows kept
+        wanted = list(dict.fromkeys(row["id"] for rows in picked for row in rows))
+        docs = self.collection.get(ids=wanted, include=["documents"]) if wanted else {}
+        by_id = dict(zip(docs.get("ids") or [], docs.get("documents") or []))
+        for rows in picked:
+            for row in rows:
+                row["document"] = by_id.get(row["id"])
+        return picked
+
+    def get_metadata(self, ids):
+        res = self.collection.get(ids=ids, include=["metadatas"])
+        found = dict(zip(res.get("ids") or [], res.get("metadatas") or []))
+        return [found.get(doc_id) for doc_id in ids]
+
+    def doc_ids(self, user_ids, doc_type=None):
+        if not user_ids:
+            return []
+        where: Dict[str, Any] = {"user_id": user_ids[0]} if len(user_ids) == 1 else {"user_id": {"$in": list(user_ids)}}
+        if doc_type is not None:
+            where = {"$and": [{"type": doc_type}, where]}
+        res = self.collection.get(where=where, include=[])
+        return list(res.get("ids") or [])
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=ids)
+
+
+def _next_pow2(n: int) -> int:
+    return 1 << max(0, n - 1).bit_length()
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact per-user search over contiguous float32 blocks in one memory-mapped file.
+
+    Each user owns a run of rows whose capacity is rounded up to a power of two,
+    so most upserts rewrite in place; a user outgrowing it moves to the end of
+    the file (the old rows are left unused). A query is a single dot product
+    over the user's block. Documents, metadata and the user -> block index live
+    in SQLite next to the vector file.
+
+    Like Chroma's persistent directory, the files may be shared by several
+    processes: writes run in an immediate SQLite transaction that re-reads the
+    allocation, and a mapping shorter than the file another process grew is
+    remapped before use.
+    """
+
+    _GROW_ROWS = 1 << 16
+    _SQL_BATCH = 500
+
+    def __init__(self, directory: str):
+        if np is None:
+            raise RuntimeError("numpy is not installed; cannot use the numpy vector store.")
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._path = self.dir / "vectors.f32"
+        self._lock = threading.RLock()
+        # Autocommit: writes open their own BEGIN IMMEDIATE transactions
+        self._db = sqlite3.connect(
+            str(self.dir / "index.sqlite3"), check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " user_id TEXT PRIMARY KEY, start INTEGER NOT NULL, count INTEGER NOT NULL, capacity INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " id TEXT PRIMARY KEY, user_id TEXT NOT NULL, slot INTEGER NOT NULL,"
+            " type TEXT, document TEXT, metadata TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS docs_user_slot ON docs (user_id, slot);"
+        )
+        self.dim: Optional[int] = None
+        # First row past the allocated region
+        self._rows = 0
+        self._mm = None
+        self._refresh()
+
+    def _refresh(self):
+        """Pick up the dimension and allocation other processes may have committed."""
+        settings = dict(self._db.execute("SELECT key, value FROM settings").fetchall())
+        if self.dim is None and "dim" in settings:
+            self.dim = int(settings["dim"])
+        self._rows = int(settings.get("rows", 0))
+        if self.dim is not None:
+            self._ensure_rows(self._rows)
+
+    @contextmanager
+    def _write(self):
+        # BEGIN IMMEDIATE takes SQLite's write lock, so no other process allocates rows meanwhile
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                yield
+                if self._mm is not None:
+                    self._mm.flush()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _ensure_rows(self, rows: int):
+        capacity = self._mm.shape[0] if self._mm is not None else 0
+        if self._mm is not None and rows <= capacity:
+            return
+        on_disk = self._path.stat().st_size // (4 * self.dim) if self._path.exists() else 0
+        capacity = max(rows, on_disk, 2 * capacity, self._GROW_ROWS)
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm = None
+        with open(self._path, "ab") as fh:
+            if fh.tell() < capacity * self.dim * 4:
+                fh.truncate(capacity * self.dim * 4)
+        self._mm = np.memmap(self._path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _set_dim(self, dim: int):
+        if self.dim is None:
+            self.dim = dim
+            self._db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('dim', ?)", (str(dim),))
+            self._ensure_rows(0)
+        elif dim != self.dim:
+            raise ValueError(f"Embedding dimension {dim} does not match the store's dimension {self.dim}")
+
+    def _block(self, user_id: str):
+        return self._db.execute("SELECT start, count, capacity FROM blocks WHERE user_id = ?", (user_id,)).fetchone()
+
+    def upsert(self, ids, texts, metas, embs):
+        if not ids:
+            return
+        vectors = np.asarray(embs, dtype=np.float32)
+        by_user: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metas):
+            by_user.setdefault(meta["user_id"], []).append(i)
+        with self._write():
+            self._set_dim(vectors.shape[1])
+            for user_id, idx in by_user.items():
+                slots = dict(
+                    self._db.execute("SELECT id, slot FROM docs WHERE user_id = ?", (user_id,)).fetchall()
+                )
+                block = self._block(user_id)
+                start, count, capacity = block if block else (0, 0, 0)
+                for i in idx:
+                    if ids[i] not in slots:
+                        slots[ids[i]] = count
+                        count += 1
+                if count > capacity:
+                    old_start, old_count = start, (block[1] if block else 0)
+                    start, capacity = self._rows, _next_pow2(count)
+                    self._ensure_rows(start + capacity)
+                    self._mm[start : start + old_count] = self._mm[old_start : old_start + old_count]
+                    self._rows += capacity
+                rows = [start + slots[ids[i]] for i in idx]
+                self._mm[rows] = vectors[idx]
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO docs (id, user_id, slot, type, document, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (ids[i], user_id, slots[ids[i]], metas[i].get("type"), texts[i], json.dumps(metas[i]))
+                        for i in idx
+                    ],
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO blocks (user_id, start, count, capacity) VALUES (?, ?, ?, ?)",
+                    (user_id, start, count, capacity),
+                )
+            self._db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('rows', ?)", (str(self._rows),))
+
+    def query(self, user_id, embedding, top_k):
+        with self._lock:
+            block = self._block(user_id)
+            if not block or not block[1] or top_k <= 0:
+                return []
+            start, count, _ = block
+            # The block may have been written by another process past this mapping
+            self._ensure_rows(start + count)
+            q = np.asarray(embedding, dtype=np.float32)
+            scores = self._mm[start : start + count] @ q
+            k = min(top_k, count)
+            top = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            slots = [int(s) for s in top]
+            rows = self._db.execute(
+                f"SELECT slot, id, document, metadata FROM docs WHERE user_id = ? AND slot IN ({','.join('?' * k)})",
+                [user_id, *slots],
+            ).fetchall()
+        by_slot = {slot: (doc_id, doc, meta) for slot, doc_id, doc, meta in rows}
+        results: List[Dict] = []
+        for slot in slots:
+            doc_id, doc, meta = by_slot[slot]
+            results.append(
+                {
+                    "id": doc_id,
+                    "document": doc,
+                    "metadata": json.loads(meta),
+                    # Squared L2 for unit vectors, comparable with Chroma's default distance
+                    "distance": float(2.0 - 2.0 * scores[slot]),
+                }
+            )
+        return results
+
+    def _select_ids(self, sql: str, keys: Sequence[str], *params: Any) -> List[tuple]:
+        out: List[tuple] = []
+        for i in range(0, len(keys), self._SQL_BATCH):
+            part = list(keys[i : i + self._SQL_BATCH])
+            out.extend(self._db.execute(sql.format(",".join("?" * len(part))), [*params, *part]).fetchall())
+        return out
+
+    def get_metadata(self, ids):
+        with self._lock:
+            rows = self._select_ids("SELECT id, metadata FROM docs WHERE id IN ({})", ids)
+        found = {doc_id: json.loads(meta) for doc_id, meta in rows}
+        return [found.get(doc_id) for doc_id in ids]
+
+    def doc_ids(self, user_ids, doc_type=None):
+        with self._lock:
+            if doc_type is None:
+                rows = self._select_ids("SELECT id FROM docs WHERE user_id IN ({})", user_ids)
+            else:
+                rows = self._select_ids("SELECT id FROM docs WHERE type = ? AND user_id IN ({})", user_ids, doc_type)
+        return [doc_id for (doc_id,) in rows]
+
+    def delete(self, ids):
+        if not ids:
+            return
+        with self._write():
+            doomed = self._select_ids("SELECT user_id, id FROM docs WHERE id IN ({})", ids)
+            if not doomed:
+                return
+            users = {user_id for user_id, _ in doomed}
+            self._db.executemany("DELETE FROM docs WHERE id = ?", [(doc_id,) for _, doc_id in doomed])
+            for user_id in users:
+                # Compact the survivors to the front of the user's block
+                start = self._block(user_id)[0]
+                remaining = self._db.execute(
+                    "SELECT id, slot FROM docs WHERE user_id = ? ORDER BY slot", (user_id,)
+                ).fetchall()
+                old = [start + slot for _, slot in remaining]
+                self._mm[start : start + len(old)] = self._mm[old]
+                self._db.executemany(
+                    "UPDATE docs SET slot = ? WHERE id = ?", [(n, doc_id) for n, (doc_id, _) in enumerate(remaining)]
+                )
+                self._db.execute(
+                    "UPDATE blocks SET count = ? WHERE user_id = ?", (len(remaining), user_id)
+                )
+
+    def count(self, user_id):
+        with self._lock:
+            block = self._block(user_id)
+        return block[1] if block else 0
+
+    def warm(self):
+        # Fault the allocated rows into the page cache
+        with self._lock:
+            if self._mm is not None and self._rows:
+                float(self._mm[: self._rows].sum())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    global _store
+    if _store is not None:
+        return _store
+    # Startup warm-up and the first requests may race to open the store
+    with _store_lock:
+        if _store is not None:
+            return _store
+        if VECTOR_BACKEND == "numpy":
+            if np is None:
+                raise EmbeddingNotConfigured("numpy is not installed; cannot use VECTOR_BACKEND=numpy.")
+            # One directory per embedding space, like the per-backend Chroma collections
+            _store = NumpyVectorStore(str(Path(VECTOR_DIR) / embedding_model_key()))
+        elif VECTOR_BACKEND == "chroma":
+            _store = ChromaVectorStore()
+        else:
+            raise EmbeddingNotConfigured(
+                f"Unknown VECTOR_BACKEND {VECTOR_BACKEND!r}; expected one of {', '.join(VECTOR_BACKENDS)}"
+            )
+    return _store
+
+
+def open_vector_store(name: str) -> VectorStore:
+    """A store of its own in the configured backend (a separate Chroma collection or
+    numpy directory), for vectors kept apart from user docs."""
+    key = embedding_model_key()
+    if VECTOR_BACKEND == "numpy":
+        if np is None:
+            raise EmbeddingNotConfigured("numpy is not installed; cannot use VECTOR_BACKEND=numpy.")
+        return NumpyVectorStore(str(Path(VECTOR_DIR) / name / key))
+    if VECTOR_BACKEND == "chroma":
+        # One collection per embedding space (vectors of different models do not mix)
+        collection = f"{name}_{re.sub(r'[^A-Za-z0-9._-]+', '_', key)}"
+        return ChromaVectorStore(get_chroma_client().get_or_create_collection(name=collection))
+    raise EmbeddingNotConfigured(f"Unknown VECTOR_BACKEND {VECTOR_BACKEND!r}; expected one of {', '.join(VECTOR_BACKENDS)}")
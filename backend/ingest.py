@@ -0,0 +1,58 @@
+"""Bulk-load CVs into the vector store.
+
+    python -m backend.ingest <dir|manifest.jsonl> [--checkpoint PATH] [--batch-size N] [--llm-concurrency N]
+
+A directory ingests every .pdf/.txt/.md file with the file stem as user_id.
+Completed items are appended to a checkpoint file, so re-running the same
+command resumes where an interrupted run stopped.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from .core.config import INGEST_BATCH_SIZE, INGEST_LLM_CONCURRENCY
+from .services.ingest_service import BulkIngestor, items_from_source
+from .services.storage_service import StorageService
+
+
+def _default_checkpoint(source: str) -> str:
+    path = Path(source)
+    if path.is_dir():
+        return str(path / ".ingest_checkpoint.jsonl")
+    return str(path.with_name(path.name + ".checkpoint.jsonl"))
+
+
+def _print_progress(p):
+    print(
+        f"[ingest] {p['ingested']}/{p['total']} CVs, {p['failed']} failed, {p['docs_per_sec']:.1f} docs/s",
+        file=sys.stderr,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory of CVs or a manifest.jsonl")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: next to the source)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="ingest everything and keep no checkpoint")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="CVs per embed/upsert batch")
+    parser.add_argument("--llm-concurrency", type=int, default=INGEST_LLM_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    items = items_from_source(args.source)
+    checkpoint = None if args.no_checkpoint else (args.checkpoint or _default_checkpoint(args.source))
+    ingestor = BulkIngestor(
+        StorageService(),
+        llm_concurrency=args.llm_concurrency,
+        batch_size=args.batch_size,
+        checkpoint_path=checkpoint,
+        on_progress=_print_progress,
+    )
+    report = asyncio.run(ingestor.run(items))
+    print(json.dumps(report.model_dump(), indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
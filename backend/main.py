@@ -1,11 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from .routes.user import router as user_router
 from .routes.career import router as career_router
+from .routes.jobs import router as jobs_router
+from .core.admission import AdmissionMiddleware, admission_stats
+from .core.config import WARMUP_ON_STARTUP
+from .core.embeddings import embedding_cache_stats, embedding_batcher_stats
+from .core.metrics import REGISTRY, MetricsMiddleware, render_metrics, sample
+from .core.provider import DeadlineExceeded, ProviderUnavailable, gate_stats
+from .services.ingest_ledger import get_ingest_ledger
+from .services.job_queue import get_job_queue
+from .services.job_service import start_job_workers, stop_job_workers
+from .services.recommendation_cache import recommendation_cache
+from .services.semantic_cache import semantic_cache
+from .services.warmup import readiness, start_warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: the server accepts connections (and /healthz) at once
+    task = start_warm_up() if WARMUP_ON_STARTUP else None
+    await start_job_workers()
+    yield
+    await stop_job_workers()
+    if task is not None and not task.done():
+        task.cancel()
 
-app = FastAPI(title="AI Career Guidance API", version="0.1.0")
 
+app = FastAPI(title="AI Career Guidance API", version="0.1.0", lifespan=lifespan)
+
+# Outermost last: metrics see shed requests, and 503s from admission control carry CORS headers
+app.add_middleware(AdmissionMiddleware)
 # Allow local dev
 app.add_middleware(
     CORSMiddleware,
@@ -14,10 +43,79 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(ProviderUnavailable)
+async def provider_unavailable(request: Request, exc: ProviderUnavailable):
+    # Embeddings have no fallback; tell clients when the provider may be back
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse({"detail": f"LLM provider unavailable: {exc}"}, status_code=503, headers=headers)
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    # The request ran out of time waiting on the provider (paths with a fallback degrade instead)
+    return JSONResponse({"detail": f"Request deadline exceeded: {exc}"}, status_code=504)
+
+
+def _cache_metrics():
+    emb = embedding_cache_stats()
+    rec = recommendation_cache.stats()
+    return (
+        sample("pathfinder_embedding_cache_entries", "gauge", "Entries in the in-process embedding cache.", emb["entries"])
+        + sample("pathfinder_embedding_api_calls_total", "counter", "Embedding provider calls.", emb["api_calls"])
+        + sample("pathfinder_recommendation_cache_hits_total", "counter", "Recommendation cache hits.", rec["hits"])
+        + sample("pathfinder_recommendation_cache_misses_total", "counter", "Recommendation cache misses.", rec["misses"])
+        + sample("pathfinder_recommendation_cache_entries", "gauge", "Entries in the recommendation cache.", rec["entries"])
+    )
+
+
+def _job_metrics():
+    jobs = get_job_queue().stats()
+    return (
+        sample("pathfinder_job_queue_depth", "gauge", "Background jobs waiting for a worker.", jobs["queued"])
+        + sample("pathfinder_jobs_running", "gauge", "Background jobs being processed.", jobs["running"])
+        + sample("pathfinder_job_oldest_queued_seconds", "gauge", "Age of the oldest queued background job.", jobs["oldest_queued_s"])
+    )
+
+
+REGISTRY.add_collector(_cache_metrics)
+REGISTRY.add_collector(_job_metrics)
 
 @app.get("/")
 def root():
     return {"status": "ok", "service": "career-guidance", "version": app.version}
 
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving; touches no dependencies."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once the vector index is loaded and the LLM provider answers, else 503."""
+    ready, report = await readiness()
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+@app.get("/stats")
+def stats():
+    ledger = get_ingest_ledger()
+    return {
+        "embedding_cache": embedding_cache_stats(),
+        "embedding_batcher": embedding_batcher_stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "providers": gate_stats(),
+        "admission": admission_stats(),
+        "ingest_ledger": ledger.stats() if ledger is not None else None,
+        "jobs": get_job_queue().stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(user_router, prefix="/user")
 app.include_router(career_router, prefix="/career")
+app.include_router(jobs_router, prefix="/jobs")
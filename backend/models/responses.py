@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 
@@ -7,3 +7,43 @@ class RecommendationResponse(BaseModel):
     justification: str
     learning_path: List[str]
     next_steps: List[str]
+
+
+class IngestReport(BaseModel):
+    total: int
+    ingested: int
+    skipped: int
+    failed: int
+    docs_written: int
+    elapsed_s: float
+    docs_per_sec: float
+    # Docs identical to what the ingest ledger recorded, and profiles reused without parsing
+    docs_unchanged: int = 0
+    parses_reused: int = 0
+    errors: List[Dict[str, str]] = []
+
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    user_id: str
+    # queued, running, done or failed; `stage` names the step a running job is in
+    status: str
+    stage: str
+    progress: float
+    attempts: int
+    # Jobs queued ahead of this one, while it waits
+    position: Optional[int] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # A job requeued after a provider outage is not run again before this time
+    retry_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
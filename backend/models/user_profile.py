@@ -16,6 +16,25 @@ class InterestsRequest(BaseModel):
     interests: List[str]
 
 
+class RecommendBatchItem(BaseModel):
+    user_id: str
+    interests: Optional[List[str]] = None
+
+
+class RecommendBatchRequest(BaseModel):
+    items: List[RecommendBatchItem]
+    use_cache: bool = True
+
+
+class CVIngestStages(BaseModel):
+    content_hash: str
+    # Pipeline stages answered from the ingest ledger: extract, parse, embed, store
+    skipped: List[str] = []
+    docs_written: int = 0
+    docs_unchanged: int = 0
+
+
 class CVUploadResponse(BaseModel):
     user_id: str
     profile: UserProfile
+    ingest: Optional[CVIngestStages] = None
@@ -0,0 +1,72 @@
+"""Generate recommendations for a cohort of users.
+
+    python -m backend.recommend_batch <users.jsonl> [--out results.jsonl] [--concurrency N] [--group-size N] [--no-cache]
+
+Each input line is a JSON object {"user_id": ..., "interests": [...]} or a bare
+user id. Results are written as NDJSON in completion order; every line carries
+the item's `index` in the input file.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List
+
+from .core.config import REC_BATCH_CONCURRENCY, REC_BATCH_GROUP_SIZE
+from .models.user_profile import RecommendBatchItem
+from .services.batch_service import recommend_batch
+from .services.storage_service import StorageService
+
+
+def _read_items(path: str) -> List[RecommendBatchItem]:
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                items.append(RecommendBatchItem(**json.loads(line)))
+            else:
+                items.append(RecommendBatchItem(user_id=line))
+    return items
+
+
+async def _run(args, items: List[RecommendBatchItem], out) -> int:
+    storage = StorageService()
+    done = failed = 0
+    start = time.perf_counter()
+    async for line in recommend_batch(
+        storage, items, concurrency=args.concurrency, group_size=args.group_size, use_cache=not args.no_cache
+    ):
+        out.write(json.dumps(line) + "\n")
+        done += 1
+        failed += "error" in line
+        if done % 100 == 0 or done == len(items):
+            rate = done / max(time.perf_counter() - start, 1e-9)
+            print(f"[recommend] {done}/{len(items)} users, {failed} failed, {rate:.1f} users/s", file=sys.stderr)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="JSONL of users (objects or bare user ids)")
+    parser.add_argument("--out", help="output NDJSON file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=REC_BATCH_CONCURRENCY, help="generations in flight")
+    parser.add_argument("--group-size", type=int, default=REC_BATCH_GROUP_SIZE, help="users per retrieval batch")
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached recommendations")
+    args = parser.parse_args(argv)
+
+    items = _read_items(args.source)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        failed = asyncio.run(_run(args, items, out))
+    finally:
+        if args.out:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
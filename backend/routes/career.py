@@ -1,52 +1,227 @@
-from typing import List, Optional, Dict, Any
+import asyncio
+import json
+import sys
+from typing import List, Optional, Dict, Any, Tuple
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from ..services.storage_service import StorageService
-from ..services.career_service import recommend_career
+from ..services.storage_service import StorageService, get_storage
+from ..services.career_service import (
+    astream_recommend_career,
+    profile_from_snapshot,
+    retrieval_query,
+)
+from ..services.recommendation_cache import recommendation_cache, cache_status
+from ..services.semantic_cache import arecommend_with_semantic_cache, semantic_cache
+from ..services.batch_service import recommend_batch
 from ..models.responses import RecommendationResponse
+from ..models.user_profile import RecommendBatchRequest
+from ..core.config import REC_BATCH_MAX_ITEMS, RETRIEVAL_TOP_K
+from ..core.embeddings import aload_clients
+from ..core.provider import DeadlineExceeded, ProviderUnavailable
+from ..core.single_flight import SingleFlight
 
-router = APIRouter(tags=["career"])
+router = APIRouter(tags=["career"], dependencies=[Depends(aload_clients)])
 
-storage = StorageService()
+
+# Concurrent identical requests (double clicks, client retries) share one in-flight computation
+_analyze_flight = SingleFlight("analyze")
+_recommend_flight = SingleFlight("recommend")
+
+
+async def _analyze(storage: StorageService, user_id: str) -> Dict[str, Any]:
+    snapshot, evidence_count = await asyncio.gather(
+        storage.aget_profile(user_id), storage.acount_user_docs(user_id)
+    )
+    snapshot = snapshot or {}
+    profile = {
+        "user_id": user_id,
+        "summary": snapshot.get("summary", ""),
+        "skills": snapshot.get("skills", []),
+        "experience": snapshot.get("experience", []),
+        "education": snapshot.get("education", []),
+    }
+    return {"profile": profile, "evidence_count": evidence_count}
 
 
 @router.post("/analyze")
-async def analyze(user_id: str) -> Dict[str, Any]:
+async def analyze(user_id: str, storage: StorageService = Depends(get_storage)) -> Dict[str, Any]:
     """Aggregate user's stored context and return a reconstructed profile snapshot."""
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
 
-    results = storage.query_user(user_id=user_id, query_text="profile summary", top_k=5)
-    profile_meta = next((r.get("metadata") or {} for r in results if (r.get("metadata") or {}).get("type") == "profile"), {})
-    profile = {
-        "user_id": user_id,
-        "summary": profile_meta.get("summary", ""),
-        "skills": profile_meta.get("skills", []),
-        "experience": profile_meta.get("experience", []),
-        "education": profile_meta.get("education", []),
-    }
-    return {"profile": profile, "evidence_count": len(results)}
+    result, _ = await _analyze_flight.do(user_id, lambda: _analyze(storage, user_id))
+    return result
+
+
+async def _retrieve(storage: StorageService, user_id: str, query: str, usage: Dict[str, Any]) -> List[Dict]:
+    try:
+        return await storage.aquery_user(user_id=user_id, query_text=query, top_k=RETRIEVAL_TOP_K)
+    except ProviderUnavailable:
+        # Embeddings are down: recommend from the stored profile alone
+        usage["degraded"] = True
+        return []
+
+
+async def _recommendation_inputs(
+    storage: StorageService, user_id: str, interests: Optional[List[str]], usage: Dict[str, Any]
+):
+    """Retrieve the user's profile snapshot and ranked context passages for a recommendation."""
+    # Fetch the profile snapshot by id alongside retrieval rather than from ranked metadata
+    results, snapshot = await asyncio.gather(
+        _retrieve(storage, user_id, retrieval_query(interests), usage),
+        storage.aget_profile(user_id),
+    )
+    return profile_from_snapshot(snapshot), results
 
 
 @router.post("/recommend", response_model=RecommendationResponse)
-async def recommend(user_id: str, interests: Optional[List[str]] = None):
+async def recommend(
+    response: Response,
+    user_id: str,
+    interests: Optional[List[str]] = Query(None),
+    storage: StorageService = Depends(get_storage),
+):
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
 
-    # Retrieve user context (only user's docs) and aggregate
-    query = "career recommendation " + (" ".join(interests or []))
-    results = storage.query_user(user_id=user_id, query_text=query, top_k=5)
-    ctx = "\n\n".join([r.get("document") or "" for r in results])
+    cache_key = recommendation_cache.make_key(user_id, interests)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        rec, ttl = cached
+        response.headers["Cache-Status"] = cache_status(hit=True, ttl=ttl)
+        return RecommendationResponse(**rec)
 
-    # Attempt to reconstruct a lightweight profile from top metadata
-    profile_meta = next((r.get("metadata") or {} for r in results if (r.get("metadata") or {}).get("type") == "profile"), {})
-    profile = {
-        "summary": profile_meta.get("summary", ""),
-        "skills": profile_meta.get("skills", []),
-        "experience": profile_meta.get("experience", []),
-        "education": profile_meta.get("education", []),
+    (rec, usage), collapsed = await _recommend_flight.do(
+        cache_key, lambda: _generate_recommendation(storage, user_id, interests, cache_key)
+    )
+    degraded = bool(usage.get("degraded"))
+    if degraded:
+        response.headers["X-Degraded"] = "provider-unavailable"
+    if "semantic_similarity" in usage:
+        response.headers["Cache-Status"] = cache_status(hit=True, detail="semantic")
+        response.headers["X-Semantic-Similarity"] = f"{usage['semantic_similarity']:.4f}"
+    else:
+        response.headers["Cache-Status"] = cache_status(
+            hit=False, stored=recommendation_cache.enabled and not degraded, collapsed=collapsed
+        )
+    if "prompt_tokens" in usage:
+        response.headers["X-Prompt-Tokens"] = str(usage["prompt_tokens"])
+    return RecommendationResponse(**rec)
+
+
+async def _generate_recommendation(
+    storage: StorageService, user_id: str, interests: Optional[List[str]], cache_key: str
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    usage: Dict[str, Any] = {}
+    profile, results = await _recommendation_inputs(storage, user_id, interests, usage)
+    rec = await arecommend_with_semantic_cache(profile, interests or [], results, usage)
+    result = RecommendationResponse(**rec).model_dump()
+    # A fallback answered while the provider was down must not outlive the outage
+    if not usage.get("degraded"):
+        recommendation_cache.set(cache_key, result)
+    return result, usage
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/recommend/stream")
+async def recommend_stream(
+    user_id: str,
+    interests: Optional[List[str]] = Query(None),
+    storage: StorageService = Depends(get_storage),
+):
+    """Server-Sent Events variant of /recommend.
+
+    Emits `recommended_career` and `justification` events as soon as each value is
+    complete, one `learning_path` / `next_steps` event per item, then a `result`
+    event carrying the validated RecommendationResponse (or an `error` event).
+    """
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required")
+
+    cache_key = recommendation_cache.make_key(user_id, interests)
+    cached = recommendation_cache.get(cache_key)
+    semantic = None
+    if cached is None and semantic_cache.enabled:
+        # Looked up before the response starts, so Cache-Status can report the hit
+        semantic = await semantic_cache.alookup(
+            profile_from_snapshot(await storage.aget_profile(user_id)), interests
+        )
+        if semantic is not None:
+            rec = RecommendationResponse(**semantic[0]).model_dump()
+            recommendation_cache.set(cache_key, rec)
+            cached = (rec, None)
+
+    async def events():
+        if cached is not None:
+            rec = cached[0]
+            yield _sse("recommended_career", {"value": rec["recommended_career"]})
+            yield _sse("justification", {"value": rec["justification"]})
+            for name in ("learning_path", "next_steps"):
+                for item in rec[name]:
+                    yield _sse(name, {"item": item})
+            yield _sse("result", rec)
+            return
+        try:
+            usage: Dict[str, Any] = {}
+            profile, results = await _recommendation_inputs(storage, user_id, interests, usage)
+            async for name, value in astream_recommend_career(profile, interests or [], results, usage=usage):
+                if name == "result":
+                    result = RecommendationResponse(**value).model_dump()
+                    if not usage.get("degraded"):
+                        recommendation_cache.set(cache_key, result)
+                        await semantic_cache.astore(profile, interests, result)
+                    yield _sse("result", result)
+                elif name in ("learning_path", "next_steps"):
+                    yield _sse(name, {"item": value})
+                else:
+                    yield _sse(name, {"value": value})
+        except DeadlineExceeded as e:
+            # Same details as the JSON handlers in backend.main; anything else stays server-side
+            yield _sse("error", {"detail": f"Request deadline exceeded: {e}"})
+        except ProviderUnavailable as e:
+            yield _sse("error", {"detail": f"LLM provider unavailable: {e}", "retry_after": e.retry_after})
+        except Exception as e:
+            print(f"[recommend] stream for {user_id} failed: {e!r}", file=sys.stderr)
+            yield _sse("error", {"detail": "recommendation failed"})
+
+    if semantic is not None:
+        status = cache_status(hit=True, detail="semantic")
+    elif cached is not None:
+        status = cache_status(hit=True, ttl=cached[1])
+    else:
+        # Sent before generation: whether the answer gets stored (not when degraded) is unknown yet
+        status = cache_status(hit=False)
+    headers = {
+        "Cache-Control": "no-cache",
+        "Cache-Status": status,
+        # Keep reverse proxies from buffering the stream
+        "X-Accel-Buffering": "no",
     }
+    if semantic is not None:
+        headers["X-Semantic-Similarity"] = f"{semantic[1]:.4f}"
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
 
-    rec = recommend_career(profile=profile, interests=interests or [], retrieved_context=ctx)
-    return RecommendationResponse(**rec)
+
+@router.post("/recommend_batch")
+async def recommend_batch_route(request: RecommendBatchRequest, storage: StorageService = Depends(get_storage)):
+    """Recommendations for a cohort, streamed as NDJSON in completion order.
+
+    Each line carries the item's `index` in the request, so clients can restore
+    input order; a failed item yields a line with `error` instead of stopping the run.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="items must not be empty")
+    if len(request.items) > REC_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"at most {REC_BATCH_MAX_ITEMS} items per batch")
+
+    async def lines():
+        async for line in recommend_batch(storage, request.items, use_cache=request.use_cache):
+            yield json.dumps(line) + "\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException
+
+from ..core.concurrency import run_blocking
+from ..models.responses import JobStatus
+from ..services.job_queue import get_job_queue
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Status, stage and progress of a background job; `result` is set once it is done."""
+    queue = await run_blocking(get_job_queue)
+    job = await run_blocking(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return JobStatus(
+        job_id=job["id"],
+        kind=job["kind"],
+        user_id=job["user_id"],
+        status=job["status"],
+        stage=job["stage"],
+        progress=job["progress"],
+        attempts=job["attempts"],
+        position=job["position"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        retry_at=job["not_before"],
+        error=job["error"],
+        result=job["result"],
+    )
@@ -1,86 +1,132 @@
-from typing import Optional
+from pathlib import Path
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import JSONResponse
 
-from ..services.profile_service import extract_text_from_pdf_bytes, parse_profile_from_text
-from ..services.storage_service import StorageService
-from ..models.user_profile import UserProfile, InterestsRequest, CVUploadResponse
+from ..services.extraction_service import ExtractionError, SpooledUpload, UploadTooLarge, spool_upload
+from ..services.storage_service import StorageService, get_storage
+from ..services.recommendation_cache import recommendation_cache
+from ..services.ingest_service import (
+    BulkIngestor,
+    IngestItem,
+    NoParsableContent,
+    cv_upload_response,
+    ingest_upload,
+)
+from ..services.job_queue import get_job_queue
+from ..services.job_service import notify_job_workers
+from ..models.user_profile import InterestsRequest, CVUploadResponse
+from ..models.responses import IngestReport, JobAccepted
+from ..core.concurrency import run_blocking
+from ..core.embeddings import aload_clients
 from ..core.utils import clean_text
 
-router = APIRouter(tags=["user"])
+router = APIRouter(tags=["user"], dependencies=[Depends(aload_clients)])
 
-storage = StorageService()
 
-
-@router.post("/upload_cv", response_model=CVUploadResponse)
+@router.post("/upload_cv", response_model=CVUploadResponse, responses={202: {"model": JobAccepted}})
 async def upload_cv(
     user_id: str = Form(...),
     file: Optional[UploadFile] = File(None),
     text: Optional[str] = Form(None),
+    mode: Literal["sync", "async"] = Query("sync"),
+    storage: StorageService = Depends(get_storage),
 ):
+    """Parse and store a CV. With `mode=async` the upload is queued and `202` returns
+    a job id to poll at `/jobs/{job_id}`."""
     if not file and not text:
         raise HTTPException(status_code=400, detail="Provide either a file or text content")
+    if file is None and not clean_text(text or ""):
+        raise HTTPException(status_code=400, detail="No parsable content provided")
 
-    content = ""
-    if file is not None:
-        data = await file.read()
-        if file.content_type and "pdf" in file.content_type.lower():
-            content = extract_text_from_pdf_bytes(data)
-        else:
-            try:
-                content = data.decode("utf-8", errors="ignore")
-            except Exception:
-                content = ""
-    else:
-        content = text or ""
+    report: dict = {}
+    upload = None
+    try:
+        is_pdf = False
+        if file is not None:
+            upload = await spool_upload(file)
+            is_pdf = bool(file.content_type and "pdf" in file.content_type.lower())
+        if mode == "async":
+            return await _enqueue_upload(user_id, text, upload, is_pdf)
+        parsed = await ingest_upload(
+            storage,
+            user_id,
+            report,
+            text=text,
+            source=upload.source if upload is not None else None,
+            raw_hash=upload.sha256 if upload is not None else "",
+            is_pdf=is_pdf,
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExtractionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except NoParsableContent as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if upload is not None:
+            upload.close()
+    return cv_upload_response(user_id, parsed, report)
 
-    content = clean_text(content)
-    if not content:
-        raise HTTPException(status_code=400, detail="No parsable content provided")
 
-    parsed = parse_profile_from_text(content)
+async def _enqueue_upload(user_id: str, text: Optional[str], upload: Optional[SpooledUpload], is_pdf: bool) -> JSONResponse:
+    queue = await run_blocking(get_job_queue)
+    if upload is None:
+        job_id = await run_blocking(queue.enqueue, "upload_cv", user_id, {"text": text})
+    else:
+        payload = {"sha256": upload.sha256, "is_pdf": is_pdf}
+        job_id = await run_blocking(queue.enqueue, "upload_cv", user_id, payload, upload.data, upload.path)
+        # The queue owns the spooled file now
+        upload.path = None
+    notify_job_workers()
+    accepted = JobAccepted(job_id=job_id, status="queued", status_url=f"/jobs/{job_id}")
+    return JSONResponse(accepted.model_dump(), status_code=202, headers={"Location": accepted.status_url})
 
-    # Compose a profile text for embedding
-    profile_text = (
-        f"SUMMARY: {parsed.get('summary','')}\n"
-        f"SKILLS: {', '.join(parsed.get('skills', []))}\n"
-        f"EXPERIENCE: {' | '.join(parsed.get('experience', []))}\n"
-        f"EDUCATION: {' | '.join(parsed.get('education', []))}"
-    )
 
-    # Store raw CV and structured profile
-    storage.add_user_doc(user_id, content, {"type": "cv_raw", "user_id": user_id})
-    storage.add_user_doc(
-        user_id,
-        profile_text,
-        {
-            "type": "profile",
-            "user_id": user_id,
-            "summary": parsed.get("summary", ""),
-            "skills": parsed.get("skills", []),
-            "experience": parsed.get("experience", []),
-            "education": parsed.get("education", []),
-        },
-    )
+@router.post("/bulk_upload", response_model=IngestReport)
+async def bulk_upload(
+    files: List[UploadFile] = File(...),
+    user_ids: Optional[List[str]] = Form(None),
+    storage: StorageService = Depends(get_storage),
+):
+    """Ingest many CVs in one request; user ids default to the file names' stems."""
+    if user_ids and len(user_ids) != len(files):
+        raise HTTPException(status_code=400, detail="user_ids must match the number of files")
 
-    profile = UserProfile(
-        user_id=user_id,
-        summary=parsed.get("summary", ""),
-        skills=parsed.get("skills", []),
-        experience=parsed.get("experience", []),
-        education=parsed.get("education", []),
-        interests=None,
-    )
-    return CVUploadResponse(user_id=user_id, profile=profile)
+    items = []
+    uploads = []
+    try:
+        for i, f in enumerate(files):
+            name = f.filename or f"upload-{i}"
+            try:
+                upload = await spool_upload(f)
+            except UploadTooLarge as e:
+                raise HTTPException(status_code=413, detail=f"{name}: {e}")
+            uploads.append(upload)
+            items.append(
+                IngestItem(
+                    user_id=user_ids[i] if user_ids else Path(name).stem,
+                    source=name,
+                    path=upload.path,
+                    data=upload.data,
+                    content_type=f.content_type,
+                )
+            )
+        return await BulkIngestor(storage).run(items)
+    finally:
+        for upload in uploads:
+            upload.close()
 
 
 @router.post("/interests")
-async def set_interests(req: InterestsRequest):
+async def set_interests(req: InterestsRequest, storage: StorageService = Depends(get_storage)):
     # Store interests as a document for retrieval context
     text = f"INTERESTS: {', '.join(req.interests)}"
-    storage.add_user_doc(
+    await storage.aadd_user_doc(
         req.user_id,
         text,
         {"type": "interests", "user_id": req.user_id, "interests": req.interests},
     )
+    recommendation_cache.bump_user_version(req.user_id)
     return {"status": "ok", "user_id": req.user_id, "count": len(req.interests)}
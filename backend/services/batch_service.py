@@ -0,0 +1,131 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..core.config import REC_BATCH_CONCURRENCY, REC_BATCH_GROUP_SIZE, RETRIEVAL_TOP_K
+from ..core.provider import ProviderUnavailable
+from ..models.responses import RecommendationResponse
+from ..models.user_profile import RecommendBatchItem
+from .career_service import arecommend_career, profile_from_snapshot, retrieval_query
+from .recommendation_cache import recommendation_cache
+from .semantic_cache import arecommend_with_semantic_cache
+from .storage_service import StorageService
+
+
+def _error_line(index: int, item: RecommendBatchItem, error: BaseException) -> Dict[str, Any]:
+    return {"index": index, "user_id": item.user_id, "error": f"{type(error).__name__}: {error}"}
+
+
+async def recommend_batch(
+    storage: StorageService,
+    items: List[RecommendBatchItem],
+    concurrency: int = REC_BATCH_CONCURRENCY,
+    group_size: int = REC_BATCH_GROUP_SIZE,
+    use_cache: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Recommendations for many users, yielded as they finish (not in input order).
+
+    Users are prepared in groups: cache lookups, one embedding batch for the
+    group's retrieval queries, one multi-query vector store call and one profile
+    fetch. Prepared users feed `concurrency` generation workers, so retrieval of
+    the next group overlaps generation of the current one.
+
+    Each line is {"index", "user_id", "interests", "cached", "degraded",
+    "recommendation"} or {"index", "user_id", "error"}; users with nothing stored
+    get an error line rather than a recommendation made from nothing.
+    """
+    concurrency = max(1, concurrency)
+    group_size = max(1, group_size)
+    out: asyncio.Queue = asyncio.Queue()
+    # Bounded so preparation stays only a couple of groups ahead of generation
+    jobs: asyncio.Queue = asyncio.Queue(maxsize=group_size * 2)
+
+    def emit(index: int, item: RecommendBatchItem, rec: Dict[str, Any], cached: bool, degraded: bool):
+        out.put_nowait(
+            {
+                "index": index,
+                "user_id": item.user_id,
+                "interests": item.interests or [],
+                "cached": cached,
+                "degraded": degraded,
+                "recommendation": rec,
+            }
+        )
+
+    async def prepare_group(start: int, group: List[RecommendBatchItem]):
+        misses = []
+        for index, item in enumerate(group, start):
+            key = recommendation_cache.make_key(item.user_id, item.interests)
+            cached = recommendation_cache.get(key) if use_cache else None
+            if cached is not None:
+                emit(index, item, cached[0], cached=True, degraded=False)
+            else:
+                misses.append((index, item, key))
+        if not misses:
+            return
+        user_ids = [item.user_id for _, item, _ in misses]
+        degraded = False
+        try:
+            contexts = await storage.aquery_users(
+                [(item.user_id, retrieval_query(item.interests)) for _, item, _ in misses], top_k=RETRIEVAL_TOP_K
+            )
+        except ProviderUnavailable:
+            # Embeddings are down: recommend from the stored profiles alone
+            contexts, degraded = [[] for _ in misses], True
+        snapshots = await storage.aget_profiles(user_ids)
+        for (index, item, key), context, snapshot in zip(misses, contexts, snapshots):
+            if snapshot is None and not context and not degraded:
+                out.put_nowait(_error_line(index, item, LookupError("nothing stored for this user")))
+                continue
+            await jobs.put((index, item, key, profile_from_snapshot(snapshot), context, degraded))
+
+    async def prepare():
+        try:
+            for start in range(0, len(items), group_size):
+                group = items[start : start + group_size]
+                try:
+                    await prepare_group(start, group)
+                except Exception as e:
+                    for index, item in enumerate(group, start):
+                        out.put_nowait(_error_line(index, item, e))
+        finally:
+            for _ in range(concurrency):
+                await jobs.put(None)
+
+    async def generate():
+        while True:
+            job = await jobs.get()
+            if job is None:
+                return
+            index, item, key, profile, context, degraded = job
+            usage: Dict[str, Any] = {"degraded": True} if degraded else {}
+            try:
+                if use_cache:
+                    rec = await arecommend_with_semantic_cache(profile, item.interests or [], context, usage)
+                else:
+                    rec = await arecommend_career(profile, item.interests or [], context, usage=usage)
+                result = RecommendationResponse(**rec).model_dump()
+            except Exception as e:
+                out.put_nowait(_error_line(index, item, e))
+                continue
+            # Fallbacks answered during a provider outage are not cached
+            if not usage.get("degraded"):
+                recommendation_cache.set(key, result)
+            emit(index, item, result, cached="semantic_similarity" in usage, degraded=bool(usage.get("degraded")))
+
+    async def run():
+        try:
+            await asyncio.gather(prepare(), *(generate() for _ in range(concurrency)))
+        finally:
+            out.put_nowait(None)
+
+    runner = asyncio.ensure_future(run())
+    try:
+        while True:
+            line: Optional[Dict[str, Any]] = await out.get()
+            if line is None:
+                break
+            yield line
+        await runner
+    finally:
+        # The consumer went away (e.g. the client disconnected): stop generating
+        runner.cancel()
@@ -1,53 +1,248 @@
 import json
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
 
-from ..core.embeddings import get_llm
-from ..core.utils import clean_text
+from ..core.career_catalog import get_career_catalog
+from ..core.concurrency import run_blocking
+from ..core.config import CAREER_SHORTLIST_K, OPENAI_MODEL
+from ..core.embeddings import aembed_texts, get_llm
+from ..core.metrics import DEGRADED_RESPONSES, record_llm_usage, stage, timed_iter
+from ..core.provider import ProviderUnavailable, get_gate
+from ..core.taxonomy import get_taxonomy
+from ..core.tokens import count_tokens
+from .context_packer import pack_context
+from .storage_service import build_profile_text
+from .stream_parser import IncrementalJSONParser
 
+# Bump when the prompt changes so cached recommendations are not reused
+PROMPT_VERSION = "3"
+
+Retrieved = Union[str, List[Dict[str, Any]]]
+# Catalog careers shortlisted for a profile, best first (see CareerCatalog.shortlist)
+Shortlist = List[Dict[str, Any]]
+
+# Weight of the interests' embedding next to the profile's in the shortlist query
+_INTEREST_QUERY_WEIGHT = 0.5
+
+DEFAULT_NEXT_STEPS = ["Draft a tailored resume", "Update LinkedIn", "Schedule mock interviews"]
+
+
+def recommendation_version() -> str:
+    """Prompt version plus the career catalog's fingerprint, for cache keys."""
+    catalog = get_career_catalog()
+    return f"{PROMPT_VERSION}:{catalog.fingerprint}" if catalog is not None else PROMPT_VERSION
+
+
+def retrieval_query(interests: Optional[List[str]]) -> str:
+    """Query text used to retrieve a user's context for a recommendation."""
+    return "career recommendation " + (" ".join(interests or []))
 
-def recommend_career(profile: Dict[str, Any], interests: List[str], retrieved_context: str) -> Dict[str, Any]:
-    """Use LLM to recommend a career + plan. Fallback to simple rules if LLM unavailable."""
-    interests = interests or []
-    profile = profile or {"summary": "", "skills": [], "experience": [], "education": []}
 
-    # Fallback rule-based recommendation if LLM unavailable
+def profile_from_snapshot(snapshot: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    snapshot = snapshot or {}
+    return {
+        "summary": snapshot.get("summary", ""),
+        "skills": snapshot.get("skills", []),
+        "experience": snapshot.get("experience", []),
+        "education": snapshot.get("education", []),
+    }
+
+
+def _shortlist_texts(profile: Dict[str, Any], interests: List[str]) -> List[Tuple[str, float]]:
+    """(text, weight) pairs whose embeddings are summed into the shortlist query: the
+    stored profile doc's text and the retrieval query, so both are usually cached."""
+    texts = []
+    if any(profile.get(field) for field in ("summary", "skills", "experience", "education")):
+        texts.append((build_profile_text(profile), 1.0))
+    if interests:
+        texts.append((retrieval_query(interests), _INTEREST_QUERY_WEIGHT))
+    return texts
+
+
+def _shortlist(
+    profile: Dict[str, Any], interests: List[str], weights: List[float], vectors: Optional[List[List[float]]]
+) -> Shortlist:
+    catalog = get_career_catalog()
+    if catalog is None:
+        return []
+    query = None
+    if vectors:
+        query = [sum(w * v[d] for w, v in zip(weights, vectors)) for d in range(len(vectors[0]))]
+    with stage("catalog_shortlist"):
+        return catalog.shortlist(query, profile.get("skills", []), interests, CAREER_SHORTLIST_K)
+
+
+def _catalog_embedded(catalog) -> bool:
+    """Whether the catalog's embeddings are ready; if not, they are built in the
+    background and requests rank on skills and interests alone meanwhile."""
+    if catalog.ready_matrix() is not None:
+        return True
+    catalog.build_in_background()
+    return False
+
+
+async def ashortlist_careers(profile: Dict[str, Any], interests: List[str]) -> Shortlist:
+    """Catalog careers closest to the profile and interests; ranked on skills alone
+    when embeddings are unavailable or the catalog is still being embedded, empty
+    when the catalog is off."""
+    catalog = await run_blocking(get_career_catalog)
+    if catalog is None:
+        return []
+    texts = _shortlist_texts(profile, interests) if await run_blocking(_catalog_embedded, catalog) else []
     try:
-        llm = get_llm()
+        vectors = await aembed_texts([text for text, _ in texts]) if texts else None
     except Exception:
-        skills = set([s.lower() for s in profile.get("skills", [])])
-        rec = "Data Analyst" if any(k in skills for k in ["sql", "excel"]) else (
-            "Data Scientist" if any(k in skills for k in ["python", "ml", "pandas"]) else (
-                "Software Engineer" if any(k in skills for k in ["java", "c++", "javascript", "python"]) else "Explore Options"
-            )
-        )
-        plan = [
-            "Clarify target roles and domains",
-            "Close key skill gaps via curated courses",
-            "Build one portfolio project aligned with role",
-            "Network and apply to 5-10 roles/week",
-        ]
-        return {
-            "recommended_career": rec,
-            "justification": "Rule-based suggestion using detected skills and interests.",
-            "learning_path": plan,
-            "next_steps": ["Draft a tailored resume", "Update LinkedIn", "Schedule mock interviews"],
-        }
+        vectors = None
+    return await run_blocking(_shortlist, profile, interests, [w for _, w in texts], vectors)
+
 
-    # LLM-powered path
-    sys = (
-        "You are a senior career coach. Given a user's profile, interests, and retrieved context, recommend a career path and a concrete plan."
-        " Respond only with strict JSON keys: recommended_career (string), justification (string),"
-        " learning_path (array of strings), next_steps (array of strings)."
+def _career_plan(career: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Learning path and next steps for a shortlisted career, starting from its skill gaps."""
+    missing = career.get("missing", [])
+    learning_path = ([f"Close key skill gaps: {', '.join(missing[:3])}"] if missing else []) + list(
+        career.get("learning_path", [])
     )
+    next_steps = [f"Draft a resume tailored to {career['title']} roles"] + DEFAULT_NEXT_STEPS[1:]
+    return learning_path, next_steps
+
+
+def _choose(title: Any, shortlist: Shortlist) -> Dict[str, Any]:
+    # The model must pick from the shortlist; anything else falls back to the best match
+    wanted = str(title or "").strip().lower()
+    return next((c for c in shortlist if c["title"].lower() == wanted), shortlist[0])
+
+
+def _apply_shortlist(data: Dict[str, Any], shortlist: Shortlist) -> Dict[str, Any]:
+    career = _choose(data.get("recommended_career"), shortlist)
+    data["recommended_career"] = career["title"]
+    data["learning_path"], data["next_steps"] = _career_plan(career)
+    return data
+
+
+def _fallback_recommendation(
+    profile: Dict[str, Any], interests: Optional[List[str]] = None, shortlist: Optional[Shortlist] = None
+) -> Dict[str, Any]:
+    if shortlist:
+        # Rule-based: the catalog career closest to the profile, with its learning path
+        best = shortlist[0]
+        matched = best.get("matched", [])
+        justification = "Rule-based suggestion: the catalog career closest to your profile and interests" + (
+            f" (matched: {', '.join(matched[:5])})." if matched else "."
+        )
+        if len(shortlist) > 1:
+            justification += f" Also consider: {', '.join(c['title'] for c in shortlist[1:3])}."
+        data = {"recommended_career": best["title"], "justification": justification}
+        return _apply_shortlist(data, shortlist)
+    # Rule-based: the taxonomy role that best fits the skills and interests
+    ranked = get_taxonomy().rank_roles(profile.get("skills", []), interests or [])
+    if ranked:
+        rec, matched, missing = ranked[0]
+        justification = "Rule-based suggestion using detected skills and interests" + (
+            f" (matched: {', '.join(matched[:5])})." if matched else "."
+        )
+    else:
+        rec, missing = "Explore Options", []
+        justification = "Rule-based suggestion using detected skills and interests."
+    plan = [
+        "Clarify target roles and domains",
+        f"Close key skill gaps: {', '.join(missing[:3])}" if missing else "Close key skill gaps via curated courses",
+        "Build one portfolio project aligned with role",
+        "Network and apply to 5-10 roles/week",
+    ]
+    return {
+        "recommended_career": rec,
+        "justification": justification,
+        "learning_path": plan,
+        "next_steps": list(DEFAULT_NEXT_STEPS),
+    }
+
+
+def _degraded_recommendation(
+    profile: Dict[str, Any], interests: List[str], usage: Dict[str, Any], shortlist: Optional[Shortlist] = None
+) -> Dict[str, Any]:
+    # Provider unhealthy: answer fast from the rules; callers must not cache it
+    usage["degraded"] = True
+    DEGRADED_RESPONSES.inc(op="recommend")
+    return _fallback_recommendation(profile, interests, shortlist)
+
+
+def adapt_recommendation(rec: Dict[str, Any], profile: Dict[str, Any], interests: List[str]) -> Dict[str, Any]:
+    """Fit a recommendation made for a near-identical profile to this one.
+
+    The career is kept. The justification is rebuilt from this profile, since the
+    original may cite the other user's CV, and so is the plan of a catalog career
+    (with this profile's skill gaps).
+    """
+    title = rec["recommended_career"]
+    catalog = get_career_catalog()
+    career = catalog.career(title, profile.get("skills", [])) if catalog is not None else None
+    matched = career["matched"] if career is not None else list(profile.get("skills", []))
+    justification = f"{title} suits your background" + (f" in {', '.join(matched[:5])}" if matched else "")
+    justification += f" and your interest in {', '.join(interests[:3])}." if interests else "."
+    data = {
+        "recommended_career": title,
+        "justification": justification,
+        "learning_path": list(rec["learning_path"]),
+        "next_steps": list(rec["next_steps"]),
+    }
+    if career is not None:
+        data["learning_path"], data["next_steps"] = _career_plan(career)
+    return data
+
+
+def _candidate_lines(shortlist: Shortlist) -> str:
+    lines = []
+    for career in shortlist:
+        line = f"- {career['title']}: {career.get('description', '')} Key skills: {', '.join(career.get('skills', [])[:8])}."
+        if career.get("matched"):
+            line += f" User has: {', '.join(career['matched'][:8])}."
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _build_messages(
+    profile: Dict[str, Any],
+    interests: List[str],
+    retrieved_context: Retrieved,
+    usage: Optional[Dict[str, Any]] = None,
+    shortlist: Optional[Shortlist] = None,
+) -> List[Tuple[str, str]]:
+    """Build the prompt; retrieved passages are packed into the model's context token budget.
+
+    With a shortlist the model only picks a candidate and justifies it; the plan
+    comes from the catalog, which keeps the answer short.
+    """
+    with stage("context_pack"):
+        packed = pack_context(retrieved_context, profile=profile, model=OPENAI_MODEL)
+    if shortlist:
+        sys = (
+            "You are a senior career coach. Given a user's profile, interests, retrieved context and candidate careers,"
+            " choose the candidate that fits the user best and explain why in 2-4 sentences."
+            " Respond only with strict JSON keys: recommended_career (one candidate title, verbatim), justification (string)."
+        )
+    else:
+        sys = (
+            "You are a senior career coach. Given a user's profile, interests, and retrieved context, recommend a career path and a concrete plan."
+            " Respond only with strict JSON keys: recommended_career (string), justification (string),"
+            " learning_path (array of strings), next_steps (array of strings)."
+        )
     user = (
         f"Profile summary: {profile.get('summary','')}\n"
         f"Skills: {', '.join(profile.get('skills', []))}\n"
         f"Interests: {', '.join(interests)}\n"
-        f"Retrieved context (from user's history/embeddings):\n{clean_text(retrieved_context)[:12000]}\n"
-        "Return ONLY JSON."
+        f"Retrieved context (from user's history/embeddings):\n{packed.text}\n"
     )
-    msg = llm.invoke([("system", sys), ("user", user)])
-    content = getattr(msg, "content", "") if msg else ""
+    if shortlist:
+        user += f"Candidate careers:\n{_candidate_lines(shortlist)}\n"
+    user += "Return ONLY JSON."
+    if usage is not None:
+        usage["context_tokens"] = packed.tokens
+        usage["context_passages"] = packed.passages
+        usage["prompt_tokens"] = count_tokens(sys, OPENAI_MODEL) + count_tokens(user, OPENAI_MODEL)
+    return [("system", sys), ("user", user)]
+
+
+def _parse_llm_output(msg: Any) -> Dict[str, Any]:
+    content = msg if isinstance(msg, str) else (getattr(msg, "content", "") if msg else "")
     try:
         data = json.loads(content)
     except Exception:
@@ -65,3 +260,105 @@ def recommend_career(profile: Dict[str, Any], interests: List[str], retrieved_co
     data.setdefault("learning_path", [])
     data.setdefault("next_steps", [])
     return data
+
+
+async def arecommend_career(
+    profile: Dict[str, Any], interests: List[str], retrieved_context: Retrieved, usage: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Use LLM to recommend a career + plan. Fallback to simple rules if LLM unavailable.
+
+    `retrieved_context` is either the retrieved result dicts or plain text; when
+    `usage` is given it receives the prompt token counts.
+    """
+    interests = interests or []
+    profile = profile or {"summary": "", "skills": [], "experience": [], "education": []}
+
+    shortlist = await ashortlist_careers(profile, interests)
+    try:
+        llm = get_llm()
+    except Exception:
+        return _fallback_recommendation(profile, interests, shortlist)
+
+    usage = {} if usage is None else usage
+    messages = _build_messages(profile, interests, retrieved_context, usage, shortlist)
+    try:
+        with stage("llm_recommend"):
+            msg = await get_gate(OPENAI_MODEL).call(lambda: llm.ainvoke(messages))
+    except ProviderUnavailable:
+        return _degraded_recommendation(profile, interests, usage, shortlist)
+    record_llm_usage("recommend", msg, usage.get("prompt_tokens"))
+    data = _parse_llm_output(msg)
+    return _apply_shortlist(data, shortlist) if shortlist else data
+
+
+STREAM_FIELDS = ("recommended_career", "justification", "learning_path", "next_steps")
+
+
+def _fallback_events(data: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    events = []
+    for name in STREAM_FIELDS:
+        values = data[name] if isinstance(data[name], list) else [data[name]]
+        events.extend((name, value) for value in values)
+    events.append(("result", data))
+    return events
+
+
+async def astream_recommend_career(
+    profile: Dict[str, Any], interests: List[str], retrieved_context: Retrieved, usage: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Stream a recommendation as (event, value) pairs.
+
+    Yields ("recommended_career", str) and ("justification", str) once each value
+    is complete, ("learning_path", str) / ("next_steps", str) per list item, and
+    finally ("result", dict) with the fully parsed and shape-checked output.
+    """
+    interests = interests or []
+    profile = profile or {"summary": "", "skills": [], "experience": [], "education": []}
+
+    shortlist = await ashortlist_careers(profile, interests)
+    try:
+        llm = get_llm()
+    except Exception:
+        for event in _fallback_events(_fallback_recommendation(profile, interests, shortlist)):
+            yield event
+        return
+
+    usage = {} if usage is None else usage
+    messages = _build_messages(profile, interests, retrieved_context, usage, shortlist)
+    parser = IncrementalJSONParser()
+    parts: List[str] = []
+    # Timed per chunk: the events are yielded to the client in between
+    chunks = timed_iter("llm_recommend", get_gate(OPENAI_MODEL).stream(lambda: llm.astream(messages)))
+    try:
+        async for chunk in chunks:
+            text = getattr(chunk, "content", "") or ""
+            if not isinstance(text, str):
+                continue
+            parts.append(text)
+            for kind, key, value in parser.feed(text):
+                if key not in STREAM_FIELDS or not isinstance(value, str):
+                    continue
+                # Only list fields stream items; scalar fields stream whole values
+                if (kind == "item") == (key in ("learning_path", "next_steps")):
+                    if shortlist and kind == "item":
+                        # The catalog supplies the plan; see below
+                        continue
+                    if shortlist and key == "recommended_career":
+                        value = _choose(value, shortlist)["title"]
+                    yield key, value
+    except ProviderUnavailable:
+        # Raised before the first chunk, so nothing has been yielded yet
+        for event in _fallback_events(_degraded_recommendation(profile, interests, usage, shortlist)):
+            yield event
+        return
+
+    content = "".join(parts)
+    record_llm_usage("recommend", content, usage.get("prompt_tokens"))
+    data = _parse_llm_output(content)
+    if shortlist:
+        # The plan comes from the catalog rather than the model's stream
+        data = _apply_shortlist(data, shortlist)
+        for name in ("learning_path", "next_steps"):
+            for item in data[name]:
+                yield name, item
+    yield "result", data
@@ -0,0 +1,130 @@
+import re
+from typing import Any, Dict, List, Optional, Set, Union
+
+from pydantic import BaseModel
+
+from ..core.config import CTX_TOKEN_BUDGETS, MAX_CTX_CHARS, MAX_CTX_TOKENS
+from ..core.tokens import count_tokens, truncate_to_tokens
+from ..core.utils import clean_text
+
+# Word-shingle Jaccard similarity above which a passage counts as a near duplicate
+NEAR_DUPLICATE_JACCARD = 0.8
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+class PackedContext(BaseModel):
+    text: str
+    tokens: int
+    passages: int
+    dropped_duplicates: int = 0
+    dropped_covered: int = 0
+    dropped_budget: int = 0
+
+
+def context_budget(model: Optional[str]) -> int:
+    """Context token budget for `model` (CTX_TOKEN_BUDGETS entry or MAX_CTX_TOKENS)."""
+    return int(CTX_TOKEN_BUDGETS.get(model or "", MAX_CTX_TOKENS))
+
+
+def _shingles(text: str, n: int = 3) -> Set[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < n:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + n]) for i in range(len(words) - n + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _profile_text(profile: Dict[str, Any]) -> str:
+    parts = [profile.get("summary", "")]
+    for key in ("skills", "experience", "education"):
+        value = profile.get(key) or []
+        parts.extend(value if isinstance(value, list) else [str(value)])
+    return _normalize(" ".join(map(str, parts)))
+
+
+def pack_context(
+    retrieved: Union[str, List[Dict[str, Any]]],
+    profile: Optional[Dict[str, Any]] = None,
+    model: Optional[str] = None,
+    budget_tokens: Optional[int] = None,
+) -> PackedContext:
+    """Pack retrieved passages into a token budget for the recommendation prompt.
+
+    Passages are taken nearest-first; the profile doc and sentences already
+    present in the profile fields are dropped (they are in the prompt anyway),
+    near-duplicate passages (e.g. chunk overlaps) are skipped, and the last
+    passage that fits is cut at a sentence boundary.
+    """
+    budget = context_budget(model) if budget_tokens is None else budget_tokens
+    if isinstance(retrieved, str):
+        items = [{"document": retrieved, "distance": 0.0, "metadata": {}}]
+    else:
+        items = sorted(
+            retrieved or [],
+            key=lambda r: r.get("distance") if r.get("distance") is not None else float("inf"),
+        )
+
+    covered = _profile_text(profile or {})
+    separator = "\n\n"
+    separator_tokens = count_tokens(separator, model)
+    kept: List[str] = []
+    kept_shingles: List[Set[str]] = []
+    used = 0
+    chars = 0
+    dup = cov = over = 0
+    for item in items:
+        meta = item.get("metadata") or {}
+        if meta.get("type") == "profile":
+            cov += 1
+            continue
+        text = clean_text(item.get("document") or "")
+        # Drop sentences that only repeat what the profile fields already say
+        sentences = [s for s in _SENTENCE_RE.split(text) if s]
+        fresh = [s for s in sentences if not covered or _normalize(s) not in covered]
+        if not fresh:
+            cov += 1
+            continue
+        text = " ".join(fresh)
+        shingles = _shingles(text)
+        if any(_jaccard(shingles, seen) >= NEAR_DUPLICATE_JACCARD for seen in kept_shingles):
+            dup += 1
+            continue
+        # Passages after the first also pay for the separator joining them
+        remaining = budget - used - (separator_tokens if kept else 0)
+        room = MAX_CTX_CHARS - chars - (len(separator) if kept else 0)
+        if remaining <= 0 or room <= 0:
+            over += 1
+            continue
+        tokens = count_tokens(text, model)
+        if tokens > remaining:
+            text = truncate_to_tokens(text, remaining, model)
+            tokens = count_tokens(text, model)
+            if not text:
+                over += 1
+                continue
+        text = text[:room]
+        used += tokens + (separator_tokens if kept else 0)
+        chars += len(text) + (len(separator) if kept else 0)
+        kept.append(text)
+        kept_shingles.append(shingles)
+
+    packed = separator.join(kept)
+    return PackedContext(
+        text=packed,
+        tokens=count_tokens(packed, model),
+        passages=len(kept),
+        dropped_duplicates=dup,
+        dropped_covered=cov,
+        dropped_budget=over,
+    )
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, List, Optional, Tuple, Union
+
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+from ..core.concurrency import recycle_process_pool, run_blocking, run_in_process
+from ..core.metrics import PDF_PAGES, stage
+from ..core.config import (
+    EXTRACT_MAX_TOKENS,
+    OPENAI_MODEL,
+    PDF_MAX_PAGES,
+    PDF_PAGE_BATCH,
+    PDF_TIMEOUT_S,
+    PROCESS_WORKERS,
+    UPLOAD_MAX_BYTES,
+    UPLOAD_SPOOL_BYTES,
+)
+from ..core.tokens import count_tokens
+from ..core.utils import clean_text
+
+try:
+    import PyPDF2
+except Exception:  # pragma: no cover
+    PyPDF2 = None
+
+# A PDF to extract: raw bytes, or the path of a spooled/on-disk file
+PdfSource = Union[bytes, str]
+
+_READ_CHUNK = 64 * 1024
+
+
+class ExtractionError(ValueError):
+    """The document could not be extracted (unreadable, too many pages, timed out)."""
+
+
+class UploadTooLarge(ExtractionError):
+    pass
+
+
+class ExtractionResult(BaseModel):
+    text: str
+    pages: int
+    pages_extracted: int
+    stopped_early: bool = False
+
+
+class SpooledUpload:
+    """An upload kept in memory, or in a temp file once it outgrows the spool threshold."""
+
+    def __init__(self, size: int, data: Optional[bytes] = None, path: Optional[str] = None, sha256: str = ""):
+        self.size = size
+        self.data = data
+        self.path = path
+        # Digest of the raw bytes, computed while spooling
+        self.sha256 = sha256
+
+    @property
+    def source(self) -> PdfSource:
+        return self.path if self.path is not None else (self.data or b"")
+
+    def read_bytes(self) -> bytes:
+        if self.path is None:
+            return self.data or b""
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    def close(self):
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+async def spool_upload(
+    file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES, spool_bytes: int = UPLOAD_SPOOL_BYTES
+) -> SpooledUpload:
+    """Copy an upload in chunks, moving it to a temp file past `spool_bytes`.
+
+    Raises UploadTooLarge as soon as more than `max_bytes` have been read.
+    """
+    buf = bytearray()
+    tmp = None
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        while True:
+            chunk = await file.read(_READ_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+            if tmp is None and size > spool_bytes:
+                # Keep the suffix so path-based type detection still works
+                suffix = os.path.splitext(file.filename or "")[1]
+                tmp = tempfile.NamedTemporaryFile(prefix="pathfinder-upload-", suffix=suffix, delete=False)
+                await run_blocking(tmp.write, bytes(buf))
+                buf = bytearray()
+            if tmp is not None:
+                await run_blocking(tmp.write, chunk)
+            else:
+                buf.extend(chunk)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
+        raise
+    if tmp is None:
+        return SpooledUpload(size, data=bytes(buf), sha256=digest.hexdigest())
+    await run_blocking(tmp.close)
+    return SpooledUpload(size, path=tmp.name, sha256=digest.hexdigest())
+
+
+# In a worker process: the last document opened, keyed by (path, size, mtime), so the
+# worker's later page batches of that document skip re-parsing it
+_last_reader: Tuple[Optional[Tuple[str, int, int]], Any] = (None, None)
+
+
+def _open_reader(source: PdfSource):
+    global _last_reader
+    if PyPDF2 is None:
+        raise RuntimeError("PyPDF2 is not installed; cannot parse PDF.")
+    if isinstance(source, bytes):
+        return PyPDF2.PdfReader(io.BytesIO(source))
+    st = os.stat(source)
+    key = (source, st.st_size, st.st_mtime_ns)
+    if _last_reader[0] != key:
+        # Let the previous document go before parsing the next
+        _last_reader = (None, None)
+        _last_reader = (key, PyPDF2.PdfReader(source))
+    return _last_reader[1]
+
+
+def _page_texts(reader, start: int, end: int) -> List[str]:
+    texts = []
+    for i in range(start, min(end, len(reader.pages))):
+        try:
+            texts.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def _probe_pdf(source: PdfSource, first_pages: int) -> Tuple[int, List[str]]:
+    # Runs in a worker process: page count plus the text of the first pages
+    reader = _open_reader(source)
+    return len(reader.pages), _page_texts(reader, 0, first_pages)
+
+
+def _extract_pages(source: PdfSource, start: int, end: int) -> List[str]:
+    # Runs in a worker process; each worker opens its own reader
+    return _page_texts(_open_reader(source), start, end)
+
+
+def _write_temp(data: bytes) -> str:
+    with tempfile.NamedTemporaryFile(prefix="pathfinder-pdf-", suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+    return tmp.name
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+async def _extract_pdf(source: str, max_pages: int, max_tokens: int) -> ExtractionResult:
+    batch = max(1, PDF_PAGE_BATCH)
+    try:
+        pages, texts = await run_in_process(_probe_pdf, source, batch)
+    except BrokenProcessPool:
+        raise ExtractionError("PDF extraction worker crashed")
+    except Exception as e:
+        raise ExtractionError(f"Unreadable PDF: {e}")
+    if pages > max_pages:
+        raise ExtractionError(f"PDF has {pages} pages; the limit is {max_pages}")
+
+    tokens = count_tokens(" ".join(texts), OPENAI_MODEL)
+    ranges = [(s, min(s + batch, pages)) for s in range(batch, pages, batch)]
+    # Submit one wave per pool's worth of ranges so stopping early wastes little work
+    wave = max(1, PROCESS_WORKERS)
+    stopped_early = False
+    for i in range(0, len(ranges), wave):
+        if tokens >= max_tokens:
+            stopped_early = True
+            break
+        results = await asyncio.gather(
+            *[run_in_process(_extract_pages, source, s, e) for s, e in ranges[i : i + wave]]
+        )
+        for part in results:
+            texts.extend(part)
+            tokens += count_tokens(" ".join(part), OPENAI_MODEL)
+    return ExtractionResult(
+        text=clean_text("\n".join(texts)),
+        pages=pages,
+        pages_extracted=len(texts),
+        stopped_early=stopped_early,
+    )
+
+
+async def extract_pdf(
+    source: PdfSource,
+    max_pages: int = PDF_MAX_PAGES,
+    timeout_s: float = PDF_TIMEOUT_S,
+    max_tokens: int = EXTRACT_MAX_TOKENS,
+) -> ExtractionResult:
+    """Extract PDF text off the event loop, pages spread across the process pool.
+
+    Pages are read in batches of PDF_PAGE_BATCH; extraction stops once
+    `max_tokens` of text have been collected. Raises ExtractionError for
+    unreadable PDFs, more than `max_pages` pages or exceeding `timeout_s`.
+    Workers get a file path: bytes are written to a temp file once rather than
+    pickled into every page batch.
+    """
+    if PyPDF2 is None:
+        raise RuntimeError("PyPDF2 is not installed; cannot parse PDF.")
+    tmp = await run_blocking(_write_temp, source) if isinstance(source, bytes) else None
+    try:
+        with stage("pdf_extract"):
+            result = await asyncio.wait_for(_extract_pdf(tmp or source, max_pages, max_tokens), timeout_s)
+        PDF_PAGES.inc(result.pages_extracted)
+        return result
+    except asyncio.TimeoutError:
+        # Cancelling the await leaves the batches running in their workers (a hung
+        # PDF would hold its slots for good); kill them and start a fresh pool
+        recycle_process_pool()
+        raise ExtractionError(f"PDF extraction exceeded {timeout_s:g}s")
+    finally:
+        if tmp is not None:
+            _remove(tmp)
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..core.config import (
+    CHROMA_DIR,
+    INGEST_LEDGER,
+    INGEST_LEDGER_MAX_PROFILES,
+    INGEST_LEDGER_MAX_UPLOADS,
+    INGEST_LEDGER_PROFILE_TTL_S,
+    INGEST_LEDGER_UPLOAD_TTL_S,
+)
+from ..core.embeddings import embedding_model_key
+
+
+def content_hash(data: Union[str, bytes]) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def doc_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """Fingerprint of a stored doc: its text, metadata and the embedding model that embeds it."""
+    payload = json.dumps([embedding_model_key(), text, metadata], sort_keys=True, default=str)
+    return content_hash(payload)
+
+
+class IngestLedger:
+    """Content-hash ledger of CV ingestion, kept in SQLite next to the vector store.
+
+    - raw upload hash -> cleaned text (skips PDF extraction and decoding), kept per
+      uploading user for at most `upload_ttl_s` and `max_uploads` rows
+    - (cleaned text hash, parser) -> parsed profile (skips the LLM parse), kept
+      while used within `profile_ttl_s`, at most `max_profiles` rows
+    - user -> hash of every doc last written for them (skips unchanged upserts)
+
+    Embeddings are not duplicated here: the embedding cache is keyed by text
+    hash already, so docs rewritten with known text do not reach the provider.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        upload_ttl_s: float = INGEST_LEDGER_UPLOAD_TTL_S,
+        max_uploads: int = INGEST_LEDGER_MAX_UPLOADS,
+        profile_ttl_s: float = INGEST_LEDGER_PROFILE_TTL_S,
+        max_profiles: int = INGEST_LEDGER_MAX_PROFILES,
+    ):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.upload_ttl_s = upload_ttl_s
+        self.max_uploads = max(1, max_uploads)
+        self.profile_ttl_s = profile_ttl_s
+        self.max_profiles = max(1, max_profiles)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(uploads)")]
+            if columns and "user_id" not in columns:
+                # Texts from before uploads were tied to a user cannot be deleted per user
+                self._db.execute("DROP TABLE uploads")
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                " raw_hash TEXT NOT NULL, user_id TEXT NOT NULL, text_hash TEXT NOT NULL,"
+                " text TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (raw_hash, user_id));"
+                "CREATE INDEX IF NOT EXISTS uploads_created ON uploads (created_at);"
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                " text_hash TEXT NOT NULL, parser TEXT NOT NULL, profile_json TEXT NOT NULL,"
+                " last_used REAL NOT NULL DEFAULT 0, PRIMARY KEY (text_hash, parser));"
+                "CREATE TABLE IF NOT EXISTS user_docs ("
+                " user_id TEXT NOT NULL, doc_id TEXT NOT NULL, doc_hash TEXT NOT NULL,"
+                " PRIMARY KEY (user_id, doc_id));"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(profiles)")]
+            if "last_used" not in columns:
+                # Ledgers from before the bound: their profiles start their TTL now
+                self._db.execute("ALTER TABLE profiles ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+                self._db.execute("UPDATE profiles SET last_used = ?", (time.time(),))
+            self._db.execute("CREATE INDEX IF NOT EXISTS profiles_last_used ON profiles (last_used)")
+            self._db.commit()
+
+    def upload_text(self, raw_hash: str) -> Optional[str]:
+        """Text extracted from these bytes before, by any user, unless it has expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text FROM uploads WHERE raw_hash = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (raw_hash, time.time() - self.upload_ttl_s),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_upload_text(self, raw_hash: str, user_id: str, text: str):
+        """Record `user_id`'s upload, then drop expired rows and the oldest beyond `max_uploads`."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO uploads (raw_hash, user_id, text_hash, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (raw_hash, user_id, content_hash(text), text, now),
+            )
+            self._db.execute("DELETE FROM uploads WHERE created_at < ?", (now - self.upload_ttl_s,))
+            self._db.execute(
+                "DELETE FROM uploads WHERE rowid IN"
+                " (SELECT rowid FROM uploads ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_uploads,),
+            )
+            self._db.commit()
+
+    def forget_user(self, user_id: str):
+        """Delete what the ledger holds about a user: their uploaded texts, the profiles
+        parsed from texts nobody else uploaded, and their recorded docs."""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM profiles WHERE text_hash IN (SELECT text_hash FROM uploads WHERE user_id = ?)"
+                " AND text_hash NOT IN (SELECT text_hash FROM uploads WHERE user_id != ?)",
+                (user_id, user_id),
+            )
+            self._db.execute("DELETE FROM uploads WHERE user_id = ?", (user_id,))
+            self._db.execute("DELETE FROM user_docs WHERE user_id = ?", (user_id,))
+            self._db.commit()
+
+    def profile(self, text_hash: str, parser: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT profile_json FROM profiles WHERE text_hash = ? AND parser = ? AND last_used >= ?",
+                (text_hash, parser, time.time() - self.profile_ttl_s),
+            ).fetchone()
+            if row:
+                self._db.execute(
+                    "UPDATE profiles SET last_used = ? WHERE text_hash = ? AND parser = ?",
+                    (time.time(), text_hash, parser),
+                )
+                self._db.commit()
+        return json.loads(row[0]) if row else None
+
+    def put_profile(self, text_hash: str, parser: str, profile: Dict[str, Any]):
+        """Record a parsed profile, then drop those unused for `profile_ttl_s` and the least
+        recently used beyond `max_profiles`."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO profiles (text_hash, parser, profile_json, last_used) VALUES (?, ?, ?, ?)",
+                (text_hash, parser, json.dumps(profile), now),
+            )
+            self._db.execute("DELETE FROM profiles WHERE last_used < ?", (now - self.profile_ttl_s,))
+            self._db.execute(
+                "DELETE FROM profiles WHERE rowid IN"
+                " (SELECT rowid FROM profiles ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_profiles,),
+            )
+            self._db.commit()
+
+    def user_docs(self, user_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """{user_id: {doc_id: doc_hash}} as last written; users never written are absent."""
+        found: Dict[str, Dict[str, str]] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(user_ids), 500):
+                part = user_ids[i : i + 500]
+                rows = self._db.execute(
+                    f"SELECT user_id, doc_id, doc_hash FROM user_docs WHERE user_id IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for user_id, doc_id, digest in rows:
+                    found.setdefault(user_id, {})[doc_id] = digest
+        return found
+
+    def put_user_docs(self, written: Dict[str, Dict[str, str]]):
+        """Replace the recorded docs of each user with `{doc_id: doc_hash}`."""
+        with self._lock:
+            for user_id, docs in written.items():
+                self._db.execute("DELETE FROM user_docs WHERE user_id = ?", (user_id,))
+                self._db.executemany(
+                    "INSERT INTO user_docs (user_id, doc_id, doc_hash) VALUES (?, ?, ?)",
+                    [(user_id, doc_id, digest) for doc_id, digest in docs.items()],
+                )
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Tuple[int, int, int] = self._db.execute(
+                "SELECT (SELECT COUNT(*) FROM uploads), (SELECT COUNT(*) FROM profiles),"
+                " (SELECT COUNT(DISTINCT user_id) FROM user_docs)"
+            ).fetchone()
+        return {"uploads": counts[0], "profiles": counts[1], "users": counts[2]}
+
+
+_ledger: Optional[IngestLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ingest_ledger() -> Optional[IngestLedger]:
+    """The ledger under CHROMA_DIR, or None when INGEST_LEDGER is off."""
+    global _ledger
+    if not INGEST_LEDGER:
+        return None
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = IngestLedger(str(Path(CHROMA_DIR) / "ingest_ledger.sqlite3"))
+    return _ledger
@@ -0,0 +1,460 @@
+import asyncio
+import copy
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from ..core.concurrency import run_blocking
+from ..core.config import INGEST_LLM_CONCURRENCY, INGEST_BATCH_SIZE
+from ..core.single_flight import SingleFlight
+from ..core.utils import clean_text, chunk_text
+from ..models.responses import IngestReport
+from ..models.user_profile import CVIngestStages, CVUploadResponse, UserProfile
+from .extraction_service import PdfSource, extract_pdf
+from .ingest_ledger import content_hash, doc_hash, get_ingest_ledger
+from .profile_service import aparse_profile_from_text, parser_key
+from .recommendation_cache import recommendation_cache
+from .storage_service import StorageService, build_profile_text, chunk_doc_id
+
+# Stages of one CV upload, in order; background jobs report them as progress
+UPLOAD_STAGES = ("extract", "parse", "store")
+
+StageCallback = Callable[[str], Awaitable[None]]
+
+TEXT_SUFFIXES = {".txt", ".md"}
+SUPPORTED_SUFFIXES = {".pdf"} | TEXT_SUFFIXES
+
+
+def decode_text_bytes(data: bytes) -> str:
+    try:
+        return data.decode("utf-8", errors="ignore")
+    except Exception:
+        return ""
+
+
+def cv_documents(
+    storage: StorageService, user_id: str, chunks: List[str], parsed: Dict[str, Any]
+) -> List[Tuple[str, str, Dict]]:
+    """The (user_id, text, metadata) docs stored for one CV: one per raw-text chunk
+    (ids `<user_id>:cv_raw:<n>`) plus the structured profile."""
+    docs: List[Tuple[str, str, Dict]] = [
+        (
+            user_id,
+            chunk,
+            {"type": "cv_raw", "user_id": user_id, "id": chunk_doc_id(user_id, "cv_raw", n), "chunk": n, "chunks": len(chunks)},
+        )
+        for n, chunk in enumerate(chunks)
+    ]
+    docs.append((user_id, build_profile_text(parsed), storage.profile_metadata(user_id, parsed)))
+    return docs
+
+
+def cv_chunk_ids(user_id: str, chunks: List[str]) -> List[str]:
+    return [chunk_doc_id(user_id, "cv_raw", n) for n in range(len(chunks))]
+
+
+def upload_key(raw_hash: str, is_pdf: bool) -> str:
+    # The same bytes extract differently as a PDF and as plain text
+    return f"{'pdf' if is_pdf else 'text'}:{raw_hash}"
+
+
+async def extract_upload_text(
+    key: str, user_id: str, extract: Callable[[], Awaitable[str]], report: Dict[str, Any]
+) -> str:
+    """Cleaned text of `user_id`'s upload; bytes seen before (same `upload_key`) skip extraction."""
+    ledger = get_ingest_ledger()
+    if ledger is not None:
+        text = await run_blocking(ledger.upload_text, key)
+        if text is not None:
+            report.setdefault("skipped", []).append("extract")
+            return text
+    text = clean_text(await extract())
+    if ledger is not None and text:
+        await run_blocking(ledger.put_upload_text, key, user_id, text)
+    return text
+
+
+# Duplicate uploads in flight at once share the ledger lookup, the parse and the ledger write
+_ledger_parse_flight = SingleFlight("ledger_parse")
+
+
+async def _parse_recorded(content: str, text_hash: str, parser: str) -> Tuple[Dict[str, Any], bool]:
+    """(profile, reused): the ledger's profile for the text, or a fresh parse that is
+    recorded before the flight ends, so a duplicate arriving just after finds it."""
+    ledger = get_ingest_ledger()
+    parsed = await run_blocking(ledger.profile, text_hash, parser)
+    if parsed is not None:
+        return parsed, True
+    usage: Dict[str, Any] = {}
+    parsed = await aparse_profile_from_text(content, usage=usage)
+    # A fallback parsed while the provider was unavailable is not worth keeping
+    if not usage.get("degraded"):
+        await run_blocking(ledger.put_profile, text_hash, parser, parsed)
+    return parsed, False
+
+
+async def parse_cv(content: str, report: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Parsed profile and raw-text chunks of cleaned CV text. A profile parsed from the
+    same text by the same parser (see `parser_key`) is reused from the ledger."""
+    text_hash = content_hash(content)
+    report["content_hash"] = text_hash
+    if get_ingest_ledger() is None:
+        parsed, chunks = await asyncio.gather(aparse_profile_from_text(content), run_blocking(chunk_text, content))
+        return parsed, chunks
+    parser = parser_key()
+    ((parsed, reused), _), chunks = await asyncio.gather(
+        _ledger_parse_flight.do((text_hash, parser), lambda: _parse_recorded(content, text_hash, parser)),
+        run_blocking(chunk_text, content),
+    )
+    if reused:
+        report.setdefault("skipped", []).append("parse")
+    # Each caller gets its own copy of the shared result
+    return copy.deepcopy(parsed), chunks
+
+
+async def store_cvs(
+    storage: StorageService, cvs: List[Tuple[str, List[str], Dict[str, Any]]]
+) -> Dict[str, Dict[str, int]]:
+    """Store (user_id, chunks, parsed) CVs, writing only docs that differ from what the
+    ledger recorded for the user, then drop stale chunks and invalidate cached
+    recommendations of users whose docs changed.
+
+    Later entries win when a user appears twice, matching `aadd_docs`. Returns
+    {user_id: {"written": n, "unchanged": m}}.
+    """
+    by_user = {user_id: (chunks, parsed) for user_id, chunks, parsed in cvs}
+    ledger = get_ingest_ledger()
+    previous: Dict[str, Dict[str, str]] = {}
+    if ledger is not None:
+        previous = await run_blocking(ledger.user_docs, list(by_user))
+        if previous:
+            # Only trust the ledger for users whose profile is still in the vector store
+            known = list(previous)
+            profiles = await storage.aget_profiles(known)
+            previous = {user_id: previous[user_id] for user_id, p in zip(known, profiles) if p is not None}
+
+    docs: List[Tuple[str, str, Dict]] = []
+    written: Dict[str, Dict[str, str]] = {}
+    keep_ids: Dict[str, List[str]] = {}
+    counts: Dict[str, Dict[str, int]] = {}
+    for user_id, (chunks, parsed) in by_user.items():
+        before = previous.get(user_id, {})
+        hashes: Dict[str, str] = {}
+        changed = []
+        for doc in cv_documents(storage, user_id, chunks, parsed):
+            doc_id = storage.doc_id(user_id, doc[2])
+            hashes[doc_id] = doc_hash(doc[1], doc[2])
+            if before.get(doc_id) != hashes[doc_id]:
+                changed.append(doc)
+        counts[user_id] = {"written": len(changed), "unchanged": len(hashes) - len(changed)}
+        if changed or set(before) - set(hashes):
+            docs.extend(changed)
+            written[user_id] = hashes
+            keep_ids[user_id] = cv_chunk_ids(user_id, chunks)
+
+    if written:
+        await storage.aadd_docs(docs)
+        await storage.adelete_stale("cv_raw", keep_ids)
+        if ledger is not None:
+            await run_blocking(ledger.put_user_docs, written)
+        for user_id in written:
+            recommendation_cache.bump_user_version(user_id)
+    return counts
+
+
+async def ingest_cv_text(
+    storage: StorageService,
+    user_id: str,
+    content: str,
+    report: Optional[Dict[str, Any]] = None,
+    on_stage: Optional[StageCallback] = None,
+) -> Dict[str, Any]:
+    """Parse cleaned CV text and store what changed since the user's last upload.
+
+    `report`, when given, receives the content hash, the pipeline stages that were
+    skipped and how many docs were written or left unchanged.
+    """
+    report = {} if report is None else report
+    skipped = report.setdefault("skipped", [])
+    if on_stage is not None:
+        await on_stage("parse")
+    parsed, chunks = await parse_cv(content, report)
+    if on_stage is not None:
+        await on_stage("store")
+    counts = (await store_cvs(storage, [(user_id, chunks, parsed)]))[user_id]
+    report["docs_written"] = counts["written"]
+    report["docs_unchanged"] = counts["unchanged"]
+    if not counts["written"]:
+        skipped.extend(["embed", "store"])
+    return parsed
+
+
+class NoParsableContent(ValueError):
+    pass
+
+
+async def ingest_upload(
+    storage: StorageService,
+    user_id: str,
+    report: Dict[str, Any],
+    text: Optional[str] = None,
+    source: Optional[PdfSource] = None,
+    raw_hash: str = "",
+    is_pdf: bool = False,
+    on_stage: Optional[StageCallback] = None,
+) -> Dict[str, Any]:
+    """Extract, parse and store one uploaded CV: the file `source` (bytes or a path,
+    with sha256 `raw_hash`) or else the pasted `text`.
+
+    Raises ExtractionError for unreadable files and NoParsableContent when no text is left.
+    """
+    if source is not None:
+        if on_stage is not None:
+            await on_stage("extract")
+
+        async def extract() -> str:
+            if is_pdf:
+                return (await extract_pdf(source)).text
+            data = source if isinstance(source, bytes) else await run_blocking(Path(source).read_bytes)
+            return decode_text_bytes(data)
+
+        content = await extract_upload_text(upload_key(raw_hash, is_pdf), user_id, extract, report)
+    else:
+        content = text or ""
+    content = clean_text(content)
+    if not content:
+        raise NoParsableContent("No parsable content provided")
+    return await ingest_cv_text(storage, user_id, content, report, on_stage)
+
+
+def cv_upload_response(user_id: str, parsed: Dict[str, Any], report: Dict[str, Any]) -> CVUploadResponse:
+    profile = UserProfile(
+        user_id=user_id,
+        summary=parsed.get("summary", ""),
+        skills=parsed.get("skills", []),
+        experience=parsed.get("experience", []),
+        education=parsed.get("education", []),
+        interests=None,
+    )
+    return CVUploadResponse(user_id=user_id, profile=profile, ingest=CVIngestStages(**report))
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestItem(BaseModel):
+    user_id: str
+    source: str = ""
+    path: Optional[str] = None
+    text: Optional[str] = None
+    data: Optional[bytes] = None
+    content_type: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.user_id}\t{self.source}"
+
+    @property
+    def is_pdf(self) -> bool:
+        if self.content_type and "pdf" in self.content_type.lower():
+            return True
+        return (self.path or self.source).lower().endswith(".pdf")
+
+
+def items_from_source(source: str) -> List[IngestItem]:
+    """Build items from a directory (user_id = file stem) or a manifest.jsonl.
+
+    Manifest lines look like {"user_id": "u1", "path": "cvs/u1.pdf"} or
+    {"user_id": "u1", "text": "..."}; relative paths resolve against the manifest.
+    """
+    root = Path(source)
+    if root.is_dir():
+        return [
+            IngestItem(user_id=p.stem, source=str(p), path=str(p))
+            for p in sorted(root.iterdir())
+            if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES
+        ]
+    items = []
+    with open(root, encoding="utf-8") as fh:
+        for n, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            path = row.get("path")
+            if path and not Path(path).is_absolute():
+                path = str(root.parent / path)
+            items.append(
+                IngestItem(
+                    user_id=row["user_id"],
+                    source=path or f"{root}:{n}",
+                    path=path,
+                    text=row.get("text"),
+                    content_type=row.get("content_type"),
+                )
+            )
+    return items
+
+
+class CheckpointLog:
+    """Append-only JSONL of completed item keys so an interrupted run can resume."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._done: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line:
+                        self._done.add(json.loads(line)["key"])
+
+    def done(self, key: str) -> bool:
+        return key in self._done
+
+    def mark(self, keys: List[str]):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for key in keys:
+                fh.write(json.dumps({"key": key}) + "\n")
+        self._done.update(keys)
+
+
+class BulkIngestor:
+    """Bulk CV pipeline: page-parallel PDF extraction in a process pool, LLM extraction with bounded
+    concurrency, and batched embedding + multi-row upserts of `batch_size` CVs."""
+
+    def __init__(
+        self,
+        storage: StorageService,
+        llm_concurrency: int = INGEST_LLM_CONCURRENCY,
+        batch_size: int = INGEST_BATCH_SIZE,
+        checkpoint_path: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.storage = storage
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.batch_size = max(1, batch_size)
+        self.checkpoint = CheckpointLog(checkpoint_path) if checkpoint_path else None
+        self.on_progress = on_progress
+
+    async def _extract_raw(self, item: IngestItem) -> str:
+        if item.is_pdf:
+            # Paths are passed through so worker processes read the file themselves
+            return (await extract_pdf(item.data if item.data is not None else item.path)).text
+        data = item.data if item.data is not None else await run_blocking(Path(item.path).read_bytes)
+        return decode_text_bytes(data)
+
+    async def _extract(self, item: IngestItem, report: Dict[str, Any]) -> str:
+        if item.text is not None:
+            return clean_text(item.text)
+        if get_ingest_ledger() is None:
+            return clean_text(await self._extract_raw(item))
+        raw_hash = await run_blocking(_file_hash, item.path) if item.data is None else content_hash(item.data)
+        return await extract_upload_text(
+            upload_key(raw_hash, item.is_pdf), item.user_id, lambda: self._extract_raw(item), report
+        )
+
+    async def run(self, items: List[IngestItem]) -> IngestReport:
+        start = time.perf_counter()
+        todo = [it for it in items if self.checkpoint is None or not self.checkpoint.done(it.key)]
+        state = {"ingested": 0, "docs_written": 0, "docs_unchanged": 0, "parses_reused": 0}
+        errors: List[Dict[str, str]] = []
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for item in todo:
+            pending.put_nowait(item)
+        # Bounded so parsing applies backpressure when upserts fall behind
+        ready: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size * 2)
+
+        async def parse_worker():
+            while True:
+                try:
+                    item = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                report: Dict[str, Any] = {}
+                try:
+                    content = await self._extract(item, report)
+                    if not content:
+                        raise ValueError("No parsable content")
+                    parsed, chunks = await parse_cv(content, report)
+                except Exception as e:
+                    errors.append({"user_id": item.user_id, "source": item.source, "error": str(e)})
+                    continue
+                if "parse" in report.get("skipped", []):
+                    state["parses_reused"] += 1
+                await ready.put((item, chunks, parsed))
+
+        async def flush(batch):
+            try:
+                counts = await store_cvs(self.storage, [(item.user_id, chunks, parsed) for item, chunks, parsed in batch])
+            except Exception as e:
+                errors.extend({"user_id": item.user_id, "source": item.source, "error": str(e)} for item, _, _ in batch)
+                return
+            state["docs_written"] += sum(c["written"] for c in counts.values())
+            state["docs_unchanged"] += sum(c["unchanged"] for c in counts.values())
+            # Nothing below may raise: a dead writer would leave the parse workers blocked on `ready`
+            try:
+                if self.checkpoint is not None:
+                    await run_blocking(self.checkpoint.mark, [item.key for item, _, _ in batch])
+            except Exception as e:
+                # Stored but not recorded, so a resumed run redoes them (unchanged chunks are skipped)
+                errors.extend(
+                    {"user_id": item.user_id, "source": item.source, "error": f"checkpoint not recorded: {e}"}
+                    for item, _, _ in batch
+                )
+            else:
+                state["ingested"] += len(batch)
+            if self.on_progress is not None:
+                elapsed = time.perf_counter() - start
+                try:
+                    self.on_progress({
+                        "ingested": state["ingested"],
+                        "total": len(todo),
+                        "failed": len(errors),
+                        "docs_per_sec": state["ingested"] / elapsed if elapsed else 0.0,
+                    })
+                except Exception as e:
+                    print(f"[ingest] progress callback failed: {e!r}", file=sys.stderr)
+
+        async def writer():
+            batch = []
+            while True:
+                entry = await ready.get()
+                if entry is None:
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+
+        writer_task = asyncio.create_task(writer())
+        await asyncio.gather(*[parse_worker() for _ in range(min(self.llm_concurrency, len(todo)) or 1)])
+        await ready.put(None)
+        await writer_task
+
+        elapsed = time.perf_counter() - start
+        return IngestReport(
+            total=len(items),
+            ingested=state["ingested"],
+            skipped=len(items) - len(todo),
+            failed=len(errors),
+            docs_written=state["docs_written"],
+            docs_unchanged=state["docs_unchanged"],
+            parses_reused=state["parses_reused"],
+            elapsed_s=round(elapsed, 3),
+            docs_per_sec=round(state["ingested"] / elapsed, 2) if elapsed else 0.0,
+            errors=errors,
+        )
@@ -0,0 +1,220 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import CHROMA_DIR, JOB_MAX_ATTEMPTS, JOB_RETENTION_S, JOB_RETRY_BASE_S, JOB_RETRY_MAX_S
+
+_COLUMNS = (
+    "id", "kind", "user_id", "status", "stage", "progress", "attempts", "payload_json",
+    "result_json", "error", "created_at", "started_at", "finished_at", "lease_until", "not_before",
+)
+
+
+class JobQueue:
+    """Durable FIFO of background jobs in SQLite, with uploaded files spooled next to it.
+
+    Workers claim a job with a lease; a job whose worker died (lease expired) is
+    claimed again, up to JOB_MAX_ATTEMPTS. A job failed with `retry` is requeued
+    but not claimed before its exponential backoff has passed. Claims are atomic,
+    so several processes can share one queue.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base_s: float = JOB_RETRY_BASE_S,
+        retry_max_s: float = JOB_RETRY_MAX_S,
+    ):
+        self.root = Path(root)
+        self.files = self.root / "files"
+        self.files.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        self._db = sqlite3.connect(str(self.root / "jobs.sqlite3"), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, user_id TEXT NOT NULL,"
+                " status TEXT NOT NULL, stage TEXT NOT NULL DEFAULT 'queued', progress REAL NOT NULL DEFAULT 0,"
+                " attempts INTEGER NOT NULL DEFAULT 0, payload_json TEXT NOT NULL, result_json TEXT, error TEXT,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL, lease_until REAL, not_before REAL);"
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+            if "not_before" not in columns:
+                self._db.execute("ALTER TABLE jobs ADD COLUMN not_before REAL")
+
+    def _row(self, row) -> Dict[str, Any]:
+        job = dict(zip(_COLUMNS, row))
+        job["payload"] = json.loads(job.pop("payload_json"))
+        result = job.pop("result_json")
+        job["result"] = json.loads(result) if result else None
+        return job
+
+    def file_path(self, job: Dict[str, Any]) -> Optional[str]:
+        name = job["payload"].get("file")
+        return str(self.files / name) if name else None
+
+    def enqueue(
+        self,
+        kind: str,
+        user_id: str,
+        payload: Dict[str, Any],
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+    ) -> str:
+        """Queue a job; the upload in `data` or at `path` (moved, not copied) goes with it."""
+        job_id = uuid.uuid4().hex
+        payload = dict(payload)
+        if data is not None or path is not None:
+            payload["file"] = job_id
+            target = self.files / job_id
+            if path is not None:
+                shutil.move(path, target)
+            else:
+                target.write_bytes(data)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, user_id, status, payload_json, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, user_id, json.dumps(payload), time.time()),
+            )
+        return job_id
+
+    def claim(self, lease_s: float) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job that is not backing off (or one whose worker's
+        lease ran out), or None."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                abandoned = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                ).fetchall()
+                for (job_id,) in abandoned:
+                    self._finish(job_id, "failed", None, "worker stopped responding", now)
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE (status = 'queued' AND (not_before IS NULL OR not_before <= ?))"
+                    " OR (status = 'running' AND lease_until < ?) ORDER BY created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', stage = 'started', progress = 0, attempts = attempts + 1,"
+                    " started_at = ?, lease_until = ?, not_before = NULL WHERE id = ?",
+                    (now, now + lease_s, row[0]),
+                )
+                job = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (row[0],)).fetchone()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self._row(job)
+
+    def update(self, job_id: str, stage: str, progress: float, lease_s: float):
+        """Record progress and extend the lease of a running job."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, lease_until = ? WHERE id = ? AND status = 'running'",
+                (stage, progress, time.time() + lease_s, job_id),
+            )
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str], now: float):
+        self._db.execute(
+            "UPDATE jobs SET status = ?, stage = ?, progress = ?, result_json = ?, error = ?, finished_at = ?,"
+            " lease_until = NULL WHERE id = ?",
+            (status, status, 1.0 if status == "done" else 0.0, json.dumps(result) if result is not None else None,
+             error, now, job_id),
+        )
+        try:
+            os.unlink(self.files / job_id)
+        except OSError:
+            pass
+
+    def finish(self, job_id: str, result: Dict[str, Any]):
+        with self._lock:
+            self._finish(job_id, "done", result, None, time.time())
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds a job waits before its next attempt, after `attempts` failed ones."""
+        return min(self.retry_max_s, self.retry_base_s * (2 ** max(0, attempts - 1)))
+
+    def fail(self, job_id: str, error: str, retry: bool = False) -> bool:
+        """Fail a running job, or put it back in the queue, to wait out `retry_delay`,
+        when `retry` and attempts remain. Returns whether it was requeued."""
+        with self._lock:
+            row = self._db.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if retry and row is not None and row[0] < self.max_attempts:
+                self._db.execute(
+                    "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, error = ?, lease_until = NULL,"
+                    " not_before = ? WHERE id = ?",
+                    (error, time.time() + self.retry_delay(row[0]), job_id),
+                )
+                return True
+            self._finish(job_id, "failed", None, error, time.time())
+            return False
+
+    def release(self, job_id: str):
+        """Hand a running job back to the queue without counting the attempt (worker shutdown)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, attempts = MAX(attempts - 1, 0),"
+                " lease_until = NULL WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job with, while queued, its `position` (jobs ahead of it)."""
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._row(row)
+            job["position"] = None
+            if job["status"] == "queued":
+                job["position"] = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (job["created_at"],)
+                ).fetchone()[0]
+        return job
+
+    def purge(self, older_than_s: float = JOB_RETENTION_S) -> int:
+        """Delete finished jobs older than `older_than_s`."""
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (time.time() - older_than_s,)
+            )
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            oldest = self._db.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0, **dict(rows)}
+        counts["oldest_queued_s"] = round(time.time() - oldest, 3) if oldest else 0.0
+        return counts
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """The job queue under CHROMA_DIR/jobs, opened on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(str(Path(CHROMA_DIR) / "jobs"))
+    return _queue
@@ -0,0 +1,176 @@
+import asyncio
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.concurrency import run_blocking
+from ..core.config import JOB_LEASE_S, JOB_PURGE_INTERVAL_S, JOB_RETENTION_S, JOB_WORKERS
+from ..core.embeddings import aload_clients
+from ..core.metrics import JOB_LATENCY_SECONDS, JOB_RUNS, JOB_RUN_SECONDS, JOB_WAIT_SECONDS
+from ..core.provider import ProviderUnavailable
+from .ingest_service import UPLOAD_STAGES, cv_upload_response, ingest_upload
+from .job_queue import JobQueue, get_job_queue
+from .storage_service import get_storage
+
+# Handlers get the claimed job and a callback reporting its current stage
+JobHandler = Callable[[Dict[str, Any], Callable[[str], Awaitable[None]]], Awaitable[Dict[str, Any]]]
+
+# Idle workers look for jobs enqueued by other processes this often
+_POLL_S = 1.0
+
+
+async def _run_upload(job: Dict[str, Any], on_stage: Callable[[str], Awaitable[None]]) -> Dict[str, Any]:
+    await aload_clients()
+    storage = await get_storage()
+    payload = job["payload"]
+    report: Dict[str, Any] = {}
+    parsed = await ingest_upload(
+        storage,
+        job["user_id"],
+        report,
+        text=payload.get("text"),
+        source=get_job_queue().file_path(job),
+        raw_hash=payload.get("sha256", ""),
+        is_pdf=payload.get("is_pdf", False),
+        on_stage=on_stage,
+    )
+    return cv_upload_response(job["user_id"], parsed, report).model_dump()
+
+
+HANDLERS: Dict[str, JobHandler] = {"upload_cv": _run_upload}
+# Stages per job kind, for progress fractions
+STAGES: Dict[str, tuple] = {"upload_cv": UPLOAD_STAGES}
+
+
+def _report(message: str):
+    print(f"[jobs] {message}", file=sys.stderr)
+
+
+class JobWorkers:
+    """Pool of `workers` coroutines draining the job queue on the event loop, plus one
+    that deletes finished jobs older than `retention_s` every `purge_interval_s`."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = JOB_WORKERS,
+        lease_s: float = JOB_LEASE_S,
+        retention_s: float = JOB_RETENTION_S,
+        purge_interval_s: float = JOB_PURGE_INTERVAL_S,
+    ):
+        self.queue = queue
+        self.workers = max(0, workers)
+        self.lease_s = lease_s
+        self.retention_s = retention_s
+        self.purge_interval_s = purge_interval_s
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purger()))
+
+    def notify(self):
+        """Wake idle workers after a local enqueue instead of waiting for the next poll."""
+        self._wake.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            self._wake.clear()
+            try:
+                job = await run_blocking(self.queue.claim, self.lease_s)
+            except Exception:
+                # e.g. the database is locked by another process; try again after the poll
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), _POLL_S)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Never let one job end the worker; its lease runs out and it is claimed again
+                _report(f"worker error on job {job['id']}: {type(e).__name__}: {e}")
+
+    async def _purger(self):
+        while True:
+            try:
+                purged = await run_blocking(self.queue.purge, self.retention_s)
+            except Exception as e:
+                _report(f"purge failed: {type(e).__name__}: {e}")
+            else:
+                if purged:
+                    _report(f"purged {purged} finished jobs")
+            await asyncio.sleep(self.purge_interval_s)
+
+    async def _run(self, job: Dict[str, Any]):
+        kind = job["kind"]
+        JOB_WAIT_SECONDS.observe(max(0.0, job["started_at"] - job["created_at"]), kind=kind)
+        stages = STAGES.get(kind, ())
+        start = time.perf_counter()
+
+        async def on_stage(stage: str):
+            done = stages.index(stage) if stage in stages else 0
+            await run_blocking(self.queue.update, job["id"], stage, done / len(stages) if stages else 0.0, self.lease_s)
+
+        error: Optional[Exception] = None
+        try:
+            handler = HANDLERS.get(kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {kind}")
+            result = await handler(job, on_stage)
+        except asyncio.CancelledError:
+            # Shutting down: another worker (or the next start) picks it up again
+            await asyncio.shield(run_blocking(self.queue.release, job["id"]))
+            raise
+        except Exception as e:
+            error = e
+        try:
+            if error is None:
+                await run_blocking(self.queue.finish, job["id"], result)
+                status = "done"
+            else:
+                # Only provider outages are worth another attempt; bad uploads fail the same way twice
+                retry = isinstance(error, ProviderUnavailable)
+                requeued = await run_blocking(self.queue.fail, job["id"], str(error) or type(error).__name__, retry)
+                status = "retried" if requeued else "failed"
+        except Exception as e:
+            # The job stays running until its lease runs out; then it is claimed again
+            status = "unrecorded"
+            _report(f"could not record the outcome of job {job['id']}: {type(e).__name__}: {e}")
+        JOB_RUN_SECONDS.observe(time.perf_counter() - start, kind=kind)
+        JOB_RUNS.inc(kind=kind, status=status)
+        if status in ("done", "failed"):
+            JOB_LATENCY_SECONDS.observe(max(0.0, time.time() - job["created_at"]), kind=kind)
+
+
+_workers: Optional[JobWorkers] = None
+
+
+async def start_job_workers() -> JobWorkers:
+    """Open the queue and start JOB_WORKERS workers and the purge of expired finished jobs."""
+    global _workers
+    queue = await run_blocking(get_job_queue)
+    _workers = JobWorkers(queue)
+    _workers.start()
+    return _workers
+
+
+async def stop_job_workers():
+    global _workers
+    if _workers is not None:
+        await _workers.stop()
+        _workers = None
+
+
+def notify_job_workers():
+    if _workers is not None:
+        _workers.notify()
@@ -1,9 +1,20 @@
+import copy
+import hashlib
 import io
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
+from ..core.config import OPENAI_MODEL, PARSE_MAX_TOKENS, PROFILE_PARSER
+from ..core.tokens import truncate_to_tokens
 from ..core.utils import clean_text
 from ..core.embeddings import get_llm
+from ..core.metrics import DEGRADED_RESPONSES, record_llm_usage, stage, timed
+from ..core.provider import ProviderUnavailable, get_gate
+from ..core.single_flight import SingleFlight
+from ..core.taxonomy import get_taxonomy
+
+# Bump when the parse prompt changes so stored profiles are not reused
+PARSE_PROMPT_VERSION = "2"
 
 # PDF parsing
 try:
@@ -12,6 +23,7 @@ except Exception:  # pragma: no cover
     PyPDF2 = None
 
 
+@timed("pdf_extract")
 def extract_text_from_pdf_bytes(data: bytes) -> str:
     if PyPDF2 is None:
         raise RuntimeError("PyPDF2 is not installed; cannot parse PDF.")
@@ -25,36 +37,42 @@ def extract_text_from_pdf_bytes(data: bytes) -> str:
     return clean_text("\n".join(contents))
 
 
-def parse_profile_from_text(text: str) -> Dict[str, Any]:
-    """Summarize CV text and extract structured fields using LLM; returns dict.
-    Fallback: lightweight heuristics when LLM is unavailable.
-    """
-    text = clean_text(text)
-    try:
-        llm = get_llm()
-    except Exception:
-        # Fallback heuristics
-        skills = []
-        for token in set([t.strip(',.;:') for t in text.split()]):
-            if token.lower() in {"python", "sql", "excel", "ml", "nlp", "java", "c++", "javascript", "pandas", "numpy"}:
-                skills.append(token)
-        return {
-            "summary": text[:500] + ("..." if len(text) > 500 else ""),
-            "skills": sorted(list(set(skills)))[:20],
-            "experience": [],
-            "education": [],
-        }
+def _detect_skills(text: str) -> List[str]:
+    with stage("skill_match"):
+        return get_taxonomy().extract_skills(text)
+
+
+def _fallback_profile(text: str, skills: Optional[List[str]] = None) -> Dict[str, Any]:
+    # Offline parser: taxonomy skills, most mentioned first
+    skills = _detect_skills(text) if skills is None else skills
+    return {
+        "summary": text[:500] + ("..." if len(text) > 500 else ""),
+        "skills": skills[:20],
+        "experience": [],
+        "education": [],
+    }
+
 
+def _build_messages(text: str, detected: List[str]) -> List[Tuple[str, str]]:
     system = (
         "You are an expert career analyst. Read the user's CV/resume text and extract a JSON with keys:"
         " summary (2-3 sentences), skills (array of concise skill names), experience (array of role highlights),"
         " education (array of degree/program entries). Return ONLY valid JSON."
     )
-    user = f"CV Text:\n{text[:12000]}"
-    msg = llm.invoke([
+    user = f"CV Text:\n{truncate_to_tokens(text, PARSE_MAX_TOKENS, OPENAI_MODEL)}"
+    if detected:
+        # Seeded by the taxonomy pre-pass, the model only lists what the matcher missed
+        user += (
+            f"\n\nSkills already detected: {', '.join(detected)}."
+            " Do not repeat them; put only other skills in `skills`."
+        )
+    return [
         ("system", system),
         ("user", user),
-    ])
+    ]
+
+
+def _parse_llm_output(msg: Any, text: str, detected: List[str]) -> Dict[str, Any]:
     content = getattr(msg, "content", "") if msg else ""
     try:
         data = json.loads(content)
@@ -73,4 +91,60 @@ def parse_profile_from_text(text: str) -> Dict[str, Any]:
     data.setdefault("skills", [])
     data.setdefault("experience", [])
     data.setdefault("education", [])
+    extra = [str(s) for s in data["skills"]] if isinstance(data["skills"], list) else []
+    data["skills"] = get_taxonomy().normalize_skills(detected + extra)
     return data
+
+
+# Duplicate uploads of one CV in flight at once (double submits, client retries) share a parse
+_parse_flight = SingleFlight("parse")
+
+
+def parser_key() -> str:
+    """Identifies the parser `aparse_profile_from_text` runs, so stored profiles are
+    reused only while the parser, model, prompt and taxonomy stay the same."""
+    taxonomy = get_taxonomy().fingerprint
+    if PROFILE_PARSER == "taxonomy":
+        return f"taxonomy:{taxonomy}"
+    try:
+        get_llm()
+    except Exception:
+        return f"taxonomy:{taxonomy}"
+    return f"llm:{OPENAI_MODEL}:{PARSE_PROMPT_VERSION}:{taxonomy}"
+
+
+async def aparse_profile_from_text(text: str, usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Summarize CV text and extract structured fields using LLM; returns dict.
+    Fallback: the skill taxonomy matcher when the LLM is unavailable or PROFILE_PARSER=taxonomy.
+
+    `usage["degraded"]` is set when the provider was failing and the taxonomy
+    fallback answered instead.
+    """
+    text = clean_text(text)
+    if PROFILE_PARSER == "taxonomy":
+        return _fallback_profile(text)
+    try:
+        llm = get_llm()
+    except Exception:
+        return _fallback_profile(text)
+
+    key = hashlib.sha256(f"{OPENAI_MODEL}\0{text}".encode("utf-8")).hexdigest()
+    (profile, degraded), _ = await _parse_flight.do(key, lambda: _aparse_with_llm(llm, text))
+    if degraded and usage is not None:
+        usage["degraded"] = True
+    # Each caller gets its own copy of the shared result
+    return copy.deepcopy(profile)
+
+
+async def _aparse_with_llm(llm: Any, text: str) -> Tuple[Dict[str, Any], bool]:
+    detected = _detect_skills(text)
+    messages = _build_messages(text, detected)
+    try:
+        with stage("llm_parse"):
+            msg = await get_gate(OPENAI_MODEL).call(lambda: llm.ainvoke(messages))
+    except ProviderUnavailable:
+        # Provider unhealthy: the taxonomy profile keeps uploads fast
+        DEGRADED_RESPONSES.inc(op="parse")
+        return _fallback_profile(text, detected), True
+    record_llm_usage("parse", msg)
+    return _parse_llm_output(msg, text, detected), False
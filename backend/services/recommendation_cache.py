@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import CHROMA_DIR, OPENAI_MODEL, REC_CACHE_TTL_S, REC_CACHE_MAX_ENTRIES
+from .career_service import recommendation_version
+
+CACHE_NAME = "pathfinder"
+
+Key = Tuple[str, int, Tuple[str, ...], str, str]
+
+
+def normalize_interests(interests: Optional[List[str]]) -> Tuple[str, ...]:
+    return tuple(sorted({i.strip().lower() for i in interests or [] if i and i.strip()}))
+
+
+class UserVersions:
+    """Per-user content versions in SQLite, shared by every process using the same
+    file: a CV stored by a background worker or `backend.ingest` in another process
+    invalidates this one's cached recommendations too. Without a path they are
+    kept in memory, for this process only."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._memory: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.db_path:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS user_versions (user_id TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def get(self, user_id: str) -> int:
+        with self._lock:
+            db = self._open()
+            if db is None:
+                return self._memory.get(user_id, 0)
+            row = db.execute("SELECT version FROM user_versions WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, user_id: str) -> int:
+        with self._lock:
+            db = self._open()
+            if db is None:
+                self._memory[user_id] = self._memory.get(user_id, 0) + 1
+                return self._memory[user_id]
+            db.execute(
+                "INSERT INTO user_versions (user_id, version) VALUES (?, 1)"
+                " ON CONFLICT (user_id) DO UPDATE SET version = version + 1",
+                (user_id,),
+            )
+            db.commit()
+            return db.execute("SELECT version FROM user_versions WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+class RecommendationCache:
+    """TTL + LRU cache of recommendation results.
+
+    Keys carry a per-user content version that profile/interest writes bump,
+    so stale entries are never read again and simply age out. Entries are per
+    process, but the versions in `versions` may be shared: then a write in any
+    process invalidates the user's entries everywhere.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_s: float = 3600.0, versions: Optional[UserVersions] = None):
+        self.max_entries = max(0, max_entries)
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Key, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._versions = versions or UserVersions()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_s > 0
+
+    def user_version(self, user_id: str) -> int:
+        return self._versions.get(user_id)
+
+    def bump_user_version(self, user_id: str) -> int:
+        version = self._versions.bump(user_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+        return version
+
+    def make_key(self, user_id: str, interests: Optional[List[str]]) -> Key:
+        return (user_id, self.user_version(user_id), normalize_interests(interests), OPENAI_MODEL, recommendation_version())
+
+    def get(self, key: Key) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (value, remaining ttl seconds) or None."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1]), entry[0] - now
+
+    def set(self, key: Key, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def cache_status(
+    hit: bool, ttl: Optional[float] = None, stored: bool = False, collapsed: bool = False, detail: Optional[str] = None
+) -> str:
+    """Format an RFC 9211 `Cache-Status` header value.
+
+    `collapsed` marks a miss that was answered by another request's in-flight generation;
+    `detail` tells which cache answered a hit.
+    """
+    if hit:
+        return (
+            f"{CACHE_NAME}; hit"
+            + (f"; ttl={int(ttl)}" if ttl is not None else "")
+            + (f"; detail={detail}" if detail else "")
+        )
+    return f"{CACHE_NAME}; fwd=miss" + ("; stored" if stored else "") + ("; collapsed" if collapsed else "")
+
+
+recommendation_cache = RecommendationCache(
+    max_entries=REC_CACHE_MAX_ENTRIES,
+    ttl_s=REC_CACHE_TTL_S,
+    versions=UserVersions(str(Path(CHROMA_DIR) / "user_versions.sqlite3")),
+)
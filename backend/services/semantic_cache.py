@@ -0,0 +1,215 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.concurrency import run_blocking
+from ..core.config import (
+    OPENAI_MODEL,
+    SEMANTIC_CACHE,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_S,
+)
+from ..core.embeddings import aembed_texts
+from ..core.metrics import SEMANTIC_CACHE_LOOKUPS, SEMANTIC_CACHE_SIMILARITY, stage
+from ..core.provider import ProviderUnavailable
+from ..core.taxonomy import get_taxonomy
+from ..core.vector_store import VectorStore, open_vector_store
+from .career_service import adapt_recommendation, arecommend_career, recommendation_version
+from .recommendation_cache import normalize_interests
+
+COLLECTION = "semantic_rec_cache"
+# Every entry is filed under this pseudo user, so any VectorStore can hold them
+SCOPE = "semantic-cache"
+# Entries fetched per lookup: the closest may be expired or from an older prompt
+_CANDIDATES = 3
+
+
+def semantic_key(profile: Dict[str, Any], interests: Optional[List[str]]) -> str:
+    """Normalized text of what a recommendation depends on: canonical skills, interests, summary."""
+    taxonomy = get_taxonomy()
+    skills = sorted({(taxonomy.canonical_skill(s) or s.strip()).lower() for s in profile.get("skills", []) if s.strip()})
+    summary = " ".join(str(profile.get("summary", "")).lower().split())[:1000]
+    return f"SKILLS: {', '.join(skills)}\nINTERESTS: {', '.join(normalize_interests(interests))}\nSUMMARY: {summary}"
+
+
+def _has_content(profile: Dict[str, Any]) -> bool:
+    # Empty profiles would all match each other
+    return bool(profile.get("skills") or str(profile.get("summary", "")).strip())
+
+
+def _version() -> str:
+    return f"{OPENAI_MODEL}:{recommendation_version()}"
+
+
+class SemanticRecommendationCache:
+    """Recommendations reused across users whose profiles embed almost identically.
+
+    Entries (key embedding, recommendation) live in their own vector collection
+    and expire after `ttl_s`; past `max_entries` the least recently used are
+    deleted. Hits are adapted to the asking profile (see adapt_recommendation).
+    Similarity is cosine over unit embeddings, from the store's squared L2
+    distance.
+    """
+
+    def __init__(self, threshold: float, ttl_s: float, max_entries: int, enabled: bool = True):
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max(0, max_entries)
+        self._enabled = enabled
+        self._store: Optional[VectorStore] = None
+        # Entry id -> expiry (wall clock), least recently used first
+        self._index: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled and self.max_entries > 0 and self.ttl_s > 0
+
+    def _open(self) -> VectorStore:
+        with self._lock:
+            if self._store is None:
+                store = open_vector_store(COLLECTION)
+                ids = store.doc_ids([SCOPE])
+                metas = store.get_metadata(ids) if ids else []
+                entries = sorted(
+                    ((doc_id, meta) for doc_id, meta in zip(ids, metas) if meta),
+                    key=lambda e: e[1].get("created_at", 0.0),
+                )
+                self._index = OrderedDict((doc_id, float(meta.get("expires_at", 0.0))) for doc_id, meta in entries)
+                self._store = store
+            return self._store
+
+    def _lookup(self, embedding: List[float], version: str) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """(recommendation, similarity) of the closest live entry at or above the threshold;
+        the recommendation is None on a miss, the similarity None when the cache is empty."""
+        store = self._open()
+        with stage("semantic_cache_query"):
+            rows = store.query(SCOPE, embedding, _CANDIDATES)
+        now = time.time()
+        best: Optional[float] = None
+        expired = []
+        for row in rows:
+            meta = row.get("metadata") or {}
+            similarity = 1.0 - float(row["distance"]) / 2.0
+            if float(meta.get("expires_at", 0.0)) <= now:
+                expired.append(row["id"])
+                continue
+            if meta.get("version") != version:
+                continue
+            best = similarity if best is None else max(best, similarity)
+            if similarity >= self.threshold:
+                with self._lock:
+                    if row["id"] in self._index:
+                        self._index.move_to_end(row["id"])
+                if expired:
+                    self._delete(expired)
+                return json.loads(meta["recommendation_json"]), similarity
+        if expired:
+            self._delete(expired)
+        return None, best
+
+    def _put(self, embedding: List[float], key: str, rec: Dict[str, Any], version: str):
+        store = self._open()
+        now = time.time()
+        doc_id = "semantic:" + hashlib.sha256(f"{version}\n{key}".encode("utf-8")).hexdigest()[:32]
+        meta = {
+            "user_id": SCOPE,
+            "type": "recommendation",
+            "version": version,
+            "created_at": now,
+            "expires_at": now + self.ttl_s,
+            "recommendation_json": json.dumps(rec),
+        }
+        store.upsert([doc_id], [key], [meta], [embedding])
+        with self._lock:
+            self._index[doc_id] = now + self.ttl_s
+            self._index.move_to_end(doc_id)
+            doomed = [i for i, expires in self._index.items() if expires <= now]
+            overflow = len(self._index) - len(doomed) - self.max_entries
+            if overflow > 0:
+                dead = set(doomed)
+                doomed += [i for i in self._index if i not in dead][:overflow]
+        self._delete(doomed)
+
+    def _delete(self, ids: List[str]):
+        if not ids:
+            return
+        self._open().delete(ids)
+        with self._lock:
+            for i in ids:
+                self._index.pop(i, None)
+
+    async def alookup(self, profile: Dict[str, Any], interests: Optional[List[str]]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(adapted recommendation, similarity) from a near-identical profile, or None."""
+        if not self.enabled or not _has_content(profile):
+            return None
+        try:
+            embedding = (await aembed_texts([semantic_key(profile, interests)]))[0]
+        except ProviderUnavailable:
+            return None
+        rec, similarity = await run_blocking(self._lookup, embedding, _version())
+        if similarity is not None:
+            SEMANTIC_CACHE_SIMILARITY.observe(similarity)
+        with self._lock:
+            if rec is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        SEMANTIC_CACHE_LOOKUPS.inc(result="miss" if rec is None else "hit")
+        if rec is None:
+            return None
+        return adapt_recommendation(rec, profile, list(interests or [])), similarity
+
+    async def astore(self, profile: Dict[str, Any], interests: Optional[List[str]], rec: Dict[str, Any]):
+        if not self.enabled or not _has_content(profile):
+            return
+        key = semantic_key(profile, interests)
+        try:
+            # Usually an embedding cache hit: the lookup embedded the same key
+            embedding = (await aembed_texts([key]))[0]
+        except ProviderUnavailable:
+            return
+        await run_blocking(self._put, embedding, key, rec, _version())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._index),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+semantic_cache = SemanticRecommendationCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_s=SEMANTIC_CACHE_TTL_S,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+    enabled=SEMANTIC_CACHE,
+)
+
+
+async def arecommend_with_semantic_cache(
+    profile: Dict[str, Any], interests: List[str], retrieved_context: Any, usage: Dict[str, Any]
+) -> Dict[str, Any]:
+    """`arecommend_career`, answered from the semantic cache when a near-identical profile
+    was answered before; a hit sets usage["semantic_similarity"]."""
+    hit = await semantic_cache.alookup(profile, interests)
+    if hit is not None:
+        rec, usage["semantic_similarity"] = hit
+        return rec
+    rec = await arecommend_career(profile, interests, retrieved_context, usage=usage)
+    if not usage.get("degraded"):
+        await semantic_cache.astore(profile, interests, rec)
+    return rec
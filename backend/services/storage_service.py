@@ -1,13 +1,46 @@
-from typing import Dict, List, Optional, Any
+import json
+import threading
+from typing import Dict, List, Optional, Any, Tuple
 
-from ..core.embeddings import get_collection, embed_texts
+from ..core.embeddings import aembed_texts
+from ..core.vector_store import get_vector_store
+from ..core.concurrency import run_blocking
+from ..core.metrics import VECTOR_UPSERT_ROWS, stage
+
+
+PROFILE_FIELDS = ("summary", "skills", "experience", "education")
+
+
+def profile_doc_id(user_id: str) -> str:
+    return f"{user_id}:profile"
+
+
+def chunk_doc_id(user_id: str, doc_type: str, n: int) -> str:
+    return f"{user_id}:{doc_type}:{n}"
+
+
+def build_profile_text(parsed: Dict[str, Any]) -> str:
+    """Compose the profile text that gets embedded next to the raw CV."""
+    return (
+        f"SUMMARY: {parsed.get('summary','')}\n"
+        f"SKILLS: {', '.join(parsed.get('skills', []))}\n"
+        f"EXPERIENCE: {' | '.join(parsed.get('experience', []))}\n"
+        f"EDUCATION: {' | '.join(parsed.get('education', []))}"
+    )
+
+
+def _split_legacy(value: Any) -> List[str]:
+    # Profiles written before `profile_json` existed were flattened to "a, b, c"
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value or "").split(",") if v.strip()]
 
 
 class StorageService:
-    """ChromaDB storage and retrieval wrapper for user context."""
+    """Storage and retrieval of user context on the configured vector store (VECTOR_BACKEND)."""
 
     def __init__(self):
-        self.collection = get_collection()
+        self.store = get_vector_store()
 
     def _sanitize_metadata(self, meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Chroma metadata must be primitives; coerce lists/dicts/others to strings."""
@@ -29,37 +62,145 @@ class StorageService:
                 clean[k] = str(v)
         return clean
 
-    def add_user_doc(self, user_id: str, text: str, metadata: Dict):
+    def _prepare_doc(self, user_id: str, metadata: Dict):
         # Ensure user_id in metadata for filtering
         meta = dict(metadata or {})
         meta.setdefault("user_id", user_id)
-        emb = embed_texts([text])[0]
         doc_id = meta.get("id") or f"{user_id}:{meta.get('type','doc')}"
-        safe_meta = self._sanitize_metadata(meta)
-        self.collection.upsert(
-            ids=[doc_id],
-            documents=[text],
-            metadatas=[safe_meta],
-            embeddings=[emb],
-        )
+        return doc_id, self._sanitize_metadata(meta)
+
+    def doc_id(self, user_id: str, metadata: Dict) -> str:
+        """The id a doc with `metadata` is stored under."""
+        return self._prepare_doc(user_id, metadata)[0]
+
+    def _upsert(self, ids: List[str], texts: List[str], metas: List[Dict[str, Any]], embs: List[List[float]]):
+        with stage("vector_upsert"):
+            self.store.upsert(ids, texts, metas, embs)
+        VECTOR_UPSERT_ROWS.inc(len(ids))
+
+    def _query(self, user_id: str, q_emb: List[float], top_k: int) -> List[Dict]:
+        with stage("vector_query"):
+            return self.store.query(user_id, q_emb, top_k)
+
+    async def aadd_user_doc(self, user_id: str, text: str, metadata: Dict):
+        """Embeds via the provider's async API, upserts on the blocking executor."""
+        doc_id, safe_meta = self._prepare_doc(user_id, metadata)
+        emb = (await aembed_texts([text]))[0]
+        await run_blocking(self._upsert, [doc_id], [text], [safe_meta], [emb])
         return doc_id
 
-    def query_user(self, user_id: str, query_text: str, top_k: int = 5) -> List[Dict]:
-        q_emb = embed_texts([query_text])[0]
-        res = self.collection.query(
-            query_embeddings=[q_emb],
-            n_results=top_k,
-            where={"user_id": user_id},
-        )
-        # Normalize result into list of dicts
-        results: List[Dict] = []
-        for i in range(len(res.get("ids", [[]])[0])):
-            results.append(
-                {
-                    "id": res["ids"][0][i],
-                    "document": res.get("documents", [[None]])[0][i],
-                    "metadata": res.get("metadatas", [[None]])[0][i],
-                    "distance": res.get("distances", [[None]])[0][i],
-                }
-            )
-        return results
+    async def aadd_docs(self, docs: List[Tuple[str, str, Dict]]) -> List[str]:
+        """Store (user_id, text, metadata) docs for any number of users in one batch."""
+        if not docs:
+            return []
+        # Chroma rejects duplicate ids within one upsert; the last write for an id wins
+        by_id: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for user_id, text, meta in docs:
+            doc_id, safe_meta = self._prepare_doc(user_id, meta)
+            by_id.pop(doc_id, None)
+            by_id[doc_id] = (text, safe_meta)
+        ids = list(by_id)
+        texts = [text for text, _ in by_id.values()]
+        embs = await aembed_texts(texts)
+        await run_blocking(self._upsert, ids, texts, [meta for _, meta in by_id.values()], embs)
+        return ids
+
+    async def aquery_user(self, user_id: str, query_text: str, top_k: int = 5) -> List[Dict]:
+        q_emb = (await aembed_texts([query_text]))[0]
+        return await run_blocking(self._query, user_id, q_emb, top_k)
+
+    def _query_many(self, user_ids: List[str], q_embs: List[List[float]], top_k: int) -> List[List[Dict]]:
+        with stage("vector_query"):
+            return self.store.query_many(user_ids, q_embs, top_k)
+
+    async def aquery_users(self, queries: List[Tuple[str, str]], top_k: int = 5) -> List[List[Dict]]:
+        """Retrieval for many (user_id, query_text) pairs: one embedding batch, one multi-query store call."""
+        if not queries:
+            return []
+        q_embs = await aembed_texts([text for _, text in queries])
+        return await run_blocking(self._query_many, [user_id for user_id, _ in queries], q_embs, top_k)
+
+    def profile_metadata(self, user_id: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = {
+            "summary": profile.get("summary", ""),
+            "skills": list(profile.get("skills", [])),
+            "experience": list(profile.get("experience", [])),
+            "education": list(profile.get("education", [])),
+        }
+        meta: Dict[str, Any] = {"type": "profile", "user_id": user_id, **snapshot}
+        # Native lists survive in JSON; the flat fields stay for metadata filtering
+        meta["profile_json"] = json.dumps(snapshot)
+        return meta
+
+    def _get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._get_profiles([user_id])[0]
+
+    def _get_profiles(self, user_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        with stage("vector_get"):
+            metas = self.store.get_metadata([profile_doc_id(user_id) for user_id in user_ids])
+        return [self._profile_from_meta(meta) for meta in metas]
+
+    @staticmethod
+    def _profile_from_meta(meta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not meta:
+            return None
+        if meta.get("profile_json"):
+            try:
+                return json.loads(meta["profile_json"])
+            except Exception:
+                pass
+        return {
+            "summary": meta.get("summary", "") or "",
+            "skills": _split_legacy(meta.get("skills")),
+            "experience": _split_legacy(meta.get("experience")),
+            "education": _split_legacy(meta.get("education")),
+        }
+
+    def _delete_stale(self, doc_type: str, keep_ids: Dict[str, List[str]]) -> int:
+        """Delete `doc_type` docs of the given users whose ids are not in `keep_ids[user_id]`."""
+        if not keep_ids:
+            return 0
+        keep = {doc_id for ids in keep_ids.values() for doc_id in ids}
+        with stage("vector_delete"):
+            stale = [doc_id for doc_id in self.store.doc_ids(list(keep_ids), doc_type) if doc_id not in keep]
+            if stale:
+                self.store.delete(stale)
+        return len(stale)
+
+    async def adelete_stale(self, doc_type: str, keep_ids: Dict[str, List[str]]) -> int:
+        """Drop chunks left over from a previous, longer upload (and legacy single-doc ids)."""
+        return await run_blocking(self._delete_stale, doc_type, keep_ids)
+
+    def _count_user_docs(self, user_id: str) -> int:
+        with stage("vector_get"):
+            return self.store.count(user_id)
+
+    async def aget_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await run_blocking(self._get_profile, user_id)
+
+    async def aget_profiles(self, user_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return await run_blocking(self._get_profiles, user_ids)
+
+    async def acount_user_docs(self, user_id: str) -> int:
+        return await run_blocking(self._count_user_docs, user_id)
+
+
+_storage: Optional[StorageService] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage_service() -> StorageService:
+    """The process-wide StorageService, created on first use (opens the vector store)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = StorageService()
+    return _storage
+
+
+async def get_storage() -> StorageService:
+    """FastAPI dependency: the shared StorageService, opened off the event loop the first time."""
+    if _storage is not None:
+        return _storage
+    return await run_blocking(get_storage_service)
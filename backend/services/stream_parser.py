@@ -0,0 +1,138 @@
+import json
+from typing import Any, List, Tuple
+
+# Parser states
+_START, _KEY_OR_END, _KEY, _COLON, _VALUE, _STRING, _ARRAY, _ARRAY_STRING, _SKIP, _DONE = range(10)
+
+Event = Tuple[str, str, Any]
+
+
+class IncrementalJSONParser:
+    """Incrementally parse a streamed top-level JSON object.
+
+    `feed()` accepts arbitrary text chunks and returns the events completed by
+    them: ("field", key, value) once a top-level string value is closed, and
+    ("item", key, value) for each string element of a top-level array. Text
+    before the first "{" (e.g. a ```json fence) is ignored; values of other
+    types are skipped.
+    """
+
+    def __init__(self):
+        self.state = _START
+        self.key = ""
+        self._raw: List[str] = []
+        self._escape = False
+        self._after_string = _KEY_OR_END
+        # For skipping non-string values: nesting depth and whether inside a string
+        self._depth = 0
+        self._skip_in_string = False
+        self._skip_return = _KEY_OR_END
+
+    @property
+    def done(self) -> bool:
+        return self.state == _DONE
+
+    def _read_string_char(self, ch: str) -> bool:
+        """Accumulate one char of a string body; True once the closing quote is read."""
+        if self._escape:
+            self._raw.append(ch)
+            self._escape = False
+        elif ch == "\\":
+            self._raw.append(ch)
+            self._escape = True
+        elif ch == '"':
+            return True
+        else:
+            self._raw.append(ch)
+        return False
+
+    def _take_string(self) -> str:
+        raw = "".join(self._raw)
+        self._raw = []
+        try:
+            return json.loads('"' + raw + '"')
+        except Exception:
+            return raw
+
+    def _skip_char(self, ch: str) -> bool:
+        """Consume one char of a skipped value; True when the value ended before `ch`."""
+        if self._skip_in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._skip_in_string = False
+            return False
+        if ch == '"':
+            self._skip_in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            if self._depth == 0:
+                return True
+            self._depth -= 1
+        elif ch == "," and self._depth == 0:
+            return True
+        return False
+
+    def feed(self, chunk: str) -> List[Event]:
+        events: List[Event] = []
+        for ch in chunk or "":
+            state = self.state
+            if state == _START:
+                if ch == "{":
+                    self.state = _KEY_OR_END
+            elif state == _KEY_OR_END:
+                if ch == '"':
+                    self.state = _KEY
+                elif ch == "}":
+                    self.state = _DONE
+            elif state == _KEY:
+                if self._read_string_char(ch):
+                    self.key = self._take_string()
+                    self.state = _COLON
+            elif state == _COLON:
+                if ch == ":":
+                    self.state = _VALUE
+            elif state == _VALUE:
+                if ch.isspace():
+                    continue
+                if ch == '"':
+                    self.state = _STRING
+                elif ch == "[":
+                    self.state = _ARRAY
+                else:
+                    self._begin_skip(ch, _KEY_OR_END)
+            elif state == _STRING:
+                if self._read_string_char(ch):
+                    events.append(("field", self.key, self._take_string()))
+                    self.state = _KEY_OR_END
+            elif state == _ARRAY:
+                if ch == '"':
+                    self.state = _ARRAY_STRING
+                elif ch == "]":
+                    self.state = _KEY_OR_END
+                elif not ch.isspace() and ch != ",":
+                    self._begin_skip(ch, _ARRAY)
+            elif state == _ARRAY_STRING:
+                if self._read_string_char(ch):
+                    events.append(("item", self.key, self._take_string()))
+                    self.state = _ARRAY
+            elif state == _SKIP:
+                if self._skip_char(ch):
+                    self.state = self._skip_return
+                    # The terminator belongs to the enclosing container
+                    if ch == "}" and self.state == _KEY_OR_END:
+                        self.state = _DONE
+                    elif ch == "]" and self.state == _ARRAY:
+                        self.state = _KEY_OR_END
+        return events
+
+    def _begin_skip(self, ch: str, return_state: int):
+        self._depth = 0
+        self._skip_in_string = False
+        self._escape = False
+        self._skip_return = return_state
+        self.state = _SKIP
+        self._skip_char(ch)
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import EMBEDDING_BACKEND, OPENAI_API_KEY, READY_PROBE_TIMEOUT_S, READY_PROBE_TTL_S
+from ..core.concurrency import run_blocking
+from ..core.embeddings import aload_clients, get_embedder, get_llm
+from ..core.career_catalog import get_career_catalog
+from ..core.taxonomy import get_taxonomy
+from .storage_service import get_storage
+
+# Warm-up progress, reported by /readyz
+_state: Dict[str, Any] = {"index_loaded": False, "warmup_s": None, "error": None}
+_task: Optional[asyncio.Task] = None
+# Last provider probe: (monotonic time, reachable, detail)
+_probe: Tuple[float, bool, str] = (0.0, False, "not checked")
+
+
+async def probe_provider(force: bool = False) -> Tuple[bool, str]:
+    """Whether the LLM provider answers a model listing; results are reused for READY_PROBE_TTL_S."""
+    global _probe
+    if not OPENAI_API_KEY:
+        # Without a key every request takes the rule-based fallbacks, which need no provider
+        return True, "not configured"
+    checked_at, ok, detail = _probe
+    if not force and checked_at and time.monotonic() - checked_at < READY_PROBE_TTL_S:
+        return ok, detail
+    try:
+        await aload_clients()
+        # Listing models costs no tokens and opens the chat client's connection pool
+        await asyncio.wait_for(get_llm().root_async_client.models.list(), timeout=READY_PROBE_TIMEOUT_S)
+        ok, detail = True, "ok"
+    except Exception as e:
+        ok, detail = False, f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+    _probe = (time.monotonic(), ok, detail)
+    return ok, detail
+
+
+async def warm_up():
+    """Open the vector store, load its index, compile the skill taxonomy, build the
+    provider clients and prime their connections, and load the career catalog's embeddings.
+    """
+    start = time.perf_counter()
+    try:
+        storage = await get_storage()
+        await run_blocking(get_taxonomy)
+        catalog = await run_blocking(get_career_catalog)
+        await run_blocking(storage.store.warm)
+        _state["index_loaded"] = True
+        await aload_clients()
+        await probe_provider(force=True)
+        if OPENAI_API_KEY and EMBEDDING_BACKEND == "openai":
+            await asyncio.wait_for(get_embedder().aembed_query("warm-up"), timeout=READY_PROBE_TIMEOUT_S)
+        if catalog is not None and (OPENAI_API_KEY or EMBEDDING_BACKEND != "openai"):
+            # Embeds the catalog on first start; later starts load the saved matrix
+            await run_blocking(catalog.matrix)
+        _state["error"] = None
+    except Exception as e:
+        _state["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        _state["warmup_s"] = round(time.perf_counter() - start, 3)
+
+
+def start_warm_up() -> asyncio.Task:
+    """Run `warm_up` in the background unless it is already running."""
+    global _task
+    if _task is None or (_task.done() and not _state["index_loaded"]):
+        _task = asyncio.get_running_loop().create_task(warm_up())
+    return _task
+
+
+async def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """(ready, report) for /readyz: the index is loaded and the provider is reachable."""
+    if not _state["index_loaded"] and (_task is None or _task.done()):
+        # Warm-up disabled at startup or failed: the readiness probe retries it
+        start_warm_up()
+    provider_ok, provider_detail = await probe_provider()
+    index_detail = "ok" if _state["index_loaded"] else (_state["error"] or "loading")
+    ready = _state["index_loaded"] and provider_ok
+    report = {
+        "status": "ready" if ready else "not ready",
+        "checks": {"index": index_detail, "provider": provider_detail},
+        "warmup_s": _state["warmup_s"],
+    }
+    return ready, report
@@ -0,0 +1,85 @@
+"""Career shortlist latency against catalogs of growing size, vectorized vs a per-career loop.
+
+Catalogs beyond the bundled one are padded with synthetic careers and random
+unit embeddings; the loop baseline scores each career in Python, as a
+straightforward implementation would (timed on at most 10,000 careers).
+
+    python -m benchmarks.career_catalog --sizes 0,1000,10000,100000 --dim 1536
+"""
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from backend.core.career_catalog import DEFAULT_CATALOG_PATH, CareerCatalog
+from backend.core.taxonomy import DEFAULT_TAXONOMY_PATH, SkillTaxonomy
+
+
+def _catalog(base: CareerCatalog, synthetic: int, dim: int, rng: random.Random) -> CareerCatalog:
+    skills = sorted({s for c in base.careers for s in c["skills"]})
+    careers = list(base.careers)
+    for i in range(synthetic):
+        careers.append({
+            "title": f"Career {i}",
+            "description": "Synthetic career.",
+            "skills": rng.sample(skills, 8),
+            "learning_path": ["Learn the basics", "Build a project"],
+        })
+    matrix = np.random.default_rng(0).standard_normal((len(careers), dim)).astype(np.float32)
+    return CareerCatalog(careers, base.taxonomy, matrix=matrix)
+
+
+def _loop_shortlist(careers, rows, query, skills, k):
+    have = {s.lower() for s in skills}
+    qn = math.sqrt(sum(x * x for x in query))
+    scored = []
+    for career, row in zip(careers, rows):
+        cos = sum(a * b for a, b in zip(row, query)) / (math.sqrt(sum(a * a for a in row)) * qn)
+        overlap = sum(1 for s in career["skills"] if s.lower() in have) / max(1, len(career["skills"]))
+        scored.append((cos + 0.5 * overlap, career["title"]))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def _ms(fn, min_s: float = 0.5) -> float:
+    fn()
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_s:
+            return elapsed / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="0,1000,10000,100000", help="synthetic careers added to the bundled catalog")
+    parser.add_argument("--dim", type=int, default=1536, help="embedding dimension")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--no-loop", action="store_true", help="skip the per-career loop baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    taxonomy = SkillTaxonomy.from_file(DEFAULT_TAXONOMY_PATH)
+    base = CareerCatalog.from_file(DEFAULT_CATALOG_PATH, taxonomy)
+    query = np.random.default_rng(1).standard_normal(args.dim).astype(np.float32)
+    skills = ["Python", "SQL", "pandas", "Docker", "Machine Learning"]
+    interests = ["AI", "cloud"]
+    for synthetic in (int(n) for n in args.sizes.split(",")):
+        catalog = _catalog(base, synthetic, args.dim, rng)
+        line = f"{len(catalog):7d} careers  shortlist {_ms(lambda: catalog.shortlist(query, skills, interests, args.k)):8.3f} ms"
+        if not args.no_loop:
+            n = min(len(catalog), 10_000)
+            rows = catalog.matrix()[:n].tolist()
+            q = query.tolist()
+            per = _ms(lambda: _loop_shortlist(catalog.careers[:n], rows, q, skills, args.k), min_s=0.2) / n
+            line += f"  loop {per * len(catalog):10.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare two e2e benchmark result files and flag regressions.
+
+    python -m benchmarks.compare benchmarks/results/e2e-abc123-....json benchmarks/results/e2e-def456-....json
+
+Exits with status 1 when any phase got slower (p50/p95/p99) or lost throughput,
+or startup got slower, by more than `--threshold` percent.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# (label, path into a phase summary, True if higher is better)
+METRICS: List[Tuple[str, Tuple[str, ...], bool]] = [
+    ("throughput_rps", ("throughput_rps",), True),
+    ("p50_ms", ("latency_ms", "p50"), False),
+    ("p95_ms", ("latency_ms", "p95"), False),
+    ("p99_ms", ("latency_ms", "p99"), False),
+    ("error_rate", ("error_rate",), False),
+]
+
+
+def _get(summary: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    value: Any = summary
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value)
+
+
+# Startup times (seconds), lower is better
+STARTUP_METRICS: List[Tuple[str, Tuple[str, ...], bool]] = [
+    ("live_s", ("live_s",), False),
+    ("ready_s", ("ready_s",), False),
+]
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    print(f"base {base.get('commit')} ({base.get('started_at')})  ->  head {head.get('commit')} ({head.get('started_at')})")
+    print(f"{'phase':17s} {'metric':15s} {'base':>10s} {'head':>10s} {'change':>9s}")
+    sections = [("startup", base.get("startup"), head.get("startup"), STARTUP_METRICS)]
+    for phase, head_summary in head.get("phases", {}).items():
+        sections.append((phase, base.get("phases", {}).get(phase), head_summary, METRICS))
+    for phase, base_summary, head_summary, metrics in sections:
+        if head_summary is None:
+            continue
+        if base_summary is None:
+            print(f"{phase:17s} (not in base)")
+            continue
+        for label, path, higher_is_better in metrics:
+            old, new = _get(base_summary, path), _get(head_summary, path)
+            if old is None or new is None:
+                continue
+            if old:
+                change = (new - old) / old * 100
+            else:
+                change = 0.0 if new == old else float("inf")
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold and not (label == "error_rate" and new - old < 0.001):
+                flag = "  REGRESSION"
+                regressions.append(f"{phase} {label}: {old:g} -> {new:g} ({change:+.1f}%)")
+            print(f"{phase:17s} {label:15s} {old:10.2f} {new:10.2f} {change:+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", help="baseline result JSON")
+    parser.add_argument("head", help="result JSON to check")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args()
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    head = json.loads(Path(args.head).read_text(encoding="utf-8"))
+    regressions = compare(base, head, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:g}%:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""End-to-end load benchmark of the API against a local fake OpenAI server.
+
+Starts `benchmarks.fake_openai` and the app (uvicorn, temporary CHROMA_DIR),
+then runs one phase per endpoint at the given concurrency:
+
+    upload_cv -> interests -> analyze -> recommend (-> recommend_stream)
+
+Startup is timed from spawning the app until it answers `/` (live) and
+`/readyz` (ready). For each phase it reports throughput, client latency and
+time-to-first-byte p50/p95/p99, status codes, server stages from `Server-Timing`
+headers and the upstream (fake provider) calls made; fallback answers sent
+while the provider failed are counted as `degraded`. Results are written as
+JSON for `benchmarks.compare`.
+
+    python -m benchmarks.e2e --users 200 --concurrency 32 --chat-latency-ms 800
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PHASES = ("upload_cv", "interests", "analyze", "recommend", "recommend_stream")
+DEFAULT_PHASES = "upload_cv,interests,analyze,recommend"
+
+_SKILLS = ["Python", "SQL", "Excel", "Tableau", "Java", "Kubernetes", "React", "Spark", "Statistics", "Figma"]
+_ROLES = ["Data Analyst", "Software Engineer", "Product Manager", "DevOps Engineer", "UX Designer"]
+_INTERESTS = ["AI", "healthcare", "fintech", "climate", "education", "gaming", "security"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_cv(rng: random.Random, n: int) -> str:
+    skills = ", ".join(rng.sample(_SKILLS, 4))
+    role = rng.choice(_ROLES)
+    lines = [
+        f"Candidate {n}. SUMMARY: {role} with {rng.randint(1, 12)} years of experience.",
+        f"SKILLS: {skills}.",
+        "EXPERIENCE:",
+    ]
+    for year in range(rng.randint(2, 5)):
+        lines.append(
+            f"{role} at Company {rng.randint(1, 500)} ({2015 + year}-{2016 + year}). "
+            f"Built reporting pipelines, led a team of {rng.randint(2, 9)} and reduced costs by {rng.randint(5, 40)}%."
+        )
+    lines.append("EDUCATION: BSc Computer Science.")
+    return "\n".join(lines)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    if len(values) == 1:
+        v = round(values[0], 2)
+        return {"p50": v, "p95": v, "p99": v, "mean": v, "max": v}
+    qs = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(qs[49], 2),
+        "p95": round(qs[94], 2),
+        "p99": round(qs[98], 2),
+        "mean": round(statistics.fmean(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+def _parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """`name;dur=1.2, other;dur=3` -> {"name": 1.2, "other": 3.0}."""
+    out: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        if not parts[0]:
+            continue
+        for p in parts[1:]:
+            if p.startswith("dur="):
+                try:
+                    out[parts[0]] = out.get(parts[0], 0.0) + float(p[4:])
+                except ValueError:
+                    pass
+    return out
+
+
+class Phase:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.ttfb: List[float] = []
+        self.statuses: Counter = Counter()
+        self.cache: Counter = Counter()
+        self.stages: Dict[str, List[float]] = defaultdict(list)
+        self.errors: List[str] = []
+        self.degraded = 0
+        self.elapsed = 0.0
+
+    def record(self, status: int, latency_ms: float, ttfb_ms: float, headers: httpx.Headers):
+        self.statuses[str(status)] += 1
+        self.latencies.append(latency_ms)
+        self.ttfb.append(ttfb_ms)
+        for stage, ms in _parse_server_timing(headers.get("server-timing")).items():
+            self.stages[stage].append(ms)
+        cache_status = headers.get("cache-status")
+        if cache_status:
+            self.cache["hit" if "; hit" in cache_status else "miss"] += 1
+        if headers.get("x-degraded"):
+            self.degraded += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ok = sum(n for code, n in self.statuses.items() if code.startswith("2"))
+        total = sum(self.statuses.values()) + len(self.errors)
+        return {
+            "requests": total,
+            "ok": ok,
+            "error_rate": round(1 - ok / total, 4) if total else 0.0,
+            "throughput_rps": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+            "elapsed_s": round(self.elapsed, 3),
+            "latency_ms": _percentiles(self.latencies),
+            "ttfb_ms": _percentiles(self.ttfb),
+            "statuses": dict(self.statuses),
+            "cache": dict(self.cache),
+            "degraded": self.degraded,
+            "stages_ms": {stage: _percentiles(v) for stage, v in sorted(self.stages.items())},
+            "client_errors": self.errors[:10],
+        }
+
+
+async def _request(client: httpx.AsyncClient, phase: Phase, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        async with client.stream(method, url, **kwargs) as resp:
+            ttfb = (time.perf_counter() - start) * 1000
+            await resp.aread()
+    except Exception as e:
+        phase.errors.append(f"{type(e).__name__}: {e}")
+        return
+    phase.record(resp.status_code, (time.perf_counter() - start) * 1000, ttfb, resp.headers)
+
+
+def _phase_request(name: str, user_id: str, cv: str, interests: List[str]):
+    if name == "upload_cv":
+        return "POST", "/user/upload_cv", {"data": {"user_id": user_id, "text": cv}}
+    if name == "interests":
+        return "POST", "/user/interests", {"json": {"user_id": user_id, "interests": interests}}
+    if name == "analyze":
+        return "POST", "/career/analyze", {"params": {"user_id": user_id}}
+    if name == "recommend":
+        return "POST", "/career/recommend", {"params": {"user_id": user_id, "interests": interests}}
+    if name == "recommend_stream":
+        return "POST", "/career/recommend/stream", {"params": {"user_id": user_id, "interests": interests}}
+    raise ValueError(f"Unknown phase {name!r}; expected one of {', '.join(PHASES)}")
+
+
+async def run_phase(client: httpx.AsyncClient, name: str, users: List[Dict[str, Any]], requests: int, concurrency: int) -> Phase:
+    phase = Phase(name)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(users[i % len(users)])
+
+    async def worker():
+        while True:
+            try:
+                user = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            method, url, kwargs = _phase_request(name, user["user_id"], user["cv"], user["interests"])
+            await _request(client, phase, method, url, **kwargs)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    phase.elapsed = time.perf_counter() - start
+    return phase
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout_s: float = 60.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout_s:g}s")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def drive(args, app_url: str, fake_url: str) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    users = [
+        {"user_id": f"bench-{n}", "cv": make_cv(rng, n), "interests": rng.sample(_INTERESTS, 2)}
+        for n in range(args.users)
+    ]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    phases: Dict[str, Any] = {}
+    upstream: Dict[str, Any] = {}
+    async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as client, httpx.AsyncClient(
+        base_url=fake_url, timeout=10
+    ) as fake:
+        for name in args.phases.split(","):
+            await fake.post("/stats/reset")
+            phase = await run_phase(client, name, users, args.requests or args.users, args.concurrency)
+            phases[name] = phase.summary()
+            stats = (await fake.get("/stats")).json()
+            stats.pop("settings", None)
+            upstream[name] = stats
+            s = phases[name]
+            lat = s["latency_ms"]
+            print(
+                f"{name:17s} {s['throughput_rps']:8.2f} req/s  p50 {lat.get('p50', 0):8.1f}  p95 {lat.get('p95', 0):8.1f}"
+                f"  p99 {lat.get('p99', 0):8.1f} ms  errors {s['error_rate']:.1%}"
+                f"  upstream chat {stats['chat_calls'] + stats['chat_stream_calls']} embed {stats['embed_calls']}",
+                file=sys.stderr,
+            )
+    return {"phases": phases, "upstream": upstream}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=0, help="requests per phase (default: one per user)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--phases", default=DEFAULT_PHASES, help=f"comma-separated subset of {','.join(PHASES)}")
+    parser.add_argument("--chat-latency-ms", type=float, default=800.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-s", type=float, default=50.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request client timeout (s)")
+    parser.add_argument("--app", default="backend.main:app", help="ASGI app to serve")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app environment")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="result file (default: benchmarks/results/e2e-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    fake_port, app_port = _free_port(), _free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    procs: List[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="pathfinder-bench-") as chroma_dir:
+        try:
+            fake = subprocess.Popen(
+                [
+                    sys.executable, "-m", "benchmarks.fake_openai", "--port", str(fake_port),
+                    "--chat-latency-ms", str(args.chat_latency_ms), "--embed-latency-ms", str(args.embed_latency_ms),
+                    "--tokens-per-s", str(args.tokens_per_s), "--failure-rate", str(args.failure_rate),
+                    "--failure-status", str(args.failure_status),
+                    "--dim", str(args.dim), "--seed", str(args.seed),
+                ],
+                cwd=ROOT,
+            )
+            procs.append(fake)
+            _wait_ready(f"{fake_url}/health", fake)
+
+            env = dict(os.environ)
+            env.update({
+                "OPENAI_API_KEY": "sk-bench",
+                "OPENAI_API_BASE": f"{fake_url}/v1",
+                "CHROMA_DIR": chroma_dir,
+            })
+            env.update(kv.split("=", 1) for kv in args.env)
+            app = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", args.app, "--port", str(app_port), "--log-level", "warning"],
+                cwd=ROOT,
+                env=env,
+            )
+            spawned = time.perf_counter()
+            procs.append(app)
+            _wait_ready(f"{app_url}/", app)
+            live_s = time.perf_counter() - spawned
+            # /readyz answers 503 until warm-up has loaded the index and reached the provider
+            _wait_ready(f"{app_url}/readyz", app)
+            startup = {"live_s": round(live_s, 3), "ready_s": round(time.perf_counter() - spawned, 3)}
+            print(f"startup: live {startup['live_s']:.2f}s  ready {startup['ready_s']:.2f}s", file=sys.stderr)
+
+            started = time.time()
+            result = asyncio.run(drive(args, app_url, fake_url))
+        finally:
+            for proc in reversed(procs):
+                proc.terminate()
+            for proc in procs:
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    commit = _git_commit()
+    report = {
+        "benchmark": "e2e",
+        "commit": commit,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "startup": startup,
+        **result,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"e2e-{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results written to {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Throughput of single-text embedding calls with and without the micro-batcher.
+
+Simulates a provider with a fixed per-call latency, a small per-text cost and a
+cap on concurrent connections, then drives it from N concurrent callers.
+
+    python -m benchmarks.embedding_batcher --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from backend.core.embeddings import EmbeddingBatcher
+
+
+class FakeProvider:
+    def __init__(self, call_ms: float, per_text_ms: float, max_inflight: int):
+        self.call_s = call_ms / 1000.0
+        self.per_text_s = per_text_ms / 1000.0
+        self.sem = asyncio.Semaphore(max_inflight)
+        self.calls = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        async with self.sem:
+            self.calls += 1
+            await asyncio.sleep(self.call_s + self.per_text_s * len(texts))
+            return [[float(len(t)), 0.0, 0.0] for t in texts]
+
+
+async def _drive(embed, concurrency: int, requests: int) -> float:
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"text {i}")
+
+    async def worker():
+        while not queue.empty():
+            text = queue.get_nowait()
+            await embed([text])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return time.perf_counter() - start
+
+
+async def run(args) -> None:
+    direct = FakeProvider(args.call_ms, args.per_text_ms, args.max_inflight)
+    elapsed = await _drive(direct.embed, args.concurrency, args.requests)
+    print(f"direct:  {args.requests / elapsed:9.1f} texts/s  {direct.calls:5d} provider calls  {elapsed:.2f}s")
+
+    batched = FakeProvider(args.call_ms, args.per_text_ms, args.max_inflight)
+    batcher = EmbeddingBatcher(
+        batched.embed,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    elapsed = await _drive(batcher.embed, args.concurrency, args.requests)
+    print(f"batched: {args.requests / elapsed:9.1f} texts/s  {batched.calls:5d} provider calls  {elapsed:.2f}s")
+    print(f"         avg batch size {batcher.stats()['avg_batch_size']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--call-ms", type=float, default=80.0, help="provider round trip per call")
+    parser.add_argument("--per-text-ms", type=float, default=0.2, help="extra provider time per text")
+    parser.add_argument("--max-inflight", type=int, default=8, help="concurrent provider connections")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""A local OpenAI-compatible stand-in for benchmarks (chat completions and embeddings).
+
+Latency, output token rate and failure rate are configurable, so the service can
+be load-tested without a network or an API key. Point the backend at it with
+OPENAI_API_BASE=http://127.0.0.1:<port>/v1.
+
+    python -m benchmarks.fake_openai --port 9100 --chat-latency-ms 800 --tokens-per-s 50
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SETTINGS: Dict[str, Any] = {
+    "chat_latency_ms": 800.0,
+    "embed_latency_ms": 100.0,
+    "tokens_per_s": 50.0,
+    "failure_rate": 0.0,
+    "failure_status": 500,
+    "retry_after_s": 0.0,
+    "dim": 1536,
+    "seed": 0,
+}
+
+# One reply that satisfies both the profile-extraction and recommendation prompts
+REPLY = json.dumps(
+    {
+        "summary": "Analyst with five years of Python and SQL experience building reporting pipelines.",
+        "skills": ["Python", "SQL", "Pandas", "Tableau", "Statistics"],
+        "experience": ["Data Analyst at Acme (2019-2024)", "BI intern at Globex (2018)"],
+        "education": ["BSc Computer Science"],
+        "recommended_career": "Data Scientist",
+        "justification": "Strong Python and SQL foundations with analytics experience map well to data science.",
+        "learning_path": ["Statistics and experiment design", "Machine learning with scikit-learn", "Model deployment"],
+        "next_steps": ["Build a portfolio ML project", "Tailor the CV to DS roles", "Apply to 5 roles a week"],
+    }
+)
+
+app = FastAPI(title="Fake OpenAI")
+_rng = random.Random(SETTINGS["seed"])
+_stats: Dict[str, Any] = {}
+
+
+def _reset_stats():
+    _stats.clear()
+    _stats.update({
+        "chat_calls": 0,
+        "chat_stream_calls": 0,
+        "embed_calls": 0,
+        "embed_inputs": 0,
+        "failures": 0,
+        "chat_seconds": 0.0,
+        "embed_seconds": 0.0,
+    })
+
+
+_reset_stats()
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _fail() -> bool:
+    if SETTINGS["failure_rate"] and _rng.random() < SETTINGS["failure_rate"]:
+        _stats["failures"] += 1
+        return True
+    return False
+
+
+def _error() -> JSONResponse:
+    status = int(SETTINGS["failure_status"])
+    kind = "rate_limit_exceeded" if status == 429 else "server_error"
+    headers = {"Retry-After": f"{SETTINGS['retry_after_s']:g}"} if SETTINGS["retry_after_s"] else None
+    return JSONResponse(
+        {"error": {"message": "injected failure", "type": kind, "code": None}}, status_code=status, headers=headers
+    )
+
+
+def _vector(text: str, dim: int) -> List[float]:
+    # Deterministic unit vector derived from the text
+    out: List[float] = []
+    counter = 0
+    while len(out) < dim:
+        digest = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+        out.extend((b - 127.5) / 127.5 for b in digest)
+        counter += 1
+    out = out[:dim]
+    norm = math.sqrt(sum(v * v for v in out)) or 1.0
+    return [v / norm for v in out]
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/stats")
+def stats():
+    return {**_stats, "settings": SETTINGS}
+
+
+@app.post("/stats/reset")
+def reset_stats():
+    _reset_stats()
+    return {"status": "ok"}
+
+
+@app.get("/v1/models")
+def models():
+    # Used by the backend's readiness probe
+    return {"object": "list", "data": [{"id": "fake-model", "object": "model", "created": 0, "owned_by": "benchmarks"}]}
+
+
+@app.post("/v1/embeddings")
+async def embeddings(req: Request):
+    body = await req.json()
+    if _fail():
+        return _error()
+    inputs = body["input"]
+    if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+        inputs = [inputs]
+    start = time.perf_counter()
+    await asyncio.sleep(SETTINGS["embed_latency_ms"] / 1000.0)
+    dim = int(body.get("dimensions") or SETTINGS["dim"])
+    data = [{"object": "embedding", "index": i, "embedding": _vector(str(t), dim)} for i, t in enumerate(inputs)]
+    _stats["embed_calls"] += 1
+    _stats["embed_inputs"] += len(inputs)
+    _stats["embed_seconds"] += time.perf_counter() - start
+    prompt_tokens = sum(_tokens(str(t)) for t in inputs)
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model"),
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(req: Request):
+    body = await req.json()
+    if _fail():
+        return _error()
+    prompt_tokens = sum(_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+    completion_tokens = _tokens(REPLY)
+    per_token_s = 1.0 / SETTINGS["tokens_per_s"] if SETTINGS["tokens_per_s"] > 0 else 0.0
+    first_token_s = SETTINGS["chat_latency_ms"] / 1000.0
+    created = int(time.time())
+    start = time.perf_counter()
+
+    if body.get("stream"):
+        _stats["chat_stream_calls"] += 1
+
+        async def events():
+            await asyncio.sleep(first_token_s)
+            step = 16  # characters per chunk, ~4 tokens
+            for i in range(0, len(REPLY), step):
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": REPLY[i : i + step]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(per_token_s * step / 4)
+            done = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+            _stats["chat_seconds"] += time.perf_counter() - start
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(first_token_s + per_token_s * completion_tokens)
+    _stats["chat_calls"] += 1
+    _stats["chat_seconds"] += time.perf_counter() - start
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": created,
+        "model": body.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--chat-latency-ms", type=float, default=SETTINGS["chat_latency_ms"], help="time to first token")
+    parser.add_argument("--embed-latency-ms", type=float, default=SETTINGS["embed_latency_ms"])
+    parser.add_argument("--tokens-per-s", type=float, default=SETTINGS["tokens_per_s"], help="output token rate (0 = instant)")
+    parser.add_argument("--failure-rate", type=float, default=SETTINGS["failure_rate"], help="share of calls that fail")
+    parser.add_argument("--failure-status", type=int, default=SETTINGS["failure_status"], help="status of failed calls (e.g. 429)")
+    parser.add_argument("--retry-after-s", type=float, default=SETTINGS["retry_after_s"], help="Retry-After sent with failures")
+    parser.add_argument("--dim", type=int, default=SETTINGS["dim"], help="embedding dimension")
+    parser.add_argument("--seed", type=int, default=SETTINGS["seed"])
+    args = parser.parse_args()
+    for key in SETTINGS:
+        SETTINGS[key] = getattr(args, key)
+    _rng.seed(args.seed)
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
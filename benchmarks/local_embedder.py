@@ -0,0 +1,40 @@
+"""Per-text latency of the local hashing embedder at several batch sizes.
+
+    python -m benchmarks.local_embedder --words 300 --dim 512
+"""
+import argparse
+import random
+import time
+
+from backend.core.local_embeddings import HashingEmbedder
+
+_WORDS = (
+    "python data analysis machine learning sql dashboards stakeholders pipeline "
+    "designed built led improved reduced latency customers product research team "
+    "cloud deployment testing reporting forecasting experiments models metrics "
+    "java kubernetes docker spark airflow excel tableau communication mentoring"
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=300, help="words per text (~a CV chunk)")
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--batches", default="1,16,256,4096")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    embedder = HashingEmbedder(dim=args.dim)
+    for size in (int(b) for b in args.batches.split(",")):
+        texts = [" ".join(rng.choices(_WORDS, k=args.words)) for _ in range(size)]
+        embedder.encode(texts[:1])
+        runs = max(1, 2000 // size)
+        start = time.perf_counter()
+        for _ in range(runs):
+            embedder.encode(texts)
+        per_text_ms = (time.perf_counter() - start) / (runs * size) * 1000
+        print(f"batch {size:5d}: {per_text_ms:7.4f} ms/text  {1000 / per_text_ms:9.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
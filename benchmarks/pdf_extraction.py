@@ -0,0 +1,102 @@
+"""PDF extraction throughput (pages/s): serial in-process vs the page-parallel engine.
+
+Generates a corpus of text-only PDFs, then extracts every document with
+`extract_text_from_pdf_bytes` on one thread and with `extract_pdf`, which
+spreads page batches over the process pool.
+
+    python -m benchmarks.pdf_extraction --docs 20 --pages 40
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from backend.services.extraction_service import extract_pdf
+from backend.services.profile_service import extract_text_from_pdf_bytes
+
+_WORDS = (
+    "python data analysis machine learning sql dashboards stakeholders pipeline "
+    "designed built led improved reduced latency customers product research team "
+    "cloud deployment testing reporting forecasting experiments models metrics"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal PDF with one Helvetica text page per entry of `pages` (lines of text)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        ops = ["BT /F1 10 Tf 12 TL 50 790 Td"] + [f"({_escape(line)}) '" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{k} 0 R" for k in kids).encode(), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_corpus(docs: int, pages: int, lines: int = 60, seed: int = 0) -> List[bytes]:
+    rng = random.Random(seed)
+    return [
+        make_pdf([[" ".join(rng.choices(_WORDS, k=12)) for _ in range(lines)] for _ in range(pages)])
+        for _ in range(docs)
+    ]
+
+
+async def run(args) -> None:
+    corpus = make_corpus(args.docs, args.pages)
+    total_pages = args.docs * args.pages
+    size_mb = sum(len(d) for d in corpus) / 1e6
+    print(f"corpus: {args.docs} docs x {args.pages} pages ({size_mb:.1f} MB)")
+
+    start = time.perf_counter()
+    for data in corpus:
+        extract_text_from_pdf_bytes(data)
+    elapsed = time.perf_counter() - start
+    print(f"serial:   {total_pages / elapsed:8.1f} pages/s  {elapsed:.2f}s")
+
+    # Warm the process pool so worker start-up is not counted
+    await extract_pdf(corpus[0], max_tokens=args.max_tokens)
+    start = time.perf_counter()
+    pages_done = 0
+    for data in corpus:
+        result = await extract_pdf(data, max_pages=args.pages, max_tokens=args.max_tokens)
+        pages_done += result.pages_extracted
+    elapsed = time.perf_counter() - start
+    print(f"parallel: {pages_done / elapsed:8.1f} pages/s  {elapsed:.2f}s  ({pages_done}/{total_pages} pages extracted)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument(
+        "--max-tokens", type=int, default=10**9, help="token budget per document (default: extract every page)"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
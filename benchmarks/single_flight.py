@@ -0,0 +1,122 @@
+"""Single-flight coalescing: N identical concurrent requests vs upstream calls.
+
+Starts `benchmarks.fake_openai`, then sends `--callers` identical concurrent
+requests per endpoint to the app in-process (temporary CHROMA_DIR) and counts
+the chat/embedding calls that reached the provider. The embedding micro-batcher
+is turned off so only single-flight can merge duplicate embeddings. Admission runs
+before single-flight and cannot tell duplicates apart, so every class's queue is
+sized to hold the whole burst. The app is warmed up first, as on server start,
+so the one-off catalog embedding is not counted against the bursts. Exits with
+status 1 if any endpoint made more than one upstream call or answered anything
+but 200.
+
+    python -m benchmarks.single_flight --callers 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+import httpx
+
+from .e2e import ROOT, _free_port, _wait_ready
+
+CV = (
+    "Jane Doe. Data analyst with five years of Python, SQL and Tableau experience "
+    "building reporting pipelines at Acme. BSc Computer Science."
+)
+
+
+async def _burst(client: httpx.AsyncClient, fake: httpx.AsyncClient, callers: int, method: str, url: str, **kwargs):
+    await fake.post("/stats/reset")
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(client.request(method, url, **kwargs) for _ in range(callers)))
+    elapsed = time.perf_counter() - start
+    stats = (await fake.get("/stats")).json()
+    statuses: Dict[int, int] = {}
+    for resp in responses:
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+    upstream = {"chat": stats["chat_calls"] + stats["chat_stream_calls"], "embed": stats["embed_calls"]}
+    return {"elapsed_s": round(elapsed, 3), "statuses": statuses, "upstream": upstream}
+
+
+async def run(callers: int, fake_url: str) -> Dict[str, Any]:
+    # Imported late: the backend reads its configuration from the environment at import
+    from backend.core.metrics import SINGLE_FLIGHT_CALLS
+    from backend.main import app
+    from backend.services.warmup import warm_up
+
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Any] = {}
+    await warm_up()
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client, httpx.AsyncClient(
+        base_url=fake_url, timeout=10
+    ) as fake:
+        results["upload_cv"] = await _burst(
+            client, fake, callers, "POST", "/user/upload_cv", data={"user_id": "sf-user", "text": CV}
+        )
+        results["analyze"] = await _burst(client, fake, callers, "POST", "/career/analyze", params={"user_id": "sf-user"})
+        results["recommend"] = await _burst(
+            client, fake, callers, "POST", "/career/recommend", params={"user_id": "sf-user", "interests": ["AI"]}
+        )
+    results["singleflight_calls"] = [line for line in SINGLE_FLIGHT_CALLS.render() if not line.startswith("#")]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--chat-latency-ms", type=float, default=300.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    port = _free_port()
+    fake_url = f"http://127.0.0.1:{port}"
+    fake = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_openai", "--port", str(port), "--tokens-per-s", "0",
+            "--chat-latency-ms", str(args.chat_latency_ms), "--embed-latency-ms", str(args.embed_latency_ms),
+        ],
+        cwd=ROOT,
+    )
+    try:
+        _wait_ready(f"{fake_url}/health", fake)
+        with tempfile.TemporaryDirectory(prefix="pathfinder-bench-") as chroma_dir:
+            os.environ.update({
+                "OPENAI_API_KEY": "sk-bench",
+                "OPENAI_API_BASE": f"{fake_url}/v1",
+                "CHROMA_DIR": chroma_dir,
+                "EMBED_BATCHING": "0",
+                "ADMISSION_CLASSES": json.dumps(
+                    {name: {"queue": args.callers} for name in ("read", "ingest", "generate")}
+                ),
+            })
+            results = asyncio.run(run(args.callers, fake_url))
+    finally:
+        fake.terminate()
+        fake.wait(timeout=10)
+
+    failed = False
+    for name in ("upload_cv", "analyze", "recommend"):
+        r = results[name]
+        over = any(n > 1 for n in r["upstream"].values())
+        errors = sum(n for status, n in r["statuses"].items() if status != 200)
+        failed |= over or bool(errors)
+        print(
+            f"{name:10s} {args.callers} callers  {r['elapsed_s']:6.3f}s  statuses {r['statuses']}"
+            f"  upstream chat {r['upstream']['chat']} embed {r['upstream']['embed']}"
+            + ("  MORE THAN ONE" if over else "")
+            + (f"  {errors} NOT OK" if errors else "")
+        )
+    for line in results["singleflight_calls"]:
+        print(line)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Skill extraction throughput (MB/s of CV text), taxonomy matcher vs one regex per alias.
+
+The taxonomy can be padded with synthetic entries to show that the matcher's
+speed does not depend on the number of aliases, while the regex scan slows
+down linearly (it is timed on the first 100 KB of text only).
+
+    python -m benchmarks.skill_matcher --mb 2 --synthetic 0,5000,20000
+"""
+import argparse
+import random
+import re
+import time
+
+from backend.core.taxonomy import DEFAULT_TAXONOMY_PATH, SkillTaxonomy
+
+_FILLER = (
+    "designed built led improved reduced latency customers product research team delivered "
+    "stakeholders reporting pipeline experiments metrics mentoring projects responsible for "
+    "the a of and with using in to on across senior junior manager engineer university"
+).split()
+
+
+def _cv_text(taxonomy: SkillTaxonomy, size_bytes: int, rng: random.Random) -> str:
+    aliases = [a for aliases in taxonomy.skills.values() for a in aliases]
+    words = []
+    total = 0
+    while total < size_bytes:
+        # Roughly one skill mention per ten words, like a skills-dense CV
+        word = rng.choice(aliases) if rng.random() < 0.1 else rng.choice(_FILLER)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)
+
+
+def _padded(base: SkillTaxonomy, synthetic: int, rng: random.Random) -> SkillTaxonomy:
+    skills = dict(base.skills)
+    for i in range(synthetic):
+        name = f"Skill {i}"
+        skills[name] = [f"{rng.choice(_FILLER)}tool{i}", f"framework {i} {rng.choice(_FILLER)}"]
+    return SkillTaxonomy(skills, base.roles)
+
+
+def _regex_scan(patterns, text: str):
+    found = set()
+    for pattern, name in patterns:
+        if pattern.search(text):
+            found.add(name)
+    return found
+
+
+def _rate(fn, text: str, min_s: float = 1.0) -> float:
+    fn(text)
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn(text)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_s:
+            return runs * len(text.encode("utf-8")) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=1.0, help="size of the CV text corpus")
+    parser.add_argument("--synthetic", default="0,5000,20000", help="extra synthetic taxonomy entries")
+    parser.add_argument("--no-regex", action="store_true", help="skip the per-alias regex baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    base = SkillTaxonomy.from_file(DEFAULT_TAXONOMY_PATH)
+    text = _cv_text(base, int(args.mb * 1e6), rng)
+    for synthetic in (int(n) for n in args.synthetic.split(",")):
+        start = time.perf_counter()
+        taxonomy = _padded(base, synthetic, rng)
+        compile_s = time.perf_counter() - start
+        n_aliases = sum(len(a) for a in taxonomy.skills.values())
+        line = (
+            f"{len(taxonomy.skills):6d} skills / {n_aliases:6d} aliases  compile {compile_s:6.3f}s"
+            f"  matcher {_rate(taxonomy.extract_skills, text):6.2f} MB/s"
+        )
+        if not args.no_regex:
+            patterns = [
+                (re.compile(r"(?<!\w)" + re.escape(alias) + r"(?!\w)", re.IGNORECASE), name)
+                for name, aliases in taxonomy.skills.items()
+                for alias in aliases
+            ]
+            sample = text[:100_000]
+            line += f"  regex per alias {_rate(lambda t: _regex_scan(patterns, t), sample, min_s=0.1):8.3f} MB/s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Per-user query latency: numpy memmap blocks vs the filtered Chroma collection.
+
+Fills each store with `--docs-per-user` random unit vectors for N users, then
+times top-k queries for random users. Chroma is skipped above
+`--chroma-max-users`, where building its HNSW index takes very long.
+
+    python -m benchmarks.vector_store --users 10000,100000,1000000 --dim 64
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from backend.core.vector_store import ChromaVectorStore, NumpyVectorStore, VectorStore
+
+_FILL_BATCH = 5000
+
+
+def _unit(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def fill(store: VectorStore, users: int, docs_per_user: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    per_batch = max(1, _FILL_BATCH // docs_per_user)
+    for first in range(0, users, per_batch):
+        ids, texts, metas = [], [], []
+        for u in range(first, min(first + per_batch, users)):
+            for n in range(docs_per_user):
+                ids.append(f"user{u}:cv_raw:{n}")
+                texts.append(f"chunk {n} of user {u}")
+                metas.append({"user_id": f"user{u}", "type": "cv_raw"})
+        store.upsert(ids, texts, metas, _unit(rng, len(ids), dim).tolist())
+
+
+def time_queries(store: VectorStore, users: int, dim: int, queries: int, top_k: int) -> List[float]:
+    rng = random.Random(1)
+    vectors = _unit(np.random.default_rng(1), queries, dim)
+    latencies = []
+    for q in vectors:
+        user_id = f"user{rng.randrange(users)}"
+        start = time.perf_counter()
+        store.query(user_id, q.tolist(), top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(name: str, users: int, fill_s: float, latencies: List[float]):
+    qs = statistics.quantiles(latencies, n=100)
+    print(f"{name:6s} {users:>9,d} users  fill {fill_s:8.1f}s  p50 {qs[49]:7.3f} ms  p95 {qs[94]:7.3f} ms  p99 {qs[98]:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", default="10000,100000,1000000")
+    parser.add_argument("--docs-per-user", type=int, default=3)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chroma-max-users", type=int, default=100000)
+    args = parser.parse_args()
+
+    for users in (int(u) for u in args.users.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            store = NumpyVectorStore(tmp)
+            fill(store, users, args.docs_per_user, args.dim)
+            fill_s = time.perf_counter() - start
+            _report("numpy", users, fill_s, time_queries(store, users, args.dim, args.queries, args.top_k))
+
+        if users > args.chroma_max_users:
+            print(f"chroma {users:>9,d} users  skipped (--chroma-max-users {args.chroma_max_users:,d})")
+            continue
+        import chromadb
+
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            client = chromadb.PersistentClient(path=tmp)
+            store = ChromaVectorStore(client.get_or_create_collection(name="bench"))
+            fill(store, users, args.docs_per_user, args.dim)
+            fill_s = time.perf_counter() - start
+            _report("chroma", users, fill_s, time_queries(store, users, args.dim, args.queries, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Python client for the career guidance API, used by the Streamlit app."""
+from .async_client import AsyncApiClient
+from .base import ApiError, FileUpload, JobFailed
+from .client import ApiClient
+from .models import Analysis, CVUpload, InterestsSaved, JobAccepted, JobStatus, Profile, Recommendation
+
+__all__ = [
+    "ApiClient",
+    "AsyncApiClient",
+    "ApiError",
+    "JobFailed",
+    "FileUpload",
+    "Analysis",
+    "CVUpload",
+    "InterestsSaved",
+    "JobAccepted",
+    "JobStatus",
+    "Profile",
+    "Recommendation",
+]
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+import httpx
+
+from .base import (
+    RETRY_STATUSES,
+    ApiError,
+    FileUpload,
+    SSEDecoder,
+    error_detail,
+    job_result,
+    recommend_params,
+    retry_delay,
+    upload_form,
+)
+from .models import Analysis, CVUpload, InterestsSaved, JobAccepted, JobStatus, Recommendation
+
+
+class AsyncApiClient:
+    """asyncio client for the career guidance API, on a pooled `httpx.AsyncClient`.
+
+    Same endpoints and retry policy as ApiClient; use one instance per event loop.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: Tuple[float, float] = (5.0, 60.0),
+        retries: int = 3,
+        backoff_s: float = 0.5,
+        pool_size: int = 10,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_s = backoff_s
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def _send(self, method: str, path: str, stream: bool = False, **kwargs) -> httpx.Response:
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            try:
+                request = self.http.build_request(method, url, **kwargs)
+                resp = await self.http.send(request, stream=stream)
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(retry_delay(attempt, self.backoff_s))
+                attempt += 1
+                continue
+            if resp.status_code in RETRY_STATUSES and attempt < self.retries:
+                delay = retry_delay(attempt, self.backoff_s, resp.headers.get("Retry-After"))
+                await resp.aclose()
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if resp.status_code >= 400:
+                text = (await resp.aread()).decode("utf-8", "replace")
+                await resp.aclose()
+                raise ApiError(resp.status_code, error_detail(text))
+            return resp
+
+    async def _json(self, method: str, path: str, **kwargs) -> Any:
+        return (await self._send(method, path, **kwargs)).json()
+
+    async def submit_cv(
+        self, user_id: str, file: Optional[FileUpload] = None, text: Optional[str] = None
+    ) -> JobAccepted:
+        data, files = upload_form(user_id, file, text)
+        return await self._json("POST", "/user/upload_cv", params={"mode": "async"}, data=data, files=files)
+
+    async def job(self, job_id_or_url: str) -> JobStatus:
+        path = job_id_or_url if "/" in job_id_or_url else f"/jobs/{job_id_or_url}"
+        return await self._json("GET", path)
+
+    async def wait_job(
+        self,
+        job_id_or_url: str,
+        on_progress: Optional[Callable[[JobStatus], None]] = None,
+        wait_s: float = 600,
+        poll_s: float = 1.0,
+    ) -> Any:
+        deadline = time.monotonic() + wait_s
+        while True:
+            job = await self.job(job_id_or_url)
+            if on_progress is not None:
+                on_progress(job)
+            result = job_result(job)
+            if result is not None:
+                return result
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job['job_id']} still {job['status']} after {wait_s:.0f}s")
+            await asyncio.sleep(poll_s)
+
+    async def upload_cv(
+        self,
+        user_id: str,
+        file: Optional[FileUpload] = None,
+        text: Optional[str] = None,
+        on_progress: Optional[Callable[[JobStatus], None]] = None,
+        wait_s: float = 600,
+    ) -> CVUpload:
+        accepted = await self.submit_cv(user_id, file, text)
+        return await self.wait_job(accepted["status_url"], on_progress=on_progress, wait_s=wait_s)
+
+    async def set_interests(self, user_id: str, interests: List[str]) -> InterestsSaved:
+        return await self._json("POST", "/user/interests", json={"user_id": user_id, "interests": interests})
+
+    async def analyze(self, user_id: str) -> Analysis:
+        return await self._json("POST", "/career/analyze", params={"user_id": user_id})
+
+    async def recommend(self, user_id: str, interests: Optional[List[str]] = None) -> Recommendation:
+        return await self._json("POST", "/career/recommend", params=recommend_params(user_id, interests))
+
+    async def stream_recommend(
+        self, user_id: str, interests: Optional[List[str]] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        resp = await self._send(
+            "POST", "/career/recommend/stream", stream=True, params=recommend_params(user_id, interests),
+            timeout=httpx.Timeout(120.0, connect=self.timeout[0]),
+        )
+        try:
+            decoder = SSEDecoder()
+            async for line in resp.aiter_lines():
+                event = decoder.feed(line)
+                if event is not None:
+                    yield event
+        finally:
+            await resp.aclose()
@@ -0,0 +1,89 @@
+import json
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import JobStatus
+
+# Responses worth another attempt: the server shed the request or its provider is down
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# An upload as (file name, content, content type)
+FileUpload = Tuple[str, bytes, str]
+
+
+class ApiError(RuntimeError):
+    """A non-2xx answer from the API, with the server's `detail` when it sent one."""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(f"HTTP {status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class JobFailed(RuntimeError):
+    """A background job that ended in `failed`."""
+
+    def __init__(self, job: JobStatus):
+        super().__init__(job.get("error") or "processing failed")
+        self.job = job
+
+
+def error_detail(text: str) -> str:
+    try:
+        detail = json.loads(text).get("detail")
+    except (ValueError, AttributeError):
+        detail = None
+    return str(detail) if detail else text
+
+
+def retry_delay(attempt: int, backoff_s: float, retry_after: Optional[str] = None, max_s: float = 30.0) -> float:
+    """Seconds to wait before retry `attempt` (0-based): the server's Retry-After when
+    given, otherwise exponential backoff with jitter."""
+    if retry_after:
+        try:
+            return min(max_s, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(max_s, backoff_s * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def recommend_params(user_id: str, interests: Optional[List[str]]) -> Dict[str, Any]:
+    # List values are sent as repeated `interests` query params
+    return {"user_id": user_id, "interests": list(interests or [])}
+
+
+def upload_form(user_id: str, file: Optional[FileUpload], text: Optional[str]):
+    if file is None and not (text and text.strip()):
+        raise ValueError("Provide a file or CV text.")
+    data = {"user_id": user_id}
+    if text and text.strip():
+        data["text"] = text
+    return data, ({"file": file} if file is not None else None)
+
+
+def job_result(job: JobStatus) -> Optional[Dict[str, Any]]:
+    """The result of a finished job, None while it is still queued or running."""
+    if job["status"] == "done":
+        return job["result"]
+    if job["status"] == "failed":
+        raise JobFailed(job)
+    return None
+
+
+class SSEDecoder:
+    """Turns Server-Sent Event lines into (event, data) pairs, data decoded from JSON."""
+
+    def __init__(self):
+        self.event: Optional[str] = None
+        self.data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Tuple[str, Any]]:
+        if line.startswith("event:"):
+            self.event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            self.data.append(line[len("data:"):].strip())
+        elif line == "" and self.event:
+            out = (self.event, json.loads("\n".join(self.data) or "null"))
+            self.event, self.data = None, []
+            return out
+        return None
@@ -0,0 +1,145 @@
+import time
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .base import (
+    RETRY_STATUSES,
+    ApiError,
+    FileUpload,
+    SSEDecoder,
+    error_detail,
+    job_result,
+    recommend_params,
+    retry_delay,
+    upload_form,
+)
+from .models import Analysis, CVUpload, InterestsSaved, JobAccepted, JobStatus, Recommendation
+
+
+class ApiClient:
+    """Blocking client for the career guidance API.
+
+    One `requests.Session` keeps up to `pool_size` connections alive, so repeated
+    calls skip the TCP (and TLS) handshake. Connection errors and 429/502/503/504
+    answers are retried `retries` times with exponential backoff, honouring
+    Retry-After; every endpoint is safe to resend (interests are replaced, uploads
+    are deduplicated by content hash on the server).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: Tuple[float, float] = (5.0, 60.0),
+        retries: int = 3,
+        backoff_s: float = 0.5,
+        pool_size: int = 10,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_s = backoff_s
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self) -> "ApiClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method: str, path: str, stream: bool = False, **kwargs) -> requests.Response:
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            try:
+                resp = self.session.request(method, url, stream=stream, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                time.sleep(retry_delay(attempt, self.backoff_s))
+                attempt += 1
+                continue
+            if resp.status_code in RETRY_STATUSES and attempt < self.retries:
+                delay = retry_delay(attempt, self.backoff_s, resp.headers.get("Retry-After"))
+                resp.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if resp.status_code >= 400:
+                text = resp.text
+                resp.close()
+                raise ApiError(resp.status_code, error_detail(text))
+            return resp
+
+    def submit_cv(self, user_id: str, file: Optional[FileUpload] = None, text: Optional[str] = None) -> JobAccepted:
+        """Queue a CV (file and/or pasted text) for background parsing."""
+        data, files = upload_form(user_id, file, text)
+        return self._request("POST", "/user/upload_cv", params={"mode": "async"}, data=data, files=files).json()
+
+    def job(self, job_id_or_url: str) -> JobStatus:
+        path = job_id_or_url if "/" in job_id_or_url else f"/jobs/{job_id_or_url}"
+        return self._request("GET", path).json()
+
+    def wait_job(
+        self,
+        job_id_or_url: str,
+        on_progress: Optional[Callable[[JobStatus], None]] = None,
+        wait_s: float = 600,
+        poll_s: float = 1.0,
+    ) -> Any:
+        """Poll a job until it finishes; returns its result or raises JobFailed/TimeoutError."""
+        deadline = time.monotonic() + wait_s
+        while True:
+            job = self.job(job_id_or_url)
+            if on_progress is not None:
+                on_progress(job)
+            result = job_result(job)
+            if result is not None:
+                return result
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job['job_id']} still {job['status']} after {wait_s:.0f}s")
+            time.sleep(poll_s)
+
+    def upload_cv(
+        self,
+        user_id: str,
+        file: Optional[FileUpload] = None,
+        text: Optional[str] = None,
+        on_progress: Optional[Callable[[JobStatus], None]] = None,
+        wait_s: float = 600,
+    ) -> CVUpload:
+        """Queue a CV and wait for its parsed profile."""
+        accepted = self.submit_cv(user_id, file, text)
+        return self.wait_job(accepted["status_url"], on_progress=on_progress, wait_s=wait_s)
+
+    def set_interests(self, user_id: str, interests: List[str]) -> InterestsSaved:
+        return self._request("POST", "/user/interests", json={"user_id": user_id, "interests": interests}).json()
+
+    def analyze(self, user_id: str) -> Analysis:
+        return self._request("POST", "/career/analyze", params={"user_id": user_id}).json()
+
+    def recommend(self, user_id: str, interests: Optional[List[str]] = None) -> Recommendation:
+        return self._request("POST", "/career/recommend", params=recommend_params(user_id, interests)).json()
+
+    def stream_recommend(self, user_id: str, interests: Optional[List[str]] = None) -> Iterator[Tuple[str, Any]]:
+        """Yield (event, data) pairs from the SSE endpoint as they arrive."""
+        resp = self._request(
+            "POST", "/career/recommend/stream", stream=True, params=recommend_params(user_id, interests),
+            timeout=(self.timeout[0], 120.0),
+        )
+        with resp:
+            decoder = SSEDecoder()
+            for line in resp.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                event = decoder.feed(line)
+                if event is not None:
+                    yield event
@@ -0,0 +1,65 @@
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class Profile(TypedDict):
+    user_id: str
+    summary: str
+    skills: List[str]
+    experience: List[str]
+    education: List[str]
+
+
+class IngestStages(TypedDict, total=False):
+    content_hash: str
+    # Pipeline stages answered from the server's ingest ledger
+    skipped: List[str]
+    docs_written: int
+    docs_unchanged: int
+
+
+class CVUpload(TypedDict, total=False):
+    user_id: str
+    profile: Profile
+    ingest: Optional[IngestStages]
+
+
+class JobAccepted(TypedDict):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatus(TypedDict, total=False):
+    job_id: str
+    kind: str
+    user_id: str
+    # queued, running, done or failed
+    status: str
+    stage: str
+    progress: float
+    attempts: int
+    position: Optional[int]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    retry_at: Optional[float]
+    error: Optional[str]
+    result: Optional[Dict[str, Any]]
+
+
+class InterestsSaved(TypedDict):
+    status: str
+    user_id: str
+    count: int
+
+
+class Analysis(TypedDict):
+    profile: Profile
+    evidence_count: int
+
+
+class Recommendation(TypedDict):
+    recommended_career: str
+    justification: str
+    learning_path: List[str]
+    next_steps: List[str]
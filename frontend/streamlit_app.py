@@ -1,53 +1,79 @@
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Tuple
 
 import streamlit as st
-import requests
-
-DEFAULT_API_BASE = os.environ.get("API_BASE_URL", "http://127.0.0.1:8000")
-
-
-def post_upload_cv(api_base: str, user_id: str, file, text: Optional[str]):
-    url = f"{api_base}/user/upload_cv"
-    data = {"user_id": user_id}
-    files = None
-    if file is not None:
-        file_bytes = file.getvalue()
-        files = {
-            "file": (file.name, file_bytes, file.type or "application/octet-stream"),
-        }
-    if text and text.strip():
-        data["text"] = text
-
-    resp = requests.post(url, data=data, files=files, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
-
-
-def post_interests(api_base: str, user_id: str, interests: List[str]):
-    url = f"{api_base}/user/interests"
-    payload = {"user_id": user_id, "interests": interests}
-    resp = requests.post(url, json=payload, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
 
+from api_client import Analysis, ApiClient, Recommendation
 
-def post_analyze(api_base: str, user_id: str):
-    url = f"{api_base}/career/analyze"
-    resp = requests.post(url, params={"user_id": user_id}, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
-
-
-def post_recommend(api_base: str, user_id: str, interests: List[str]):
-    url = f"{api_base}/career/recommend"
-    params = {"user_id": user_id}
-    # requests will encode list values as repeated query params
-    for i in interests:
-        params.setdefault("interests", []).append(i)
-    resp = requests.post(url, params=params, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
+DEFAULT_API_BASE = os.environ.get("API_BASE_URL", "http://127.0.0.1:8000")
+# Seconds an analysis stays cached across reruns; saving a CV or interests refreshes it anyway
+CACHE_TTL_S = 300
+
+
+@st.cache_resource
+def get_client(api_base: str) -> ApiClient:
+    """One pooled client per API base URL, shared by all sessions and reruns."""
+    return ApiClient(api_base)
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def cached_analyze(api_base: str, user_id: str, revision: int) -> Analysis:
+    return get_client(api_base).analyze(user_id)
+
+
+def revision(user_id: str) -> int:
+    """Bumped whenever this session changes the user's CV or interests, so cached reads refresh."""
+    return st.session_state.revisions.get(user_id, 0)
+
+
+def bump_revision(user_id: str):
+    st.session_state.revisions[user_id] = revision(user_id) + 1
+
+
+def recommendation_key(user_id: str, interests: List[str]) -> Tuple[Any, ...]:
+    return (st.session_state.api_base, user_id, tuple(interests), revision(user_id))
+
+
+def render_recommendation(rec: Recommendation):
+    st.markdown("### Recommended Career")
+    st.markdown(f"**{rec['recommended_career']}**")
+    st.markdown("### Why")
+    st.write(rec["justification"])
+    st.markdown("### Learning Path")
+    for item in rec["learning_path"]:
+        st.write(f"- {item}")
+    st.markdown("### Next Steps")
+    for item in rec["next_steps"]:
+        st.write(f"- {item}")
+
+
+def stream_recommendation(client: ApiClient, user_id: str, interests: List[str]) -> Dict[str, Any]:
+    """Render each piece as soon as the server streams it; returns the final result (or {})."""
+    status = st.empty()
+    status.info("Reasoning about the best path for you...")
+    st.markdown("### Recommended Career")
+    career_slot = st.empty()
+    st.markdown("### Why")
+    why_slot = st.empty()
+    st.markdown("### Learning Path")
+    path_box = st.container()
+    st.markdown("### Next Steps")
+    steps_box = st.container()
+    for event, data in client.stream_recommend(user_id, interests):
+        if event == "recommended_career":
+            career_slot.markdown(f"**{data.get('value', '')}**")
+        elif event == "justification":
+            why_slot.write(data.get("value", ""))
+        elif event == "learning_path":
+            path_box.write(f"- {data.get('item', '')}")
+        elif event == "next_steps":
+            steps_box.write(f"- {data.get('item', '')}")
+        elif event == "result":
+            status.success("Recommendation ready")
+            return data
+        elif event == "error":
+            status.error(f"Recommend failed: {data.get('detail', '')}")
+    return {}
 
 
 st.set_page_config(page_title="AI Career Guidance", page_icon="🧭", layout="wide")
@@ -56,6 +82,11 @@ if "api_base" not in st.session_state:
     st.session_state.api_base = DEFAULT_API_BASE
 if "user_id" not in st.session_state:
     st.session_state.user_id = "user-1"
+for name in ("revisions", "uploads", "recommendations"):
+    if name not in st.session_state:
+        st.session_state[name] = {}
+if "analyze_users" not in st.session_state:
+    st.session_state.analyze_users = set()
 
 with st.sidebar:
     st.header("Settings")
@@ -63,6 +94,9 @@ with st.sidebar:
     st.session_state.user_id = st.text_input("User ID", value=st.session_state.user_id)
     st.caption("Ensure the FastAPI server is running.")
 
+client = get_client(st.session_state.api_base)
+user_id = st.session_state.user_id
+
 st.title("AI Career Guidance 🧭")
 
 tab_upload, tab_interests, tab_analyze, tab_recommend = st.tabs([
@@ -81,17 +115,23 @@ with tab_upload:
             st.warning("Please upload a file or paste text.")
         else:
             with st.spinner("Uploading and parsing CV..."):
+                progress = st.progress(0.0, text="Queued")
+
+                def show_progress(job: dict):
+                    label = f"Queued ({job['position']} ahead)" if job.get("position") else job["stage"].capitalize()
+                    progress.progress(min(1.0, job["progress"]), text=label)
+
+                file = None
+                if uploaded_file is not None:
+                    file = (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type or "application/octet-stream")
                 try:
-                    resp = post_upload_cv(
-                        st.session_state.api_base, st.session_state.user_id, uploaded_file, or_text
-                    )
+                    st.session_state.uploads[user_id] = client.upload_cv(user_id, file, or_text, on_progress=show_progress)
+                    bump_revision(user_id)
                     st.success("Parsed and stored successfully.")
-                    profile = resp.get("profile", {})
-                    st.json(profile)
-                except requests.HTTPError as e:
-                    st.error(f"Upload failed: {e.response.text if e.response is not None else e}")
                 except Exception as e:
                     st.error(f"Upload failed: {e}")
+    if user_id in st.session_state.uploads:
+        st.json(st.session_state.uploads[user_id].get("profile", {}))
 
 with tab_interests:
     st.subheader("Your Interests")
@@ -106,22 +146,21 @@ with tab_interests:
             st.info("No interests provided; you can still proceed to Recommend.")
         try:
             with st.spinner("Saving interests..."):
-                resp = post_interests(st.session_state.api_base, st.session_state.user_id, interests)
+                resp = client.set_interests(user_id, interests)
+                bump_revision(user_id)
                 st.success(f"Saved {resp.get('count', 0)} interests.")
-        except requests.HTTPError as e:
-            st.error(f"Save failed: {e.response.text if e.response is not None else e}")
         except Exception as e:
             st.error(f"Save failed: {e}")
 
 with tab_analyze:
     st.subheader("Analyze Stored Profile")
     if st.button("Analyze Profile"):
+        st.session_state.analyze_users.add(user_id)
+    # Once requested, the analysis stays on screen; reruns read it from the cache
+    if user_id in st.session_state.analyze_users:
         try:
             with st.spinner("Aggregating your stored profile..."):
-                resp = post_analyze(st.session_state.api_base, st.session_state.user_id)
-                st.json(resp)
-        except requests.HTTPError as e:
-            st.error(f"Analyze failed: {e.response.text if e.response is not None else e}")
+                st.json(cached_analyze(st.session_state.api_base, user_id, revision(user_id)))
         except Exception as e:
             st.error(f"Analyze failed: {e}")
 
@@ -129,21 +168,13 @@ with tab_recommend:
     st.subheader("Get Career Recommendation")
     extra = st.text_input("Optional: interests to emphasize (comma-separated)")
     extra_list = [s.strip() for s in extra.split(",") if s.strip()]
-    if st.button("Recommend"):
+    key = recommendation_key(user_id, extra_list)
+    if st.button("Recommend") and key not in st.session_state.recommendations:
         try:
-            with st.spinner("Reasoning about the best path for you..."):
-                resp = post_recommend(st.session_state.api_base, st.session_state.user_id, extra_list)
-                st.success("Recommendation ready")
-                st.markdown(f"### Recommended Career\n**{resp.get('recommended_career','')}**")
-                st.markdown("### Why")
-                st.write(resp.get("justification", ""))
-                st.markdown("### Learning Path")
-                for step in resp.get("learning_path", []):
-                    st.write(f"- {step}")
-                st.markdown("### Next Steps")
-                for step in resp.get("next_steps", []):
-                    st.write(f"- {step}")
-        except requests.HTTPError as e:
-            st.error(f"Recommend failed: {e.response.text if e.response is not None else e}")
+            result = stream_recommendation(client, user_id, extra_list)
+            if result:
+                st.session_state.recommendations[key] = result
         except Exception as e:
             st.error(f"Recommend failed: {e}")
+    elif key in st.session_state.recommendations:
+        render_recommendation(st.session_state.recommendations[key])
@@ -0,0 +1,110 @@
+"""Test setup: an isolated data directory and stub provider clients.
+
+The backend reads its configuration from the environment at import, so it is
+set here, before any test module imports it. Provider clients are replaced by
+in-process stubs that count their calls, so no test reaches the network.
+"""
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, List, Tuple
+
+DATA_DIR = tempfile.mkdtemp(prefix="pathfinder-tests-")
+atexit.register(shutil.rmtree, DATA_DIR, ignore_errors=True)
+
+os.environ.update({
+    "OPENAI_API_KEY": "sk-test",
+    # Nothing listens here; the stubs below answer instead
+    "OPENAI_API_BASE": "http://127.0.0.1:9/v1",
+    "CHROMA_DIR": DATA_DIR,
+    "EMBEDDING_BACKEND": "openai",
+    # Only single-flight may merge duplicate embeddings in these tests
+    "EMBED_BATCHING": "0",
+    "WARMUP_ON_STARTUP": "0",
+    "JOB_WORKERS": "0",
+    "LLM_BACKOFF_BASE_S": "0.01",
+})
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from backend.core import embeddings  # noqa: E402
+from backend.core.local_embeddings import HashingEmbedder  # noqa: E402
+
+PROFILE = {
+    "summary": "Data analyst with five years of Python and SQL experience.",
+    "skills": ["Python", "SQL", "pandas"],
+    "experience": ["Data Analyst at Acme (2019-2024)"],
+    "education": ["BSc Computer Science"],
+}
+RECOMMENDATION = {
+    "recommended_career": "Data Scientist",
+    "justification": "Strong Python and SQL foundations map well to data science.",
+    "learning_path": ["Learn scikit-learn", "Study statistics"],
+    "next_steps": ["Draft a tailored resume"],
+}
+
+
+class StubChat:
+    """ChatOpenAI stand-in: answers the recommendation prompt or the CV parse prompt
+    after `delay` seconds and counts its calls."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _reply(self, messages: List[Tuple[str, str]]) -> str:
+        with self._lock:
+            self.calls += 1
+        return json.dumps(RECOMMENDATION if "career coach" in messages[0][1] else PROFILE)
+
+    def invoke(self, messages: List[Tuple[str, str]]) -> Any:
+        time.sleep(self.delay)
+        return SimpleNamespace(content=self._reply(messages))
+
+    async def ainvoke(self, messages: List[Tuple[str, str]]) -> Any:
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=self._reply(messages))
+
+    async def astream(self, messages: List[Tuple[str, str]]):
+        text = self._reply(messages)
+        await asyncio.sleep(self.delay)
+        for i in range(0, len(text), 16):
+            yield SimpleNamespace(content=text[i : i + 16])
+
+
+class StubEmbedder(HashingEmbedder):
+    """OpenAIEmbeddings stand-in: local hashing vectors, counting provider calls."""
+
+    def __init__(self):
+        super().__init__(dim=64)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls += 1
+        return super().embed_documents(texts)
+
+
+@pytest.fixture(autouse=True)
+def provider(monkeypatch):
+    """Fresh stub clients for every test; `provider.chat.delay` slows the LLM down."""
+    stub = SimpleNamespace(chat=StubChat(), embedder=StubEmbedder())
+    monkeypatch.setattr(embeddings, "_llm", stub.chat)
+    monkeypatch.setattr(embeddings, "_embedder", stub.embedder)
+    return stub
+
+
+def app_client() -> httpx.AsyncClient:
+    """An HTTP client for the app, in-process (no lifespan: nothing is warmed up)."""
+    from backend.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=30)
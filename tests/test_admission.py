@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.core.admission import AdmissionClass, AdmissionController, AdmissionMiddleware, Overloaded
+from backend.core.deadline import remaining
+
+
+def test_classify_by_longest_prefix():
+    controller = AdmissionController(
+        {"read": {"limit": 1, "queue": 0, "max_wait_s": 0}, "generate": {"limit": 1, "queue": 0, "max_wait_s": 0},
+         "bulk": {"limit": 1, "queue": 0, "max_wait_s": 0}},
+        {"/career/recommend": "generate", "/career/recommend_batch": "bulk", "/healthz": None},
+    )
+    assert controller.classify("/career/recommend").name == "generate"
+    assert controller.classify("/career/recommend/stream").name == "generate"
+    assert controller.classify("/career/recommend_batch").name == "bulk"
+    assert controller.classify("/career/recommendations").name == "read"
+    assert controller.classify("/healthz") is None
+
+
+def test_waiters_get_slots_in_order_and_overflow_is_rejected():
+    async def main():
+        admission = AdmissionClass("test", limit=1, queue=2, max_wait_s=5)
+        await admission.acquire()
+        order = []
+
+        async def waiter(n):
+            await admission.acquire()
+            order.append(n)
+
+        waiters = [asyncio.ensure_future(waiter(n)) for n in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as rejected:
+            await admission.acquire()
+        assert rejected.value.reason == "queue_full" and rejected.value.retry_after >= 1
+        admission.release(0.5)
+        await asyncio.sleep(0)
+        admission.release(0.5)
+        await asyncio.gather(*waiters)
+        assert order == [0, 1]
+        assert admission.active == 1
+        admission.release()
+        assert admission.stats()["active"] == 0 and admission.stats()["rejected"] == 1
+
+    asyncio.run(main())
+
+
+def test_waiting_is_bounded():
+    async def main():
+        admission = AdmissionClass("test", limit=1, queue=1, max_wait_s=0.05)
+        await admission.acquire()
+        with pytest.raises(Overloaded) as rejected:
+            await admission.acquire()
+        assert rejected.value.reason == "wait_timeout"
+        admission.release()
+        # The timed-out waiter left no stale entry behind
+        await admission.acquire()
+        assert admission.active == 1
+
+    asyncio.run(main())
+
+
+def test_middleware_sheds_with_503_and_sets_deadlines():
+    app = FastAPI()
+    release = asyncio.Event()
+    seen = {}
+
+    @app.get("/slow")
+    async def slow():
+        seen["deadline_left"] = remaining()
+        await release.wait()
+        return {"ok": True}
+
+    controller = AdmissionController(
+        {"read": {"limit": 1, "queue": 0, "max_wait_s": 0, "timeout_s": 10}}, {}
+    )
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app") as client:
+            first = asyncio.ensure_future(client.get("/slow"))
+            while "deadline_left" not in seen:
+                await asyncio.sleep(0.01)
+            shed = await client.get("/slow")
+            release.set()
+            return await first, shed
+
+    first, shed = asyncio.run(main())
+    assert first.status_code == 200
+    assert 0 < seen["deadline_left"] <= 10
+    assert shed.status_code == 503
+    assert int(shed.headers["Retry-After"]) >= 1
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import uuid
+
+from backend import ingest
+from backend.services.ingest_service import BulkIngestor, CheckpointLog, IngestItem
+from backend.services.storage_service import StorageService
+
+from conftest import app_client
+
+
+def _cv(name: str) -> str:
+    return f"{name}\nData analyst, {uuid.uuid4().hex}.\nSkills: Python, SQL, pandas."
+
+
+def _write_cvs(root, n: int):
+    users = [f"bulk-{uuid.uuid4().hex[:8]}" for _ in range(n)]
+    for user in users:
+        (root / f"{user}.txt").write_text(_cv(user), encoding="utf-8")
+    return users
+
+
+def _run_cli(args, capsys):
+    code = ingest.main(args)
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_cli_ingests_a_directory_and_resumes_from_its_checkpoint(tmp_path, capsys, provider):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    users = _write_cvs(cvs, 3)
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+
+    code, report = _run_cli([str(cvs), "--checkpoint", checkpoint, "--batch-size", "2"], capsys)
+    assert code == 0
+    assert (report["total"], report["ingested"], report["skipped"], report["failed"]) == (3, 3, 0, 0)
+    profiles = asyncio.run(StorageService().aget_profiles(users))
+    assert all(p and p["skills"] for p in profiles)
+
+    # A re-run skips what the checkpoint recorded and only ingests the new CV
+    users += _write_cvs(cvs, 1)
+    parses = provider.chat.calls
+    code, report = _run_cli([str(cvs), "--checkpoint", checkpoint], capsys)
+    assert code == 0
+    assert (report["total"], report["ingested"], report["skipped"]) == (4, 1, 3)
+    assert provider.chat.calls == parses + 1
+    assert len(CheckpointLog(checkpoint)._done) == 4
+
+
+def test_cli_reports_failures_without_stopping(tmp_path, capsys):
+    manifest = tmp_path / "manifest.jsonl"
+    user = f"bulk-{uuid.uuid4().hex[:8]}"
+    manifest.write_text(
+        json.dumps({"user_id": user, "text": _cv(user)}) + "\n" + json.dumps({"user_id": "empty", "text": "  "}) + "\n",
+        encoding="utf-8",
+    )
+    code, report = _run_cli([str(manifest), "--no-checkpoint"], capsys)
+    assert code == 1
+    assert (report["ingested"], report["failed"]) == (1, 1)
+    assert report["errors"][0]["user_id"] == "empty"
+
+
+def _items(n: int):
+    items = []
+    for _ in range(n):
+        user = f"bulk-{uuid.uuid4().hex[:8]}"
+        items.append(IngestItem(user_id=user, source=user, text=_cv(user)))
+    return items
+
+
+def test_failing_checkpoint_is_reported_not_hung(tmp_path, monkeypatch):
+    def broken_mark(self, keys):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(CheckpointLog, "mark", broken_mark)
+    # More CVs than the ready queue holds, so a dead writer would block the parse workers
+    ingestor = BulkIngestor(StorageService(), batch_size=1, checkpoint_path=str(tmp_path / "checkpoint.jsonl"))
+    report = asyncio.run(asyncio.wait_for(ingestor.run(_items(5)), timeout=30))
+    assert (report.ingested, report.failed) == (0, 5)
+    assert all(e["error"] == "checkpoint not recorded: disk full" for e in report.errors)
+    assert report.docs_written > 0
+
+
+def test_failing_progress_callback_does_not_stop_the_run(capsys):
+    def on_progress(progress):
+        raise RuntimeError("display gone")
+
+    ingestor = BulkIngestor(StorageService(), batch_size=1, on_progress=on_progress)
+    report = asyncio.run(asyncio.wait_for(ingestor.run(_items(5)), timeout=30))
+    assert (report.ingested, report.failed) == (5, 0)
+    assert "progress callback failed" in capsys.readouterr().err
+
+
+def test_bulk_upload_endpoint():
+    users = [f"bulk-{uuid.uuid4().hex[:8]}" for _ in range(2)]
+
+    async def main():
+        async with app_client() as client:
+            files = [("files", (f"{u}.txt", _cv(u).encode(), "text/plain")) for u in users]
+            files.append(("files", ("blank.txt", b"   ", "text/plain")))
+            r = await client.post("/user/bulk_upload", files=files)
+            assert r.status_code == 200
+            report = r.json()
+            assert (report["total"], report["ingested"], report["failed"]) == (3, 2, 1)
+            assert report["errors"][0]["source"] == "blank.txt"
+
+            r = await client.post("/user/bulk_upload", files=files[:2], data={"user_ids": ["only-one"]})
+            assert r.status_code == 400
+
+        profiles = await StorageService().aget_profiles(users)
+        assert all(profiles)
+
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+import pytest
+
+from backend.core import career_catalog
+from backend.core.career_catalog import DEFAULT_CATALOG_PATH, CareerCatalog
+from backend.core.taxonomy import get_taxonomy
+from backend.services.career_service import ashortlist_careers
+
+from conftest import PROFILE
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """The bundled catalog with fresh descriptions, so no embedding of it is cached yet."""
+    with open(DEFAULT_CATALOG_PATH, encoding="utf-8") as f:
+        careers = json.load(f)["careers"]
+    tag = uuid.uuid4().hex
+    careers = [{**c, "description": f"{c.get('description', '')} ({tag})"} for c in careers]
+    catalog = CareerCatalog(careers, get_taxonomy(), cache_dir=str(tmp_path))
+    monkeypatch.setattr(career_catalog, "_catalog", catalog)
+    return catalog
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_requests_do_not_wait_for_the_catalog_embedding(catalog, provider, monkeypatch):
+    release = threading.Event()
+    embed_documents = provider.embedder.embed_documents
+
+    def slow_for_the_catalog(texts):
+        if len(texts) == len(catalog):
+            release.wait(5)
+        return embed_documents(texts)
+
+    monkeypatch.setattr(provider.embedder, "embed_documents", slow_for_the_catalog)
+    interests = ["Data Science"]
+    skills_only = catalog.shortlist(None, PROFILE["skills"], interests, 5)
+
+    start = time.perf_counter()
+    first = asyncio.run(ashortlist_careers(PROFILE, interests))
+    assert time.perf_counter() - start < 1.0
+    assert first == skills_only
+    assert catalog.ready_matrix() is None and not catalog.build_in_background()
+
+    release.set()
+    wait_for(lambda: catalog.ready_matrix() is not None)
+    assert asyncio.run(ashortlist_careers(PROFILE, interests)) != skills_only
+
+    # Saved under cache_dir: a restart loads it instead of embedding again
+    calls = provider.embedder.calls
+    reopened = CareerCatalog(catalog.careers, catalog.taxonomy, cache_dir=catalog.cache_dir)
+    assert reopened.ready_matrix() is not None and provider.embedder.calls == calls
+
+
+def test_failed_build_is_tried_again(catalog, provider, monkeypatch):
+    embed_documents = provider.embedder.embed_documents
+    attempts = []
+
+    def fails_once(texts):
+        attempts.append(texts)
+        if len(attempts) == 1:
+            raise ValueError("embedding failed")
+        return embed_documents(texts)
+
+    monkeypatch.setattr(provider.embedder, "embed_documents", fails_once)
+    assert catalog.build_in_background()
+    # Starts again once the failed build has finished
+    wait_for(catalog.build_in_background)
+    wait_for(lambda: catalog.ready_matrix() is not None)
+    assert len(attempts) == 2
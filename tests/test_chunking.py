@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+from backend.core import tokens
+from backend.core.tokens import count_tokens, split_by_tokens
+from backend.core.utils import chunk_text
+from backend.services.ingest_service import store_cvs
+from backend.services.storage_service import StorageService
+
+from conftest import PROFILE
+
+SENTENCES = [f"Sentence number {i} describes one more project in some detail." for i in range(30)]
+
+
+class CharEncoding:
+    """tiktoken stand-in with one token per character."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, ids):
+        return "".join(ids)
+
+
+def test_chunks_stay_within_the_token_budget():
+    chunks = chunk_text(" ".join(SENTENCES), max_tokens=64, overlap_tokens=20)
+    assert len(chunks) > 3
+    assert all(count_tokens(c) <= 64 for c in chunks)
+    # Every sentence lands in some chunk
+    assert all(any(s in c for c in chunks) for s in SENTENCES)
+
+
+def test_consecutive_chunks_share_trailing_sentences():
+    chunks = chunk_text(" ".join(SENTENCES), max_tokens=64, overlap_tokens=20)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        last = prev[prev.rindex("Sentence") :]
+        assert nxt.startswith(last)
+    no_overlap = chunk_text(" ".join(SENTENCES), max_tokens=64, overlap_tokens=0)
+    assert sum(len(c) for c in no_overlap) < sum(len(c) for c in chunks)
+    assert not any(nxt.startswith(prev[prev.rindex("Sentence") :]) for prev, nxt in zip(no_overlap, no_overlap[1:]))
+
+
+def test_sections_start_new_chunks():
+    text = "SUMMARY " + " ".join(SENTENCES[:4]) + " EXPERIENCE " + " ".join(SENTENCES[4:6]) + " Education: BSc."
+    chunks = chunk_text(text, max_tokens=200, overlap_tokens=20)
+    assert [c.split()[0] for c in chunks] == ["SUMMARY", "EXPERIENCE"]
+    # A small section stays with the running chunk instead of standing alone
+    assert chunks[1].endswith("Education: BSc.")
+
+
+def test_long_sentences_are_split_between_words():
+    sentence = " ".join(f"word{i}" for i in range(200))
+    chunks = chunk_text(sentence, max_tokens=32, overlap_tokens=0)
+    assert all(count_tokens(c) <= 32 for c in chunks)
+    assert " ".join(chunks).split() == sentence.split()
+
+
+def test_split_by_tokens_keeps_words_whole_with_an_encoding(monkeypatch):
+    monkeypatch.setattr(tokens, "get_encoding", lambda model=None: CharEncoding())
+    # " alpha" and " beta" are 11 tokens together
+    assert split_by_tokens("alpha beta gamma", 11) == ["alpha beta", "gamma"]
+    assert split_by_tokens("ab " + "x" * 25, 10) == ["ab", "x" * 9, "x" * 10, "x" * 6]
+
+
+def test_shorter_reupload_drops_stale_chunks():
+    storage = StorageService()
+    user = f"chunks-{uuid.uuid4().hex[:8]}"
+
+    async def main():
+        await store_cvs(storage, [(user, ["first chunk", "second chunk", "third chunk"], PROFILE)])
+        assert sorted(storage.store.doc_ids([user], "cv_raw")) == [f"{user}:cv_raw:{n}" for n in range(3)]
+        await store_cvs(storage, [(user, ["only chunk"], PROFILE)])
+        assert storage.store.doc_ids([user], "cv_raw") == [f"{user}:cv_raw:0"]
+        assert (await storage.aget_profile(user))["skills"] == PROFILE["skills"]
+
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from conftest import app_client
+
+DELAY_S = 0.4
+CALLERS = 10
+
+
+async def _recommend_all(user_ids):
+    async with app_client() as client:
+        return await asyncio.gather(
+            *(client.post("/career/recommend", params={"user_id": u, "interests": ["AI"]}) for u in user_ids)
+        )
+
+
+def test_concurrent_recommendations_overlap(provider):
+    # Load the clients, vector store and career catalog before timing
+    assert all(r.status_code == 200 for r in asyncio.run(_recommend_all(["warm-up"])))
+    provider.chat.delay = DELAY_S
+    provider.chat.calls = 0
+
+    start = time.perf_counter()
+    responses = asyncio.run(_recommend_all([f"overlap-{i}" for i in range(CALLERS)]))
+    elapsed = time.perf_counter() - start
+
+    assert [r.status_code for r in responses] == [200] * CALLERS
+    assert provider.chat.calls == CALLERS
+    # One after another would take CALLERS * DELAY_S
+    assert elapsed < 3 * DELAY_S, f"{CALLERS} recommendations took {elapsed:.2f}s"
@@ -0,0 +1,60 @@
+from backend.core.tokens import count_tokens
+from backend.services import context_packer
+from backend.services.context_packer import pack_context
+
+from conftest import PROFILE
+
+
+def _passage(i: int, distance: float = 0.1):
+    text = f"Project {i} built a forecasting pipeline for team {i} in quarter {i % 4}. It cut costs by {i} percent."
+    return {"document": text, "distance": distance, "metadata": {"type": "cv_raw"}}
+
+
+def test_token_budget_is_a_ceiling():
+    passages = [_passage(i) for i in range(40)]
+    for budget in (25, 60, 200):
+        packed = pack_context(passages, budget_tokens=budget)
+        assert 0 < packed.tokens <= budget
+        assert packed.passages + packed.dropped_budget == 40
+    assert pack_context(passages, budget_tokens=10000).passages == 40
+
+
+def test_char_ceiling_applies_under_a_large_budget(monkeypatch):
+    monkeypatch.setattr(context_packer, "MAX_CTX_CHARS", 250)
+    packed = pack_context([_passage(i) for i in range(40)], budget_tokens=10000)
+    assert len(packed.text) <= 250
+    assert packed.dropped_budget > 0
+
+
+def test_nearest_passages_come_first():
+    passages = [_passage(1, distance=0.9), _passage(2, distance=0.1)]
+    assert pack_context(passages, budget_tokens=1000).text.startswith("Project 2 ")
+
+
+def test_near_duplicates_are_dropped():
+    base = _passage(7)
+    # A chunk overlap that differs only in its last word
+    near = dict(base, document=base["document"].replace("percent.", "percent overall."))
+    other = _passage(8)
+    packed = pack_context([base, near, other], budget_tokens=1000)
+    assert (packed.passages, packed.dropped_duplicates) == (2, 1)
+    assert "overall" not in packed.text
+
+
+def test_sentences_in_the_profile_are_dropped():
+    profile_doc = {"document": "whatever", "distance": 0.0, "metadata": {"type": "profile"}}
+    repeat = {"document": PROFILE["summary"], "distance": 0.2, "metadata": {"type": "cv_raw"}}
+    mixed = {"document": PROFILE["summary"] + " Mentored three junior analysts.", "distance": 0.3, "metadata": {}}
+    packed = pack_context([profile_doc, repeat, mixed], profile=PROFILE, budget_tokens=1000)
+    assert packed.text == "Mentored three junior analysts."
+    assert (packed.passages, packed.dropped_covered) == (1, 2)
+
+
+def test_tiny_budgets_do_not_raise():
+    passages = [_passage(i) for i in range(5)]
+    for budget in (-5, 0, 1, 2):
+        packed = pack_context(passages, budget_tokens=budget)
+        assert packed.tokens <= max(budget, 0) or packed.passages == 0
+    assert pack_context([], budget_tokens=0).text == ""
+    assert pack_context("", budget_tokens=1).passages == 0
+    assert count_tokens(pack_context("One. Two. Three.", budget_tokens=2).text) <= 2
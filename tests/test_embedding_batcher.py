@@ -0,0 +1,125 @@
+import asyncio
+import time
+import uuid
+
+from backend.core import embeddings
+from backend.core.deadline import get_deadline, reset_deadline, set_deadline
+from backend.core.embeddings import EmbeddingBatcher
+
+
+class RecordingEmbed:
+    """Batcher embed_fn: one fake vector per text, recording each batch and its deadline."""
+
+    def __init__(self, fail_on: str = ""):
+        self.fail_on = fail_on
+        self.batches = []
+        self.deadlines = []
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.deadlines.append(get_deadline())
+        await asyncio.sleep(0.01)
+        if self.fail_on and self.fail_on in texts:
+            raise RuntimeError("provider down")
+        return [[float(len(t))] for t in texts]
+
+
+def test_window_flush_routes_results_to_each_caller():
+    async def main():
+        embed = RecordingEmbed()
+        batcher = EmbeddingBatcher(embed, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.embed(["a", "bb"]), batcher.embed(["ccc"]), batcher.embed(["bb", "dddd"])
+        )
+        assert results == [[[1.0], [2.0]], [[3.0]], [[2.0], [4.0]]]
+        # One provider call for the window, each distinct text once
+        assert embed.batches == [["a", "bb", "ccc", "dddd"]]
+        assert batcher.stats()["batches"] == 1 and batcher.stats()["requests"] == 3
+
+    asyncio.run(main())
+
+
+def test_max_size_flushes_before_the_window():
+    async def main():
+        embed = RecordingEmbed()
+        batcher = EmbeddingBatcher(embed, max_batch_size=2, max_wait_ms=10000)
+        start = time.perf_counter()
+        await asyncio.gather(*(batcher.embed([f"t{i}"]) for i in range(4)))
+        assert time.perf_counter() - start < 1
+        assert embed.batches == [["t0", "t1"], ["t2", "t3"]]
+
+    asyncio.run(main())
+
+
+def test_max_tokens_flushes_before_the_window():
+    async def main():
+        embed = RecordingEmbed()
+        # Each 40-char text is estimated at 11 tokens, so two fill a batch
+        batcher = EmbeddingBatcher(embed, max_tokens=22, max_wait_ms=10000)
+        texts = [c * 40 for c in "wxyz"]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(batcher.embed([t]) for t in texts))
+        assert time.perf_counter() - start < 1
+        assert results == [[[40.0]]] * 4
+        assert embed.batches == [texts[:2], texts[2:]]
+
+    asyncio.run(main())
+
+
+def test_failing_batch_fails_only_its_callers():
+    async def main():
+        embed = RecordingEmbed(fail_on="bad")
+        batcher = EmbeddingBatcher(embed, max_batch_size=2, max_wait_ms=10000)
+        results = await asyncio.gather(
+            batcher.embed(["ok1"]), batcher.embed(["bad"]),
+            batcher.embed(["ok2"]), batcher.embed(["ok3"]),
+            return_exceptions=True,
+        )
+        assert [type(r) for r in results[:2]] == [RuntimeError, RuntimeError]
+        assert results[2:] == [[[3.0]], [[3.0]]]
+
+    asyncio.run(main())
+
+
+def test_batch_deadline_is_the_latest_callers():
+    async def main():
+        embed = RecordingEmbed()
+        batcher = EmbeddingBatcher(embed, max_wait_ms=20)
+        now = time.monotonic()
+
+        async def call(text, at):
+            token = set_deadline(at)
+            try:
+                return await batcher.embed([text])
+            finally:
+                reset_deadline(token)
+
+        await asyncio.gather(call("a", now + 5), call("b", now + 30), call("c", now + 10))
+        assert embed.deadlines == [now + 30]
+        # A caller without a deadline leaves the whole batch unbounded
+        await asyncio.gather(call("d", now + 5), call("e", None))
+        assert embed.deadlines[1] is None
+
+    asyncio.run(main())
+
+
+def test_aembed_texts_batches_concurrent_misses(provider, monkeypatch):
+    monkeypatch.setattr(embeddings, "EMBED_BATCHING", True)
+    monkeypatch.setattr(embeddings, "_batcher", None)
+    batches = []
+    embed_documents = provider.embedder.embed_documents
+
+    def record(texts):
+        batches.append(list(texts))
+        return embed_documents(texts)
+
+    monkeypatch.setattr(provider.embedder, "embed_documents", record)
+    texts = [f"batched {uuid.uuid4().hex}" for _ in range(5)]
+
+    async def main():
+        results = await asyncio.gather(*(embeddings.aembed_texts([t]) for t in texts))
+        assert results == [provider.embedder.embed_documents([t]) for t in texts]
+
+    asyncio.run(main())
+    assert sorted(batches[0]) == sorted(texts)
+    assert embeddings.embedding_batcher_stats()["batches"] == 1
@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+import time
+import uuid
+from array import array
+
+from backend.core import embedding_cache, embeddings
+from backend.core.embedding_cache import EmbeddingCache, text_key
+from backend.core.metrics import EMBEDDING_TEXTS
+
+
+def texts_hit_and_missed():
+    return {result: EMBEDDING_TEXTS._values.get((result,), 0.0) for result in ("hit", "miss")}
+
+
+def test_only_misses_reach_the_provider(provider, monkeypatch):
+    batches = []
+    embed_documents = provider.embedder.embed_documents
+
+    def record(texts):
+        batches.append(list(texts))
+        return embed_documents(texts)
+
+    monkeypatch.setattr(provider.embedder, "embed_documents", record)
+    a, b, c = (f"text {n} {uuid.uuid4().hex}" for n in range(3))
+    cache = embeddings.get_embedding_cache()
+    before, counted = cache.stats(), texts_hit_and_missed()
+
+    first = asyncio.run(embeddings.aembed_texts([a, b, a]))
+    assert batches == [[a, b]] and first[0] == first[2]
+    second = asyncio.run(embeddings.aembed_texts([c, a, b]))
+    assert batches == [[a, b], [c]] and second[1:] == first[:2]
+    asyncio.run(embeddings.aembed_texts([b, c]))
+    assert len(batches) == 2
+
+    after, now_counted = cache.stats(), texts_hit_and_missed()
+    assert after["misses"] - before["misses"] == 4
+    assert after["memory_hits"] - before["memory_hits"] == 4
+    assert after["api_calls"] - before["api_calls"] == 2
+    assert after["api_texts"] - before["api_texts"] == 3
+    assert after["api_calls_avoided"] - before["api_calls_avoided"] == 1
+    assert now_counted["miss"] - counted["miss"] == 4 and now_counted["hit"] - counted["hit"] == 4
+
+
+def test_memory_tier_is_an_lru():
+    cache = EmbeddingCache("m", max_entries=2)
+    cache.put_many(["a", "b"], [[1.0], [2.0]])
+    cache.get_many(["a"])
+    cache.put_many(["c"], [[3.0]])
+    vectors, misses = cache.get_many(["a", "b", "c"])
+    assert vectors == [[1.0], None, [3.0]] and misses == [1]
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache("m", db_path=path).put_many(["a"], [[0.5, 0.25]])
+    reopened = EmbeddingCache("m", db_path=path)
+    assert reopened.get_many(["a"]) == ([[0.5, 0.25]], [])
+    assert reopened.stats()["disk_hits"] == 1
+    # Another model's vectors are a different space
+    assert EmbeddingCache("other", db_path=path).get_many(["a"]) == ([None], [0])
+
+
+def disk_rows(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_disk_tier_is_capped_least_recently_used_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_PRUNE_EVERY", 1)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache("m", max_entries=0, db_path=path, disk_max_entries=2)
+    cache.put_many(["a"], [[1.0]])
+    time.sleep(0.01)
+    cache.put_many(["b"], [[2.0]])
+    time.sleep(0.01)
+    # Reading "a" back makes "b" the least recently used
+    cache.get_many(["a"])
+    time.sleep(0.01)
+    cache.put_many(["c"], [[3.0]])
+    assert disk_rows(path) == 2
+    assert cache.get_many(["a", "b", "c"])[1] == [1]
+
+
+def test_disk_tier_drops_unused_vectors(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_PRUNE_EVERY", 1)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache("m", max_entries=0, db_path=path, disk_ttl_s=0.05)
+    cache.put_many(["old"], [[1.0]])
+    time.sleep(0.06)
+    cache.put_many(["new"], [[2.0]])
+    assert disk_rows(path) == 1
+    assert cache.get_many(["old", "new"])[1] == [0]
+
+
+def test_cache_from_before_the_bound_is_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE embeddings (model TEXT NOT NULL, key TEXT NOT NULL, vec BLOB NOT NULL, PRIMARY KEY (model, key))")
+    db.execute("INSERT INTO embeddings VALUES ('m', ?, ?)", (text_key("old"), array("f", [1.0]).tobytes()))
+    db.commit()
+    db.close()
+    cache = EmbeddingCache("m", db_path=path)
+    # Old rows start their TTL at the migration instead of expiring at once
+    cache.put_many(["new"], [[2.0]])
+    assert EmbeddingCache("m", db_path=path).get_many(["old", "new"]) == ([[1.0], [2.0]], [])
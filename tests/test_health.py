@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+
+from conftest import app_client
+
+
+def test_healthz_needs_no_dependencies():
+    async def main():
+        async with app_client() as client:
+            return await client.get("/healthz")
+
+    assert asyncio.run(main()).status_code == 200
+
+
+def test_readyz_turns_ready_after_warm_up(provider, monkeypatch):
+    async def list_models():
+        return []
+
+    # The provider probe lists models
+    monkeypatch.setattr(
+        provider.chat, "root_async_client", SimpleNamespace(models=SimpleNamespace(list=list_models)), raising=False
+    )
+
+    async def main():
+        async with app_client() as client:
+            for _ in range(100):
+                resp = await client.get("/readyz")
+                if resp.status_code == 200:
+                    return resp
+                await asyncio.sleep(0.05)
+            return resp
+
+    resp = asyncio.run(main())
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["checks"] == {"index": "ok", "provider": "ok"}
@@ -0,0 +1,129 @@
+import asyncio
+import sqlite3
+import time
+import uuid
+
+from backend.services import ingest_ledger, profile_service
+from backend.services.ingest_ledger import IngestLedger, content_hash
+
+from conftest import app_client
+
+
+def upload(client, user_id, data):
+    files = {"file": ("cv.txt", data, "text/plain")}
+    return client.post("/user/upload_cv", data={"user_id": user_id}, files=files)
+
+
+def unique_cv():
+    return f"Data analyst, ticket {uuid.uuid4().hex}. Python, SQL and pandas every day.".encode()
+
+
+def test_unchanged_upload_skips_every_stage(provider):
+    user_id, data = f"u-{uuid.uuid4().hex}", unique_cv()
+
+    async def main():
+        async with app_client() as client:
+            first = await upload(client, user_id, data)
+            second = await upload(client, user_id, data)
+        return first.json()["ingest"], second.json()["ingest"]
+
+    first, second = asyncio.run(main())
+    assert first["skipped"] == [] and first["docs_written"] > 0
+    assert second["skipped"] == ["extract", "parse", "embed", "store"]
+    assert second["docs_written"] == 0 and second["docs_unchanged"] == first["docs_written"]
+    assert second["content_hash"] == first["content_hash"]
+    assert provider.chat.calls == 1
+
+
+def test_parser_change_reparses_the_same_text(provider, monkeypatch):
+    user_id, data = f"u-{uuid.uuid4().hex}", unique_cv()
+
+    async def main():
+        async with app_client() as client:
+            await upload(client, user_id, data)
+            monkeypatch.setattr(profile_service, "PARSE_PROMPT_VERSION", "test-next")
+            return (await upload(client, user_id, data)).json()["ingest"]
+
+    report = asyncio.run(main())
+    # The extracted text is still good; the stored profile came from another parser
+    assert report["skipped"] == ["extract", "embed", "store"]
+    assert provider.chat.calls == 2
+
+
+def test_uploads_expire_and_are_capped(tmp_path):
+    ledger = IngestLedger(str(tmp_path / "ledger.sqlite3"), upload_ttl_s=60, max_uploads=2)
+    for n in range(3):
+        ledger.put_upload_text(f"raw{n}", "u1", f"text {n}")
+        time.sleep(0.01)
+    assert ledger.upload_text("raw0") is None
+    assert ledger.upload_text("raw2") == "text 2"
+    assert ledger.stats()["uploads"] == 2
+
+    ledger.upload_ttl_s = 0.05
+    time.sleep(0.06)
+    assert ledger.upload_text("raw2") is None
+    ledger.put_upload_text("raw3", "u1", "text 3")
+    assert ledger.stats()["uploads"] == 1
+
+
+def test_profiles_expire_and_least_recently_used_are_capped(tmp_path):
+    ledger = IngestLedger(str(tmp_path / "ledger.sqlite3"), profile_ttl_s=60, max_profiles=2)
+    for n in range(2):
+        ledger.put_profile(f"text{n}", "p", {"n": n})
+        time.sleep(0.01)
+    # A hit keeps text0 over the more recently written text1
+    assert ledger.profile("text0", "p") == {"n": 0}
+    time.sleep(0.01)
+    ledger.put_profile("text2", "p", {"n": 2})
+    assert ledger.profile("text1", "p") is None
+    assert ledger.profile("text0", "p") == {"n": 0}
+    assert ledger.stats()["profiles"] == 2
+
+    ledger.profile_ttl_s = 0.05
+    time.sleep(0.06)
+    assert ledger.profile("text2", "p") is None
+    ledger.put_profile("text3", "p", {"n": 3})
+    assert ledger.stats()["profiles"] == 1
+
+
+def test_forget_user_keeps_what_others_uploaded(tmp_path):
+    ledger = IngestLedger(str(tmp_path / "ledger.sqlite3"))
+    ledger.put_upload_text("shared", "u1", "shared text")
+    ledger.put_upload_text("shared", "u2", "shared text")
+    ledger.put_upload_text("own", "u1", "own text")
+    for text in ("shared text", "own text"):
+        ledger.put_profile(content_hash(text), "p", {"summary": text})
+    ledger.put_user_docs({"u1": {"d1": "h1"}, "u2": {"d2": "h2"}})
+
+    ledger.forget_user("u1")
+    assert ledger.upload_text("own") is None
+    assert ledger.upload_text("shared") == "shared text"
+    assert ledger.profile(content_hash("own text"), "p") is None
+    assert ledger.profile(content_hash("shared text"), "p") == {"summary": "shared text"}
+    assert ledger.user_docs(["u1", "u2"]) == {"u2": {"d2": "h2"}}
+
+
+def test_older_ledger_drops_uploads_and_keeps_profiles(tmp_path):
+    path = str(tmp_path / "ledger.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE uploads (raw_hash TEXT PRIMARY KEY, text_hash TEXT NOT NULL, text TEXT NOT NULL)")
+    db.execute("INSERT INTO uploads VALUES ('raw', 'hash', 'unowned text')")
+    db.execute(
+        "CREATE TABLE profiles (text_hash TEXT NOT NULL, parser TEXT NOT NULL, profile_json TEXT NOT NULL,"
+        " PRIMARY KEY (text_hash, parser))"
+    )
+    db.execute("""INSERT INTO profiles VALUES ('hash', 'p', '{"summary": "kept"}')""")
+    db.commit()
+    db.close()
+
+    ledger = IngestLedger(path)
+    assert ledger.upload_text("raw") is None
+    # Profiles carry no user, so they are kept and start their TTL now
+    assert ledger.profile("hash", "p") == {"summary": "kept"}
+    ledger.put_upload_text("raw", "u1", "text")
+    assert ledger.upload_text("raw") == "text"
+
+
+def test_ledger_is_optional(monkeypatch):
+    monkeypatch.setattr(ingest_ledger, "INGEST_LEDGER", False)
+    assert ingest_ledger.get_ingest_ledger() is None
@@ -0,0 +1,183 @@
+import asyncio
+import sqlite3
+import time
+
+from backend.core.provider import ProviderUnavailable
+from backend.services import job_service
+from backend.services.job_queue import JobQueue
+from backend.services.job_service import JobWorkers
+
+
+def make_queue(tmp_path, **kwargs):
+    return JobQueue(str(tmp_path / "jobs"), **kwargs)
+
+
+def test_claim_takes_the_oldest_job_once(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.enqueue("upload_cv", "u1", {"text": "one"})
+    second = queue.enqueue("upload_cv", "u2", {"text": "two"}, data=b"cv")
+    assert queue.get(second)["position"] == 1
+
+    job = queue.claim(lease_s=60)
+    assert job["id"] == first and job["status"] == "running" and job["attempts"] == 1
+    job = queue.claim(lease_s=60)
+    assert job["id"] == second and queue.file_path(job) is not None
+    assert queue.claim(lease_s=60) is None
+
+    queue.finish(second, {"ok": True})
+    done = queue.get(second)
+    assert done["status"] == "done" and done["result"] == {"ok": True} and done["progress"] == 1.0
+    assert not (tmp_path / "jobs" / "files" / second).exists()
+
+
+def test_expired_lease_is_claimed_again_until_attempts_run_out(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job_id = queue.enqueue("upload_cv", "u1", {})
+    assert queue.claim(lease_s=0.01)["attempts"] == 1
+    time.sleep(0.02)
+    assert queue.claim(lease_s=0.01)["attempts"] == 2
+    time.sleep(0.02)
+    assert queue.claim(lease_s=60) is None
+    failed = queue.get(job_id)
+    assert failed["status"] == "failed" and failed["error"] == "worker stopped responding"
+
+
+def test_update_extends_the_lease(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("upload_cv", "u1", {})
+    queue.claim(lease_s=0.01)
+    queue.update(job_id, "parse", 0.5, lease_s=60)
+    time.sleep(0.02)
+    assert queue.claim(lease_s=60) is None
+    assert queue.get(job_id)["stage"] == "parse"
+
+
+def test_retries_back_off_exponentially(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=3, retry_base_s=0.05, retry_max_s=0.08)
+    assert [queue.retry_delay(n) for n in (1, 2, 3)] == [0.05, 0.08, 0.08]
+    job_id = queue.enqueue("upload_cv", "u1", {})
+    queue.claim(lease_s=60)
+
+    assert queue.fail(job_id, "provider down", retry=True)
+    waiting = queue.get(job_id)
+    assert waiting["status"] == "queued" and waiting["not_before"] > time.time()
+    assert queue.claim(lease_s=60) is None
+    time.sleep(0.06)
+    job = queue.claim(lease_s=60)
+    assert job["id"] == job_id and job["attempts"] == 2 and job["not_before"] is None
+
+    assert queue.fail(job_id, "provider down", retry=True)
+    time.sleep(0.09)
+    queue.claim(lease_s=60)
+    assert not queue.fail(job_id, "provider down", retry=True)
+    assert queue.get(job_id)["status"] == "failed"
+
+
+def test_release_does_not_count_the_attempt(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("upload_cv", "u1", {})
+    queue.claim(lease_s=60)
+    queue.release(job_id)
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.claim(lease_s=60)["attempts"] == 1
+
+
+def test_purge_deletes_only_old_finished_jobs(tmp_path):
+    queue = make_queue(tmp_path)
+    done = queue.enqueue("upload_cv", "u1", {})
+    waiting = queue.enqueue("upload_cv", "u2", {})
+    queue.claim(lease_s=60)
+    queue.finish(done, {})
+    assert queue.purge(older_than_s=60) == 0
+    time.sleep(0.02)
+    assert queue.purge(older_than_s=0.01) == 1
+    assert queue.get(done) is None and queue.get(waiting) is not None
+
+
+def test_queue_from_before_backoff_is_migrated(tmp_path):
+    root = tmp_path / "jobs"
+    root.mkdir()
+    db = sqlite3.connect(str(root / "jobs.sqlite3"))
+    db.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, user_id TEXT NOT NULL,"
+        " status TEXT NOT NULL, stage TEXT NOT NULL DEFAULT 'queued', progress REAL NOT NULL DEFAULT 0,"
+        " attempts INTEGER NOT NULL DEFAULT 0, payload_json TEXT NOT NULL, result_json TEXT, error TEXT,"
+        " created_at REAL NOT NULL, started_at REAL, finished_at REAL, lease_until REAL)"
+    )
+    db.execute("INSERT INTO jobs (id, kind, user_id, status, payload_json, created_at) VALUES ('old', 'upload_cv', 'u1', 'queued', '{}', 1)")
+    db.commit()
+    db.close()
+    assert JobQueue(str(root)).claim(lease_s=60)["id"] == "old"
+
+
+def run_workers(queue, handler, until, **kwargs):
+    async def main():
+        workers = JobWorkers(queue, workers=1, lease_s=60, **kwargs)
+        workers.start()
+        try:
+            for _ in range(200):
+                if until():
+                    return
+                await asyncio.sleep(0.01)
+        finally:
+            await workers.stop()
+
+    job_service.HANDLERS["test"] = handler
+    try:
+        asyncio.run(main())
+    finally:
+        del job_service.HANDLERS["test"]
+
+
+def test_worker_survives_a_failure_to_record_the_outcome(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path)
+    broken = queue.enqueue("test", "u1", {})
+    fine = queue.enqueue("test", "u2", {})
+    real_finish, real_fail = queue.finish, queue.fail
+
+    def finish(job_id, result):
+        if job_id == broken:
+            raise sqlite3.OperationalError("database is locked")
+        real_finish(job_id, result)
+
+    def fail(job_id, error, retry=False):
+        if job_id == broken:
+            raise sqlite3.OperationalError("database is locked")
+        return real_fail(job_id, error, retry)
+
+    monkeypatch.setattr(queue, "finish", finish)
+    monkeypatch.setattr(queue, "fail", fail)
+
+    async def handler(job, on_stage):
+        return {"user_id": job["user_id"]}
+
+    run_workers(queue, handler, lambda: queue.get(fine)["status"] == "done")
+    assert queue.get(fine)["result"] == {"user_id": "u2"}
+    # Left running; its lease expiry hands it to a worker again
+    assert queue.get(broken)["status"] == "running"
+
+
+def test_worker_requeues_provider_outages_with_backoff(tmp_path):
+    queue = make_queue(tmp_path, retry_base_s=60)
+    job_id = queue.enqueue("test", "u1", {})
+
+    async def handler(job, on_stage):
+        raise ProviderUnavailable("provider down")
+
+    run_workers(queue, handler, lambda: queue.get(job_id)["status"] == "queued" and queue.get(job_id)["attempts"] == 1)
+    job = queue.get(job_id)
+    assert job["error"] == "provider down" and job["not_before"] > time.time() + 30
+
+
+def test_workers_purge_periodically(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("test", "u1", {})
+    queue.claim(lease_s=60)
+    queue.finish(job_id, {})
+
+    async def handler(job, on_stage):
+        return {}
+
+    # Not yet expired when the workers start; a later round deletes it
+    run_workers(queue, handler, lambda: queue.get(job_id) is None, retention_s=0.1, purge_interval_s=0.02)
+    assert queue.get(job_id) is None
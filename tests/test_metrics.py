@@ -0,0 +1,54 @@
+import pytest
+
+from backend.core.metrics import Counter, Gauge, Histogram, Registry, _Metric, sample, server_timing
+
+
+def test_counter_and_gauge_render_per_label():
+    requests = Counter("test_requests_total", "Requests.", ("route",))
+    requests.inc(route="/a")
+    requests.inc(2, route="/b")
+    inflight = Gauge("test_inflight", "In flight.")
+    inflight.inc()
+    inflight.dec()
+    inflight.set(3)
+    assert requests.render() == [
+        "# HELP test_requests_total Requests.",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/a"} 1',
+        'test_requests_total{route="/b"} 2',
+    ]
+    assert inflight.render()[-1] == "test_inflight 3"
+
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("test_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+    assert latency.render()[2:] == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 5.55",
+        "test_seconds_count 3",
+    ]
+
+
+def test_registry_skips_failing_collectors():
+    registry = Registry()
+    registry.register(Counter("test_total", "Total.")).inc()
+    registry.add_collector(lambda: 1 / 0)
+    registry.add_collector(lambda: sample("test_entries", "gauge", "Entries.", 4))
+    assert registry.render().splitlines()[-1] == "test_entries 4"
+
+
+def test_server_timing_sums_stages_by_name():
+    header = server_timing([("embed", 0.01), ("llm", 0.5), ("embed", 0.002)], 0.6)
+    assert header == "embed;dur=12.0, llm;dur=500.0, total;dur=600.0"
+
+
+def test_metric_kinds_must_render_samples():
+    class Untyped(_Metric):
+        kind = "untyped"
+
+    with pytest.raises(TypeError, match="abstract"):
+        Untyped("test_untyped", "No samples.")
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.core import concurrency
+from backend.core.concurrency import get_process_pool, recycle_process_pool, run_in_process
+from backend.services.extraction_service import ExtractionError, extract_pdf
+from benchmarks.pdf_extraction import make_pdf
+
+
+def _pdf(pages: int) -> bytes:
+    return make_pdf([[f"page {p} line {i} python sql" for i in range(5)] for p in range(pages)])
+
+
+def test_extracts_every_page_batch():
+    result = asyncio.run(extract_pdf(_pdf(10), max_tokens=10**6))
+    assert result.pages == result.pages_extracted == 10
+    assert "page 0 line 0" in result.text and "page 9 line 4" in result.text
+    assert not result.stopped_early
+
+
+def test_page_limit():
+    with pytest.raises(ExtractionError, match="limit is 3"):
+        asyncio.run(extract_pdf(_pdf(5), max_pages=3))
+
+
+def test_timeout_recycles_the_pool():
+    async def main():
+        await run_in_process(sum, [1, 2])
+        pool = get_process_pool()
+        with pytest.raises(ExtractionError, match="exceeded"):
+            await extract_pdf(_pdf(40), timeout_s=0.001)
+        # A fresh pool serves later work
+        assert get_process_pool() is not pool
+        assert await run_in_process(sum, [1, 2]) == 3
+
+    asyncio.run(main())
+
+
+def test_recycle_kills_stuck_workers_and_retries_others():
+    async def main():
+        await run_in_process(sum, [1, 2])
+        processes = list(get_process_pool()._processes.values())
+        stuck = asyncio.ensure_future(run_in_process(time.sleep, 60))
+        other = asyncio.ensure_future(run_in_process(time.sleep, 0.2))
+        await asyncio.sleep(0.5)
+        # The caller of the stuck work gives up, as extract_pdf does on its timeout
+        stuck.cancel()
+        recycle_process_pool()
+        assert await asyncio.wait_for(other, 30) is None
+        return processes
+
+    processes = asyncio.run(main())
+    for process in processes:
+        process.join(timeout=10)
+        assert not process.is_alive()
+    assert concurrency._process_pool is not None
@@ -0,0 +1,133 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import openai
+import pytest
+import requests
+
+from backend.core import provider
+from backend.core.provider import CircuitBreaker, ProviderGate, ProviderUnavailable, backoff_delay, is_retryable, retry_after
+
+REQUEST = httpx.Request("POST", "http://provider/v1/chat/completions")
+
+
+def status_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return openai.APIStatusError("failed", response=response, body=None)
+
+
+@pytest.mark.parametrize("exc", [
+    asyncio.TimeoutError(),
+    ConnectionResetError(),
+    httpx.ConnectError("refused", request=REQUEST),
+    httpx.ReadTimeout("slow", request=REQUEST),
+    openai.APIConnectionError(request=REQUEST),
+    openai.APITimeoutError(request=REQUEST),
+    requests.exceptions.ConnectionError("refused"),
+    requests.exceptions.ReadTimeout("slow"),
+    requests.exceptions.ConnectTimeout("slow"),
+    status_error(408),
+    status_error(429),
+    status_error(500),
+    status_error(503),
+])
+def test_transient_failures_are_retried(exc):
+    assert is_retryable(exc)
+
+
+@pytest.mark.parametrize("exc", [
+    ValueError("bad JSON"),
+    requests.exceptions.InvalidURL("no scheme"),
+    status_error(400),
+    status_error(401),
+    status_error(404),
+])
+def test_bad_requests_are_not_retried(exc):
+    assert not is_retryable(exc)
+
+
+def test_requests_http_error_is_classified_by_status():
+    response = requests.Response()
+    response.status_code = 502
+    assert is_retryable(requests.exceptions.HTTPError(response=response))
+    response.status_code = 403
+    assert not is_retryable(requests.exceptions.HTTPError(response=response))
+
+
+def test_retry_after_headers():
+    assert retry_after(status_error(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(status_error(429, {"retry-after-ms": "250", "retry-after": "9"})) == 0.25
+    assert retry_after(status_error(429, {"retry-after": "7"})) == 7.0
+    assert retry_after(status_error(429, {"retry-after": "-3"})) == 0.0
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= retry_after(status_error(429, {"retry-after": date})) <= 30
+    past = email.utils.formatdate(time.time() - 30, usegmt=True)
+    assert retry_after(status_error(429, {"retry-after": past})) == 0.0
+    assert retry_after(status_error(429, {"retry-after": "soon"})) is None
+    assert retry_after(status_error(429)) is None
+    assert retry_after(ConnectionResetError()) is None
+
+
+def test_backoff_is_capped_and_respects_the_server_delay(monkeypatch):
+    monkeypatch.setattr(provider, "LLM_BACKOFF_BASE_S", 1.0)
+    monkeypatch.setattr(provider, "LLM_BACKOFF_MAX_S", 4.0)
+    for attempt in range(8):
+        assert 0.0 <= backoff_delay(attempt) <= min(4.0, 2 ** attempt)
+    assert backoff_delay(0, server_delay=3.0) >= 3.0
+
+
+def test_breaker_opens_then_lets_one_trial_through():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout_s=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    # A failed trial re-opens it at once
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_gate_retries_transient_failures_only(monkeypatch):
+    monkeypatch.setattr(provider, "LLM_MAX_RETRIES", 3)
+    gate = ProviderGate("test-model", 2)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise requests.exceptions.ConnectionError("reset")
+        return "ok"
+
+    assert gate.call_sync(flaky) == "ok" and len(calls) == 3
+
+    async def bad_request():
+        calls.append(1)
+        raise status_error(400)
+
+    calls.clear()
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(gate.call(bad_request))
+    assert len(calls) == 1
+    assert gate.breaker.state == "closed"
+
+
+def test_gate_gives_up_on_a_long_server_delay(monkeypatch):
+    monkeypatch.setattr(provider, "LLM_BACKOFF_MAX_S", 1.0)
+    gate = ProviderGate("test-model", 1)
+
+    async def throttled():
+        raise status_error(429, {"retry-after": "60"})
+
+    with pytest.raises(ProviderUnavailable) as unavailable:
+        asyncio.run(gate.call(throttled))
+    assert unavailable.value.retry_after == 60.0
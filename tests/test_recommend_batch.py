@@ -0,0 +1,99 @@
+import asyncio
+import json
+import uuid
+
+from backend import recommend_batch as cli
+from backend.routes import career
+from backend.services import batch_service
+from backend.services.ingest_service import store_cvs
+from backend.services.storage_service import StorageService
+
+from conftest import PROFILE, RECOMMENDATION, app_client
+
+
+def _store_users(n: int, summary: str = PROFILE["summary"]):
+    users = [f"batch-{uuid.uuid4().hex[:8]}" for _ in range(n)]
+    cvs = [(user, [f"{user} worked on forecasting in Python."], dict(PROFILE, summary=summary)) for user in users]
+    asyncio.run(store_cvs(StorageService(), cvs))
+    return users
+
+
+async def _post_batch(items, **body):
+    async with app_client() as client:
+        r = await client.post("/career/recommend_batch", json={"items": items, **body})
+    lines = [json.loads(line) for line in r.text.splitlines() if line] if r.status_code == 200 else []
+    return r, lines
+
+
+def test_lines_carry_index_and_unknown_users_fail_alone():
+    users = _store_users(3)
+    items = [{"user_id": users[0], "interests": ["AI"]}, {"user_id": "batch-nobody"}, {"user_id": users[1]}, {"user_id": users[2]}]
+    r, lines = asyncio.run(_post_batch(items))
+    assert r.status_code == 200 and r.headers["content-type"] == "application/x-ndjson"
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[1] == {"index": 1, "user_id": "batch-nobody", "error": "LookupError: nothing stored for this user"}
+    for i in (0, 2, 3):
+        line = by_index[i]
+        assert line["user_id"] == items[i]["user_id"]
+        # The career itself may be reconciled with the catalog shortlist
+        assert set(line["recommendation"]) == set(RECOMMENDATION)
+        assert line["recommendation"]["justification"] == RECOMMENDATION["justification"]
+        assert not line["cached"] and not line["degraded"]
+    assert by_index[0]["interests"] == ["AI"]
+
+
+def test_failing_generation_yields_an_error_line(monkeypatch):
+    ok = _store_users(2)
+    bad = _store_users(1, summary="boom")
+    generate = batch_service.arecommend_with_semantic_cache
+
+    async def failing(profile, *args, **kwargs):
+        if profile["summary"] == "boom":
+            raise RuntimeError("generation failed")
+        return await generate(profile, *args, **kwargs)
+
+    monkeypatch.setattr(batch_service, "arecommend_with_semantic_cache", failing)
+    _, lines = asyncio.run(_post_batch([{"user_id": u} for u in ok + bad]))
+    errors = [line for line in lines if "error" in line]
+    assert errors == [{"index": 2, "user_id": bad[0], "error": "RuntimeError: generation failed"}]
+    assert sorted(line["index"] for line in lines if "recommendation" in line) == [0, 1]
+
+
+def test_cache_hits_are_emitted_before_generation(provider):
+    warm = _store_users(2)
+    asyncio.run(_post_batch([{"user_id": u} for u in warm]))
+    cold = _store_users(1, summary="Backend engineer building payment APIs in Go.")
+    provider.chat.delay = 0.2
+    calls = provider.chat.calls
+    _, lines = asyncio.run(_post_batch([{"user_id": cold[0]}] + [{"user_id": u} for u in warm]))
+    assert [line["cached"] for line in lines] == [True, True, False]
+    assert lines[-1]["index"] == 0
+    assert provider.chat.calls == calls + 1
+
+    # use_cache=false regenerates every user
+    _, lines = asyncio.run(_post_batch([{"user_id": u} for u in warm], use_cache=False))
+    assert not any(line["cached"] for line in lines)
+    assert provider.chat.calls == calls + 3
+
+
+def test_batch_size_limits(monkeypatch):
+    monkeypatch.setattr(career, "REC_BATCH_MAX_ITEMS", 2)
+    r, _ = asyncio.run(_post_batch([{"user_id": f"u{i}"} for i in range(3)]))
+    assert r.status_code == 413
+    r, _ = asyncio.run(_post_batch([]))
+    assert r.status_code == 400
+
+
+def test_cli_writes_ndjson(tmp_path, capsys):
+    users = _store_users(2)
+    source = tmp_path / "users.jsonl"
+    source.write_text(
+        json.dumps({"user_id": users[0], "interests": ["AI"]}) + "\n\n" + users[1] + "\nbatch-nobody\n", encoding="utf-8"
+    )
+    out = tmp_path / "results.jsonl"
+    assert cli.main([str(source), "--out", str(out), "--group-size", "1"]) == 1
+    lines = sorted((json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()), key=lambda l: l["index"])
+    assert [line["user_id"] for line in lines] == [users[0], users[1], "batch-nobody"]
+    assert lines[0]["interests"] == ["AI"] and "recommendation" in lines[1] and "error" in lines[2]
+    assert "3/3 users, 1 failed" in capsys.readouterr().err
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from backend.core import metrics
+from backend.core.config import OPENAI_MODEL
+from backend.core.provider import DeadlineExceeded, ProviderUnavailable, get_gate
+from backend.routes import career
+from conftest import RECOMMENDATION, app_client
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _stream(user_id: str):
+    async with app_client() as client:
+        return await client.post("/career/recommend/stream", params={"user_id": user_id, "interests": ["AI"]})
+
+
+def test_stream_emits_fields_then_result():
+    resp = asyncio.run(_stream("stream-user"))
+    assert resp.status_code == 200
+    events = _events(resp.text)
+    names = [name for name, _ in events]
+    assert names[:2] == ["recommended_career", "justification"]
+    assert names[-1] == "result"
+    result = events[-1][1]
+    assert set(result) == set(RECOMMENDATION)
+    assert events[0][1]["value"] == result["recommended_career"]
+    assert [d["item"] for n, d in events if n == "learning_path"] == result["learning_path"]
+
+    # The second request replays the stored answer
+    again = asyncio.run(_stream("stream-user"))
+    assert again.headers["Cache-Status"].startswith("pathfinder; hit")
+    assert _events(again.text)[-1][1] == result
+
+
+def test_degraded_stream_is_not_cached(provider, monkeypatch):
+    async def failing_stream(messages):
+        raise ConnectionError("provider down")
+        yield
+
+    monkeypatch.setattr(provider.chat, "astream", failing_stream)
+    try:
+        resp = asyncio.run(_stream("stream-degraded"))
+        assert resp.headers["Cache-Status"] == "pathfinder; fwd=miss"
+        name, result = _events(resp.text)[-1]
+        assert name == "result" and result["justification"].startswith("Rule-based")
+        again = asyncio.run(_stream("stream-degraded"))
+        assert again.headers["Cache-Status"] == "pathfinder; fwd=miss"
+    finally:
+        get_gate(OPENAI_MODEL).breaker.record_success()
+
+
+def test_stream_errors_do_not_leak_internals(monkeypatch, capsys):
+    failure = None
+
+    async def failing_inputs(*args, **kwargs):
+        raise failure
+
+    monkeypatch.setattr(career, "_recommendation_inputs", failing_inputs)
+    details = []
+    for n, failure in enumerate([
+        RuntimeError("sqlite3: /srv/secret/path is locked"),
+        ProviderUnavailable("gpt: circuit open", retry_after=3.0),
+        DeadlineExceeded("embed: request deadline exceeded"),
+    ]):
+        [(name, data)] = _events(asyncio.run(_stream(f"stream-error-{n}")).text)
+        assert name == "error"
+        details.append(data)
+    assert details == [
+        {"detail": "recommendation failed"},
+        {"detail": "LLM provider unavailable: gpt: circuit open", "retry_after": 3.0},
+        {"detail": "Request deadline exceeded: embed: request deadline exceeded"},
+    ]
+    assert "/srv/secret/path" in capsys.readouterr().err
+
+
+def test_timed_iter_times_only_the_waits():
+    async def items():
+        for i in range(3):
+            await asyncio.sleep(0.05)
+            yield i
+
+    async def consume():
+        timings = []
+        token = metrics._timings.set(timings)
+        try:
+            async for _ in metrics.timed_iter("test_iter", items()):
+                # A slow consumer, e.g. a client reading the stream slowly
+                await asyncio.sleep(0.1)
+        finally:
+            metrics._timings.reset(token)
+        return timings
+
+    [(name, elapsed)] = asyncio.run(consume())
+    assert name == "test_iter"
+    assert 0.15 <= elapsed < 0.3
@@ -0,0 +1,81 @@
+import time
+
+from backend.services.recommendation_cache import RecommendationCache, UserVersions, cache_status, normalize_interests
+
+REC = {"recommended_career": "Data Scientist"}
+
+
+def test_interests_are_normalized_into_the_key():
+    cache = RecommendationCache()
+    assert normalize_interests([" AI", "ai", "", "Data "]) == ("ai", "data")
+    assert cache.make_key("u1", ["Data", "AI"]) == cache.make_key("u1", ["ai", "data "])
+    assert cache.make_key("u1", ["AI"]) != cache.make_key("u2", ["AI"])
+
+
+def test_hits_return_copies_with_remaining_ttl():
+    cache = RecommendationCache(ttl_s=60)
+    key = cache.make_key("u1", None)
+    assert cache.get(key) is None
+    cache.set(key, REC)
+    value, ttl = cache.get(key)
+    assert value == REC and 59 < ttl <= 60
+    value["recommended_career"] = "changed"
+    assert cache.get(key)[0] == REC
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire():
+    cache = RecommendationCache(ttl_s=0.05)
+    key = cache.make_key("u1", None)
+    cache.set(key, REC)
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = RecommendationCache(max_entries=2)
+    keys = [cache.make_key(f"u{i}", None) for i in range(3)]
+    cache.set(keys[0], REC)
+    cache.set(keys[1], REC)
+    cache.get(keys[0])
+    cache.set(keys[2], REC)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+
+def test_version_bump_invalidates_the_user():
+    cache = RecommendationCache()
+    old = cache.make_key("u1", ["AI"])
+    other = cache.make_key("u2", ["AI"])
+    cache.set(old, REC)
+    cache.set(other, REC)
+    cache.bump_user_version("u1")
+    assert cache.make_key("u1", ["AI"]) != old
+    assert cache.get(old) is None
+    assert cache.get(other) is not None
+
+
+def test_shared_versions_invalidate_other_processes(tmp_path):
+    path = str(tmp_path / "versions.sqlite3")
+    api = RecommendationCache(versions=UserVersions(path))
+    worker = RecommendationCache(versions=UserVersions(path))
+    key = api.make_key("u1", ["AI"])
+    api.set(key, REC)
+    assert worker.bump_user_version("u1") == 1
+    assert api.make_key("u1", ["AI"]) != key
+    assert api.user_version("u1") == 1 and api.bump_user_version("u1") == 2
+    assert RecommendationCache(versions=UserVersions(path)).user_version("u1") == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = RecommendationCache(max_entries=0)
+    key = cache.make_key("u1", None)
+    cache.set(key, REC)
+    assert not cache.enabled and cache.get(key) is None
+
+
+def test_cache_status_header():
+    assert cache_status(hit=True, ttl=12.7) == "pathfinder; hit; ttl=12"
+    assert cache_status(hit=True, detail="semantic") == "pathfinder; hit; detail=semantic"
+    assert cache_status(hit=False, stored=True, collapsed=True) == "pathfinder; fwd=miss; stored; collapsed"
@@ -0,0 +1,191 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+
+import pytest
+
+from backend.core.vector_store import NumpyVectorStore
+from backend.services import semantic_cache as semantic_module
+from backend.services.ingest_service import store_cvs
+from backend.services.semantic_cache import SCOPE, SemanticRecommendationCache
+from backend.services.storage_service import StorageService
+
+from conftest import PROFILE, RECOMMENDATION, app_client
+
+INTERESTS = ["AI"]
+
+
+@pytest.fixture
+def new_cache(tmp_path, monkeypatch):
+    """Caches over a numpy store in a temporary directory; two caches share it like two runs."""
+    monkeypatch.setattr(semantic_module, "open_vector_store", lambda name: NumpyVectorStore(str(tmp_path / name)))
+
+    def make(threshold=0.95, ttl_s=60.0, max_entries=10):
+        return SemanticRecommendationCache(threshold=threshold, ttl_s=ttl_s, max_entries=max_entries)
+
+    return make
+
+
+def _profile(topic: str):
+    return {"summary": f"Engineer focused on {topic}.", "skills": [topic, f"{topic} tooling"]}
+
+
+def _rec(career: str):
+    return dict(RECOMMENDATION, recommended_career=career)
+
+
+def _stored_ids(cache):
+    return sorted(cache._open().doc_ids([SCOPE]))
+
+
+def test_near_identical_profile_hits_and_is_adapted(new_cache):
+    cache = new_cache()
+
+    async def main():
+        assert await cache.alookup(PROFILE, INTERESTS) is None
+        await cache.astore(PROFILE, INTERESTS, RECOMMENDATION)
+        # Same skills and interests; the summary differs only in case and spacing
+        twin = dict(PROFILE, summary="  " + PROFILE["summary"].upper())
+        rec, similarity = await cache.alookup(twin, ["ai"])
+        assert similarity >= 0.95
+        assert rec["recommended_career"] == RECOMMENDATION["recommended_career"]
+        # Rebuilt for the asking profile rather than copied from the stored one
+        assert rec["justification"] != RECOMMENDATION["justification"]
+        assert await cache.alookup(_profile("embedded firmware"), INTERESTS) is None
+
+    asyncio.run(main())
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_threshold_decides_hits(new_cache):
+    strict, loose = new_cache(threshold=1.01), new_cache(threshold=-1.0)
+
+    async def main():
+        await strict.astore(PROFILE, INTERESTS, RECOMMENDATION)
+        assert await strict.alookup(PROFILE, INTERESTS) is None
+        # Both caches read the same store, so the loose one finds the entry for any profile
+        assert await loose.alookup(_profile("embedded firmware"), ["robotics"]) is not None
+
+    asyncio.run(main())
+
+
+def test_other_version_misses(new_cache, monkeypatch):
+    cache = new_cache()
+
+    async def main():
+        await cache.astore(PROFILE, INTERESTS, RECOMMENDATION)
+        monkeypatch.setattr(semantic_module, "_version", lambda: "other-model:other-prompt")
+        assert await cache.alookup(PROFILE, INTERESTS) is None
+        # Stored under the new version, the same key is a separate entry
+        await cache.astore(PROFILE, INTERESTS, RECOMMENDATION)
+        assert await cache.alookup(PROFILE, INTERESTS) is not None
+
+    asyncio.run(main())
+    assert len(_stored_ids(cache)) == 2
+
+
+def test_expired_entries_are_deleted(new_cache):
+    cache = new_cache(ttl_s=0.05)
+
+    async def main():
+        await cache.astore(PROFILE, INTERESTS, RECOMMENDATION)
+        assert len(_stored_ids(cache)) == 1
+        time.sleep(0.06)
+        assert await cache.alookup(PROFILE, INTERESTS) is None
+
+    asyncio.run(main())
+    assert _stored_ids(cache) == [] and cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_overflow(new_cache):
+    cache = new_cache(max_entries=2)
+    profiles = [_profile(topic) for topic in ("databases", "compilers", "networking")]
+
+    async def main():
+        await cache.astore(profiles[0], INTERESTS, _rec("Database Administrator"))
+        await cache.astore(profiles[1], INTERESTS, _rec("Compiler Engineer"))
+        # A hit makes the first entry the most recently used
+        assert await cache.alookup(profiles[0], INTERESTS) is not None
+        await cache.astore(profiles[2], INTERESTS, _rec("Network Engineer"))
+        assert await cache.alookup(profiles[1], INTERESTS) is None
+        assert await cache.alookup(profiles[0], INTERESTS) is not None
+        assert await cache.alookup(profiles[2], INTERESTS) is not None
+
+    asyncio.run(main())
+    assert len(_stored_ids(cache)) == 2 and cache.stats()["entries"] == 2
+
+
+def test_index_is_rebuilt_after_a_restart(new_cache):
+    first = new_cache()
+    profiles = [_profile(topic) for topic in ("databases", "compilers")]
+
+    async def main():
+        for profile in profiles:
+            await first.astore(profile, INTERESTS, _rec("Software Engineer"))
+            time.sleep(0.01)
+        restarted = new_cache(max_entries=1)
+        assert restarted.stats()["entries"] == 0
+        # Opening the store loads the entries, oldest first
+        restarted._open()
+        assert list(restarted._index) == list(first._index)
+        assert await restarted.alookup(profiles[1], INTERESTS) is not None
+        # The restarted cache's bound applies to what the previous run left
+        await restarted.astore(_profile("networking"), INTERESTS, _rec("Network Engineer"))
+        assert len(_stored_ids(restarted)) == 1
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def semantic_on(tmp_path, monkeypatch):
+    """The app's semantic cache, enabled over an empty store of its own."""
+    monkeypatch.setattr(semantic_module, "open_vector_store", lambda name: NumpyVectorStore(str(tmp_path / name)))
+    cache = semantic_module.semantic_cache
+    monkeypatch.setattr(cache, "_enabled", True)
+    monkeypatch.setattr(cache, "_store", None)
+    monkeypatch.setattr(cache, "_index", OrderedDict())
+
+
+def _twins(n: int):
+    users = [f"semantic-{uuid.uuid4().hex[:8]}" for _ in range(n)]
+    asyncio.run(store_cvs(StorageService(), [(user, [f"{user} writes SQL daily."], PROFILE) for user in users]))
+    return users
+
+
+def test_recommend_reports_semantic_hits(semantic_on, provider):
+    first, second = _twins(2)
+
+    async def main():
+        async with app_client() as client:
+            params = {"interests": INTERESTS}
+            miss = await client.post("/career/recommend", params={"user_id": first, **params})
+            hit = await client.post("/career/recommend", params={"user_id": second, **params})
+        return miss, hit
+
+    miss, hit = asyncio.run(main())
+    assert miss.headers["Cache-Status"] == "pathfinder; fwd=miss; stored"
+    assert "X-Semantic-Similarity" not in miss.headers
+    assert hit.status_code == 200
+    assert hit.headers["Cache-Status"] == "pathfinder; hit; detail=semantic"
+    assert float(hit.headers["X-Semantic-Similarity"]) >= 0.95
+    assert hit.json()["recommended_career"] == miss.json()["recommended_career"]
+    assert provider.chat.calls == 1
+
+
+def test_recommend_stream_reports_semantic_hits(semantic_on, provider):
+    first, second = _twins(2)
+
+    async def main():
+        async with app_client() as client:
+            params = {"interests": INTERESTS}
+            miss = await client.post("/career/recommend/stream", params={"user_id": first, **params})
+            hit = await client.post("/career/recommend/stream", params={"user_id": second, **params})
+        return miss, hit
+
+    miss, hit = asyncio.run(main())
+    assert miss.headers["Cache-Status"] == "pathfinder; fwd=miss"
+    assert hit.headers["Cache-Status"] == "pathfinder; hit; detail=semantic"
+    assert float(hit.headers["X-Semantic-Similarity"]) >= 0.95
+    assert "event: result" in hit.text
+    assert provider.chat.calls == 1
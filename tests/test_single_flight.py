@@ -0,0 +1,162 @@
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+
+from backend.core import career_catalog
+from backend.core.career_catalog import DEFAULT_CATALOG_PATH, CareerCatalog
+from backend.core.deadline import reset_deadline, set_deadline
+from backend.core.provider import DeadlineExceeded
+from backend.core.single_flight import SingleFlight
+from backend.core.taxonomy import get_taxonomy
+
+from conftest import app_client
+
+CALLERS = 20
+
+
+def test_concurrent_callers_share_one_run():
+    async def main():
+        flight = SingleFlight("test")
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": len(runs)}
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        assert len(runs) == 1
+        assert [shared for _, shared in results] == [False, True, True, True, True]
+        assert all(result is results[0][0] for result, _ in results)
+        assert flight.inflight() == 0
+        # Nothing is kept once the run finishes
+        assert (await flight.do("key", work)) == ({"value": 2}, False)
+
+    asyncio.run(main())
+
+
+def test_different_keys_run_separately():
+    async def main():
+        flight = SingleFlight("test")
+
+        async def work(key):
+            await asyncio.sleep(0.01)
+            return key
+
+        results = await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+        assert results == [("a", False), ("b", False)]
+
+    asyncio.run(main())
+
+
+def test_errors_reach_every_caller():
+    async def main():
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.inflight() == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_leader_does_not_cancel_the_shared_run():
+    async def main():
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == ("done", True)
+
+    asyncio.run(main())
+
+
+def test_follower_gives_up_at_its_own_deadline():
+    async def main():
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.2)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        token = set_deadline(time.monotonic() + 0.02)
+        try:
+            with pytest.raises(DeadlineExceeded):
+                await flight.do("key", work)
+        finally:
+            reset_deadline(token)
+        assert await leader == ("done", False)
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def cold_catalog(tmp_path, monkeypatch):
+    """A catalog whose embeddings are neither built nor cached, as on a server without warm-up."""
+    with open(DEFAULT_CATALOG_PATH, encoding="utf-8") as f:
+        careers = json.load(f)["careers"]
+    tag = uuid.uuid4().hex
+    careers = [{**c, "description": f"{c.get('description', '')} ({tag})"} for c in careers]
+    catalog = CareerCatalog(careers, get_taxonomy(), cache_dir=str(tmp_path))
+    monkeypatch.setattr(career_catalog, "_catalog", catalog)
+    return catalog
+
+
+def test_identical_requests_reach_the_provider_once(provider, monkeypatch, cold_catalog):
+    provider.chat.delay = 0.2
+    batches = []
+    embed_documents = provider.embedder.embed_documents
+
+    def record(texts):
+        batches.append(list(texts))
+        return embed_documents(texts)
+
+    monkeypatch.setattr(provider.embedder, "embed_documents", record)
+    user_id = f"sf-{uuid.uuid4().hex}"
+    cv = f"Jane Doe ({user_id}). Data analyst with five years of Python, SQL and Tableau experience."
+    interests = [f"Robotics {uuid.uuid4().hex[:8]}"]
+    catalog_texts = {CareerCatalog.doc_text(c) for c in cold_catalog.careers}
+
+    async def burst(method, url, **kwargs):
+        provider.chat.calls = 0
+        batches.clear()
+        async with app_client() as client:
+            responses = await asyncio.gather(*(client.request(method, url, **kwargs) for _ in range(CALLERS)))
+        assert [r.status_code for r in responses] == [200] * CALLERS
+        return responses
+
+    async def main():
+        await burst("POST", "/user/upload_cv", data={"user_id": user_id, "text": cv})
+        assert provider.chat.calls == 1 and len(batches) == 1
+
+        await burst("POST", "/career/analyze", params={"user_id": user_id})
+        assert provider.chat.calls == 0 and batches == []
+
+        responses = await burst("POST", "/career/recommend", params={"user_id": user_id, "interests": interests})
+        assert provider.chat.calls == 1
+        # The catalog is embedded once, off the request path; the requests share one embedding call
+        for _ in range(500):
+            if cold_catalog.ready_matrix() is not None:
+                break
+            await asyncio.sleep(0.01)
+        request_batches = [b for b in batches if not catalog_texts.intersection(b)]
+        assert len(request_batches) == 1 and len(batches) == 2
+        assert len({r.content for r in responses}) == 1
+
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from backend.services.stream_parser import IncrementalJSONParser
+
+REPLY = {
+    "recommended_career": "Data Scientist",
+    "score": {"fit": [1, 2, {"x": "}"}]},
+    "justification": 'Strong "Python" skills, \\ and\nSQL é',
+    "learning_path": ["Learn scikit-learn", 3, ["nested"], "Study statistics"],
+    "next_steps": [],
+    "done": True,
+}
+EXPECTED = [
+    ("field", "recommended_career", "Data Scientist"),
+    ("field", "justification", REPLY["justification"]),
+    ("item", "learning_path", "Learn scikit-learn"),
+    ("item", "learning_path", "Study statistics"),
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+def test_events_do_not_depend_on_chunking(chunk_size):
+    text = "```json\n" + json.dumps(REPLY, indent=1) + "\n```"
+    parser = IncrementalJSONParser()
+    events = []
+    for i in range(0, len(text), chunk_size):
+        events.extend(parser.feed(text[i : i + chunk_size]))
+    assert events == EXPECTED
+    assert parser.done
+
+
+def test_events_arrive_as_soon_as_values_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"recommended_career": "Data Sci') == []
+    assert parser.feed('entist", "learning_path": ["a"') == [
+        ("field", "recommended_career", "Data Scientist"),
+        ("item", "learning_path", "a"),
+    ]
+    assert not parser.done
@@ -0,0 +1,73 @@
+import pytest
+
+from backend.core.taxonomy import AhoCorasick, SkillTaxonomy, get_taxonomy, tokenize
+
+SKILLS = {
+    "Python": ["python", "python3"],
+    "JavaScript": ["javascript", "js"],
+    "Node.js": ["node.js", "nodejs"],
+    "Java": ["java"],
+    "C++": ["c++", "cpp"],
+    "Machine Learning": ["machine learning", "ml"],
+    "SQL": ["sql"],
+}
+ROLES = {
+    "Machine Learning Engineer": {"aliases": ["machine learning engineer", "ml engineer"], "skills": ["Python", "Machine Learning"]},
+    "Backend Developer": {"aliases": ["backend developer"], "skills": ["Java", "SQL", "Node.js"]},
+}
+
+
+@pytest.fixture
+def taxonomy():
+    return SkillTaxonomy(SKILLS, ROLES)
+
+
+def test_tokenize_splits_punctuation():
+    assert tokenize("Node.js, C++!") == ["node", ".", "js", ",", "c", "+", "+", "!"]
+
+
+def test_automaton_finds_overlapping_and_leftmost_longest():
+    matcher = AhoCorasick()
+    for pattern in ("new york", "york", "new york city", "city"):
+        matcher.add(pattern, pattern)
+    assert sorted(v for _, _, v in matcher.iter_matches("in new york city")) == ["city", "new york", "new york city", "york"]
+    assert [v for _, _, v in matcher.find("in new york city today, york city")] == ["new york city", "york", "city"]
+
+
+def test_whole_token_matching(taxonomy):
+    # "java" is not found inside "javascript"; "node.js" wins over "js"
+    assert taxonomy.extract_skills("JavaScript and Node.js with C++") == ["JavaScript", "Node.js", "C++"]
+    assert taxonomy.extract_skills("Python, SQL, python3 and sql again") == ["Python", "SQL"]
+
+
+def test_roles_and_skills_resolve_separately(taxonomy):
+    found = taxonomy.find("Worked as an ML engineer on machine learning pipelines")
+    assert found == [
+        (3, 4, "Machine Learning", "skill"),
+        (3, 5, "Machine Learning Engineer", "role"),
+        (6, 8, "Machine Learning", "skill"),
+    ]
+
+
+def test_canonical_and_normalized_skills(taxonomy):
+    assert taxonomy.canonical_skill("  NodeJS ") == "Node.js"
+    assert taxonomy.canonical_skill("Kubernetes") is None
+    assert taxonomy.normalize_skills(["python", "Python3", "Kubernetes", "kubernetes"]) == ["Python", "Kubernetes"]
+
+
+def test_rank_roles_weighs_interests(taxonomy):
+    ranked = taxonomy.rank_roles(["Python", "SQL"], interests=["ml engineering"])
+    assert ranked[0] == ("Machine Learning Engineer", ["Python"], ["Machine Learning"])
+    assert ranked[1][0] == "Backend Developer"
+    assert taxonomy.rank_roles([], []) == []
+
+
+def test_unknown_role_skills_are_rejected():
+    with pytest.raises(ValueError, match="unknown skills"):
+        SkillTaxonomy(SKILLS, {"Data Engineer": {"aliases": [], "skills": ["Spark"]}})
+
+
+def test_bundled_taxonomy_compiles():
+    taxonomy = get_taxonomy()
+    assert "Python" in taxonomy.extract_skills("Built ETL jobs in Python and T-SQL")
+    assert len(taxonomy.fingerprint) == 16
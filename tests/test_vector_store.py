@@ -0,0 +1,111 @@
+import chromadb
+import numpy as np
+import pytest
+
+from backend.core.vector_store import ChromaVectorStore, NumpyVectorStore, VectorStore
+
+
+def _unit(*values):
+    v = np.asarray(values, dtype=np.float32)
+    return (v / np.linalg.norm(v)).tolist()
+
+
+@pytest.fixture(params=["numpy", "chroma"])
+def store(request, tmp_path):
+    if request.param == "numpy":
+        return NumpyVectorStore(str(tmp_path / "vectors"))
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    return ChromaVectorStore(client.get_or_create_collection(name="test_docs"))
+
+
+def _fill(store):
+    store.upsert(
+        ["a:cv", "a:profile", "b:cv"],
+        ["alice cv", "alice profile", "bob cv"],
+        [
+            {"user_id": "a", "type": "cv_raw"},
+            {"user_id": "a", "type": "profile"},
+            {"user_id": "b", "type": "cv_raw"},
+        ],
+        [_unit(1, 0, 0), _unit(0, 1, 0), _unit(1, 0, 0)],
+    )
+
+
+def test_query_is_per_user_and_ranked(store):
+    _fill(store)
+    results = store.query("a", _unit(0, 1, 0.1), top_k=5)
+    assert [r["id"] for r in results] == ["a:profile", "a:cv"]
+    assert results[0]["metadata"]["user_id"] == "a"
+    assert results[0]["distance"] < results[1]["distance"]
+    assert [r["id"] for r in store.query("b", _unit(0, 1, 0), top_k=5)] == ["b:cv"]
+
+
+def test_metadata_ids_and_delete(store):
+    _fill(store)
+    assert [m and m["type"] for m in store.get_metadata(["a:profile", "missing"])] == ["profile", None]
+    assert sorted(store.doc_ids(["a", "b"], doc_type="cv_raw")) == ["a:cv", "b:cv"]
+    assert store.count("a") == 2
+    store.delete(["a:cv"])
+    assert store.count("a") == 1
+    assert [r["id"] for r in store.query("a", _unit(1, 0, 0), top_k=5)] == ["a:profile"]
+
+
+def test_query_many_matches_query(store):
+    rng = np.random.default_rng(7)
+    ids, texts, metas, embs = [], [], [], []
+    for user in ("a", "b", "c"):
+        for n in range(4):
+            ids.append(f"{user}:{n}")
+            texts.append(f"{user} doc {n}")
+            metas.append({"user_id": user, "type": "cv_raw"})
+            embs.append(_unit(*rng.normal(size=8)))
+    store.upsert(ids, texts, metas, embs)
+    # Repeated and unknown users included
+    users = ["a", "c", "a", "nobody", "b"]
+    queries = [_unit(*rng.normal(size=8)) for _ in users]
+    many = store.query_many(users, queries, top_k=3)
+    single = [store.query(user, q, top_k=3) for user, q in zip(users, queries)]
+    assert [[(r["id"], r["document"], r["metadata"]) for r in rows] for rows in many] == [
+        [(r["id"], r["document"], r["metadata"]) for r in rows] for rows in single
+    ]
+    for rows_many, rows_single in zip(many, single):
+        assert [r["distance"] for r in rows_many] == pytest.approx([r["distance"] for r in rows_single], abs=1e-5)
+    assert many[3] == [] and store.query_many([], [], top_k=3) == []
+
+
+def test_numpy_store_reopens_from_disk(tmp_path):
+    _fill(NumpyVectorStore(str(tmp_path)))
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert [r["id"] for r in reopened.query("a", _unit(1, 0, 0), top_k=1)] == ["a:cv"]
+
+
+def test_numpy_stores_sharing_a_directory_allocate_distinct_rows(tmp_path):
+    # Two instances stand in for two processes: separate SQLite connections and mappings
+    first, second = NumpyVectorStore(str(tmp_path)), NumpyVectorStore(str(tmp_path))
+    for store in (first, second):
+        # Small enough that the file grows past the other instance's mapping
+        store._GROW_ROWS = 4
+    first.upsert(["a:0"], ["a0"], [{"user_id": "a"}], [_unit(1, 0, 0)])
+    b_vectors = [_unit(0, 1, i) for i in range(5)]
+    second.upsert([f"b:{i}" for i in range(5)], [f"b{i}" for i in range(5)], [{"user_id": "b"}] * 5, b_vectors)
+    # Outgrows its block and moves past the rows the other instance allocated
+    first.upsert(["a:1"], ["a1"], [{"user_id": "a"}], [_unit(0, 0, 1)])
+
+    blocks = sorted(first._db.execute("SELECT start, capacity FROM blocks").fetchall())
+    assert all(s1 + c1 <= s2 for (s1, c1), (s2, _) in zip(blocks, blocks[1:]))
+    for store in (first, second):
+        assert [r["id"] for r in store.query("a", _unit(1, 0, 0), top_k=2)] == ["a:0", "a:1"]
+        assert [r["id"] for r in store.query("a", _unit(0, 0, 1), top_k=1)] == ["a:1"]
+        for i, v in enumerate(b_vectors):
+            assert store.query("b", v, top_k=1)[0]["id"] == f"b:{i}"
+    second.delete(["b:0"])
+    assert first.count("b") == 4 and first.query("b", b_vectors[4], top_k=1)[0]["id"] == "b:4"
+
+
+def test_incomplete_backend_fails_on_creation():
+    class QueryOnly(VectorStore):
+        def query(self, user_id, embedding, top_k):
+            return []
+
+    with pytest.raises(TypeError, match="abstract"):
+        QueryOnly()